@@ -0,0 +1,194 @@
+"""
+Durable per-item checkpoints for research and send jobs
+
+Each processed URL (research) or CSV row (send) is written to SQLite as soon
+as it is done, together with the original request minus its credentials.
+After a crash or restart `POST /jobs/{job_id}/resume` re-runs the job and the
+runner skips every checkpointed item. The same table carries cooperative
+cancellation: runners check the flag whenever they record an item.
+
+A finished job's checkpoints are deleted. Those of failed, cancelled or lost
+jobs are kept for resuming, and swept once untouched for CHECKPOINT_TTL_DAYS
+(default 7).
+"""
+from __future__ import annotations
+
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import sqlite3
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.job_types import request_json
+from app.jobs import job_queue_db_path, sqlite_connect
+
+_DEFAULT_TTL_DAYS = 7.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a runner when its job has been asked to stop."""
+
+
+def checkpoint_db_path() -> str:
+    """CHECKPOINT_DB, else the shared worker-mode database, else data/checkpoints.sqlite3."""
+    return os.getenv("CHECKPOINT_DB") or job_queue_db_path() or os.path.join("data", "checkpoints.sqlite3")
+
+
+def checkpoint_ttl_s() -> float:
+    try:
+        days = float(os.getenv("CHECKPOINT_TTL_DAYS", str(_DEFAULT_TTL_DAYS)))
+    except ValueError:
+        days = _DEFAULT_TTL_DAYS
+    return days * 86400.0
+
+
+class CheckpointStore:
+    def __init__(self, db_path: str) -> None:
+        self._db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'active',
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_items (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    UNIQUE (job_id, item_key)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite_connect(self._db_path)
+
+    def register(self, job_id: str, job_type: str, payload: str) -> None:
+        """Remember the job's request so it can be resumed; marks the job active."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO checkpoint_jobs (job_id, job_type, payload, state, updated_at) VALUES (?, ?, ?, 'active', ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET payload = excluded.payload, state = 'active', updated_at = excluded.updated_at",
+                (job_id, job_type, payload, time.time()),
+            )
+
+    def job_request(self, job_id: str) -> Optional[Tuple[str, str]]:
+        """(job_type, payload JSON) for a registered job, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT job_type, payload FROM checkpoint_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return (row["job_type"], row["payload"]) if row else None
+
+    def state(self, job_id: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT state FROM checkpoint_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row["state"] if row else None
+
+    def set_state(self, job_id: str, state: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE checkpoint_jobs SET state = ?, updated_at = ? WHERE job_id = ?", (state, time.time(), job_id)
+            )
+
+    def request_cancel(self, job_id: str) -> None:
+        """Ask a running (or about to start) job to stop at its next checkpoint."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO checkpoint_jobs (job_id, job_type, payload, state, updated_at) "
+                "VALUES (?, '', '{}', 'cancel_requested', ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET state = 'cancel_requested', updated_at = excluded.updated_at",
+                (job_id, time.time()),
+            )
+
+    def record(self, job_id: str, item_key: str, data: Any) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO checkpoint_items (job_id, item_key, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(job_id, item_key) DO UPDATE SET data = excluded.data",
+                (job_id, item_key, json.dumps(jsonable_encoder(data))),
+            )
+
+    def forget(self, job_id: str) -> None:
+        """Delete a job's request and items."""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM checkpoint_items WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM checkpoint_jobs WHERE job_id = ?", (job_id,))
+
+    def sweep(self, ttl_s: float) -> int:
+        """Delete jobs (and their items) not updated for ttl_s seconds. Returns how many."""
+        cutoff = time.time() - ttl_s
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "DELETE FROM checkpoint_items WHERE job_id IN (SELECT job_id FROM checkpoint_jobs WHERE updated_at < ?)",
+                (cutoff,),
+            )
+            cur = conn.execute("DELETE FROM checkpoint_jobs WHERE updated_at < ?", (cutoff,))
+            return cur.rowcount
+
+    def load(self, job_id: str) -> Dict[str, Any]:
+        """All checkpointed items for a job, in the order they were first recorded."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT item_key, data FROM checkpoint_items WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall()
+        return {r["item_key"]: json.loads(r["data"]) for r in rows}
+
+
+checkpoint_store = CheckpointStore(checkpoint_db_path())
+
+
+class JobCheckpoint:
+    """A runner's view of its own checkpoints."""
+
+    def __init__(self, job_id: str, store: CheckpointStore = checkpoint_store) -> None:
+        self.job_id = job_id
+        self._store = store
+        self.done: Dict[str, Any] = store.load(job_id)
+
+    def record(self, item_key: str, data: Any, check_cancel: bool = True) -> None:
+        """Persist one finished item, then (by default) stop the job if cancellation was requested."""
+        self._store.record(self.job_id, item_key, data)
+        self.done[item_key] = data
+        if check_cancel:
+            self.raise_if_cancelled()
+
+    def raise_if_cancelled(self) -> None:
+        if self._store.state(self.job_id) == "cancel_requested":
+            raise JobCancelled(f"job {self.job_id} cancelled")
+
+    def finish(self, state: str) -> None:
+        """
+        Mark the job done | error | cancelled.
+
+        A done job has nothing left to resume, so its checkpoints are deleted.
+        The others are kept for `resume`; stale ones are swept here too.
+        """
+        if state == "done":
+            self._store.forget(self.job_id)
+        else:
+            self._store.set_state(self.job_id, state)
+        self._store.sweep(checkpoint_ttl_s())
+
+
+def open_checkpoint(job_id: str, job_type: str, req: BaseModel) -> JobCheckpoint:
+    """
+    Register a starting (or resuming) job and load what it already finished.
+
+    A cancel requested while the job was still queued is honoured immediately.
+    """
+    if checkpoint_store.state(job_id) == "cancel_requested":
+        raise JobCancelled(f"job {job_id} cancelled")
+    checkpoint_store.register(job_id, job_type, request_json(req))
+    return JobCheckpoint(job_id)
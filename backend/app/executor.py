@@ -0,0 +1,279 @@
+"""
+Job executor - runs blocking job functions on a bounded worker pool
+
+Research, email generation and sending are all blocking (sync httpx,
+BeautifulSoup, provider SDKs, smtplib), so they must never run on the event
+loop. Jobs are queued per job type with their own concurrency limit; within a
+type, submitters take turns (round-robin) and each submitter's jobs run in
+priority order.
+
+When JOB_QUEUE_DB is set the API only enqueues (see app.job_queue) and
+`python -m app.worker` processes run the jobs.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+import heapq
+import itertools
+import os
+import threading
+
+from fastapi import Request
+from loguru import logger
+from pydantic import BaseModel
+
+from app.job_types import request_json, request_secrets, resolve_job_type
+from app.jobs import job_queue_db_path, job_store
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def default_limits() -> Dict[str, int]:
+    """Per-job-type worker limits, overridable via environment."""
+    return {
+        "research": _env_int("RESEARCH_CONCURRENCY", 2),
+        "emails": _env_int("EMAILS_CONCURRENCY", 4),
+        "emails_batch": _env_int("EMAILS_BATCH_CONCURRENCY", 4),  # mostly waiting on the Batch API
+        "send": _env_int("SEND_CONCURRENCY", 1),
+    }
+
+
+@dataclass(order=True)
+class _Task:
+    sort_key: int  # negated priority so higher priority pops first
+    seq: int
+    job_type: str = field(compare=False)
+    job_id: str = field(compare=False)
+    submitter: str = field(compare=False)
+    req: BaseModel = field(compare=False)
+
+
+class JobExecutor:
+    def __init__(self, limits: Dict[str, int]) -> None:
+        self._limits = dict(limits)
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Dict[str, List[_Task]]] = {t: {} for t in self._limits}
+        self._turns: Dict[str, Deque[str]] = {t: deque() for t in self._limits}
+        self._running: Dict[str, int] = {t: 0 for t in self._limits}
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def submit(
+        self,
+        job_type: str,
+        job_id: str,
+        req: BaseModel,
+        *,
+        priority: int = 0,
+        submitter: str = "anonymous",
+    ) -> None:
+        """Queue the runner for ``job_type`` to run on a worker thread."""
+        if job_type not in self._limits:
+            raise ValueError(f"unknown job type: {job_type}")
+        task = _Task(-priority, next(self._seq), job_type, job_id, submitter, req)
+        with self._cond:
+            queue = self._queues[job_type].setdefault(submitter, [])
+            heapq.heappush(queue, task)
+            if submitter not in self._turns[job_type]:
+                self._turns[job_type].append(submitter)
+            self._ensure_workers()
+            self._cond.notify()
+
+    def resubmit(
+        self,
+        job_type: str,
+        job_id: str,
+        req: BaseModel,
+        *,
+        priority: int = 0,
+        submitter: str = "anonymous",
+    ) -> None:
+        """Queue a job that ran before (resume); same as submit in process."""
+        self.submit(job_type, job_id, req, priority=priority, submitter=submitter)
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that has not started yet. Returns True if it was queued."""
+        with self._cond:
+            for job_type, queues in self._queues.items():
+                for submitter, queue in list(queues.items()):
+                    for task in queue:
+                        if task.job_id == job_id:
+                            queue.remove(task)
+                            heapq.heapify(queue)
+                            if not queue:
+                                del queues[submitter]
+                                self._turns[job_type].remove(submitter)
+                            return True
+        return False
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Number of queued (not yet running) jobs per job type."""
+        with self._cond:
+            return {t: sum(len(q) for q in queues.values()) for t, queues in self._queues.items()}
+
+    def running_counts(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(self._running)
+
+    def shutdown(self) -> None:
+        """
+        Stop workers once their current job finishes. Queued jobs are
+        dropped and marked as errors, so their status does not stay "queued".
+        """
+        with self._cond:
+            self._stopping = True
+            dropped = [task for queues in self._queues.values() for queue in queues.values() for task in queue]
+            self._queues = {t: {} for t in self._limits}
+            self._turns = {t: deque() for t in self._limits}
+            self._cond.notify_all()
+        for task in dropped:
+            self._abandon(task)
+
+    @staticmethod
+    def _abandon(task: _Task) -> None:
+        logger.warning(f"{task.job_type} job {task.job_id} dropped at shutdown before it started")
+        job_store.update(task.job_id, status="error", error="Server shut down before the job started; submit it again")
+
+    def _ensure_workers(self) -> None:
+        # Called with the lock held. One thread per slot across all job types;
+        # the per-type limits decide which slots may pick up which work.
+        wanted = sum(self._limits.values())
+        while len(self._threads) < wanted:
+            t = threading.Thread(target=self._worker, name=f"job-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _next_task(self) -> Optional[_Task]:
+        # Called with the lock held. For each job type with a free slot, the
+        # submitter whose turn it is offers its best task; the highest
+        # priority (then oldest) of those offers wins.
+        best: Optional[_Task] = None
+        for job_type, turns in self._turns.items():
+            if not turns or self._running[job_type] >= self._limits[job_type]:
+                continue
+            candidate = self._queues[job_type][turns[0]][0]
+            if best is None or candidate < best:
+                best = candidate
+        if best is None:
+            return None
+        turns = self._turns[best.job_type]
+        queue = self._queues[best.job_type][best.submitter]
+        heapq.heappop(queue)
+        turns.popleft()
+        if queue:
+            turns.append(best.submitter)
+        else:
+            del self._queues[best.job_type][best.submitter]
+        self._running[best.job_type] += 1
+        return best
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None and not self._stopping:
+                    self._cond.wait()
+                    task = self._next_task()
+                stopping = self._stopping
+                if stopping:
+                    if task is None:
+                        return
+                    self._running[task.job_type] -= 1
+            if stopping:
+                # Already taken off the queue, so shutdown() did not see it.
+                self._abandon(task)
+                return
+            try:
+                _, runner = resolve_job_type(task.job_type)
+                runner(task.job_id, task.req)
+            except Exception as exc:
+                logger.error(f"{task.job_type} job {task.job_id} crashed: {exc}")
+            finally:
+                with self._cond:
+                    self._running[task.job_type] -= 1
+                    self._cond.notify_all()
+
+
+def request_submitter(request: Request) -> str:
+    """Identify who submitted a job, for fair scheduling between clients."""
+    explicit = request.headers.get("x-submitter")
+    if explicit:
+        return explicit.strip()[:100]
+    return request.client.host if request.client else "anonymous"
+
+
+class QueueSubmitter:
+    """
+    Executor stand-in for worker mode: jobs are only enqueued in the durable
+    queue and run by separate `python -m app.worker` processes.
+    """
+
+    def __init__(self, queue) -> None:
+        self._queue = queue
+
+    def submit(
+        self,
+        job_type: str,
+        job_id: str,
+        req: BaseModel,
+        *,
+        priority: int = 0,
+        submitter: str = "anonymous",
+    ) -> None:
+        resolve_job_type(job_type)  # reject unknown types at submit time
+        self._warn_dropped_secrets(job_id, req)
+        self._queue.enqueue(job_type, job_id, request_json(req), priority=priority, submitter=submitter)
+
+    def resubmit(
+        self,
+        job_type: str,
+        job_id: str,
+        req: BaseModel,
+        *,
+        priority: int = 0,
+        submitter: str = "anonymous",
+    ) -> None:
+        """Queue a job that was queued before (resume); its queue row is reset."""
+        resolve_job_type(job_type)
+        self._warn_dropped_secrets(job_id, req)
+        self._queue.requeue(job_type, job_id, request_json(req), priority=priority, submitter=submitter)
+
+    @staticmethod
+    def _warn_dropped_secrets(job_id: str, req: BaseModel) -> None:
+        secrets = request_secrets(req)
+        if secrets:
+            logger.warning(
+                f"job {job_id}: {', '.join(sorted(secrets))} not stored in the job queue; "
+                "workers use the credentials from their environment"
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        return self._queue.cancel(job_id)
+
+    def queue_depths(self) -> Dict[str, int]:
+        return self._queue.queue_depths()
+
+    def running_counts(self) -> Dict[str, int]:
+        return self._queue.running_counts()
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _make_executor():
+    db_path = job_queue_db_path()
+    if db_path:
+        from app.job_queue import SqliteJobQueue
+        return QueueSubmitter(SqliteJobQueue(db_path))
+    return JobExecutor(default_limits())
+
+
+job_executor = _make_executor()
@@ -0,0 +1,180 @@
+"""
+Durable local job queue (SQLite) for out-of-process workers
+
+The API enqueues job requests; any number of `python -m app.worker`
+processes sharing the same database file claim and run them. A claim is a
+lease kept alive by heartbeats, so jobs held by a crashed worker go back to
+the queue once the lease expires.
+"""
+from __future__ import annotations
+
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import sqlite3
+import time
+
+from app.jobs import sqlite_connect
+
+
+@dataclass
+class QueuedJob:
+    job_id: str
+    job_type: str
+    payload: str  # request model as JSON, without credentials
+    priority: int
+    submitter: str
+    attempts: int
+
+
+class SqliteJobQueue:
+    def __init__(self, db_path: str, lease_s: float = 60.0) -> None:
+        self._db_path = db_path
+        self.lease_s = lease_s
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_queue (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL UNIQUE,
+                    job_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    submitter TEXT NOT NULL DEFAULT 'anonymous',
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    heartbeat_at REAL,
+                    enqueued_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_queue_state ON job_queue (state, job_type)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite_connect(self._db_path)
+
+    def enqueue(self, job_type: str, job_id: str, payload: str, *, priority: int = 0, submitter: str = "anonymous") -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO job_queue (job_id, job_type, payload, priority, submitter, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, job_type, payload, priority, submitter, time.time()),
+            )
+
+    def requeue(self, job_type: str, job_id: str, payload: str, *, priority: int = 0, submitter: str = "anonymous") -> None:
+        """Queue a job again (e.g. on resume), whether or not it already has a row."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO job_queue (job_id, job_type, payload, priority, submitter, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET state = 'queued', attempts = 0, job_type = excluded.job_type, "
+                "payload = excluded.payload, priority = excluded.priority, submitter = excluded.submitter, "
+                "worker_id = NULL, heartbeat_at = NULL, enqueued_at = excluded.enqueued_at",
+                (job_id, job_type, payload, priority, submitter, time.time()),
+            )
+
+    def claim(self, worker_id: str, limits: Dict[str, int]) -> Optional[QueuedJob]:
+        """
+        Claim the next runnable job, or return None.
+
+        Job types already at their limit (counted across all workers) are
+        skipped. Among the rest, higher priority wins, then the submitter with
+        the fewest jobs currently running, then the oldest job.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE job_queue SET state = 'queued', worker_id = NULL "
+                "WHERE state = 'claimed' AND heartbeat_at < ?",
+                (now - self.lease_s,),
+            )
+            running = {
+                r["job_type"]: r["n"]
+                for r in conn.execute(
+                    "SELECT job_type, COUNT(*) AS n FROM job_queue WHERE state = 'claimed' GROUP BY job_type"
+                )
+            }
+            eligible = [t for t, limit in limits.items() if running.get(t, 0) < limit]
+            row = None
+            if eligible:
+                placeholders = ",".join("?" for _ in eligible)
+                row = conn.execute(
+                    f"""
+                    SELECT q.* FROM job_queue q
+                    WHERE q.state = 'queued' AND q.job_type IN ({placeholders})
+                    ORDER BY q.priority DESC,
+                        (SELECT COUNT(*) FROM job_queue r WHERE r.submitter = q.submitter AND r.state = 'claimed') ASC,
+                        q.seq ASC
+                    LIMIT 1
+                    """,
+                    eligible,
+                ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE job_queue SET state = 'claimed', worker_id = ?, heartbeat_at = ?, attempts = attempts + 1 "
+                "WHERE seq = ?",
+                (worker_id, now, row["seq"]),
+            )
+            conn.execute("COMMIT")
+            return QueuedJob(
+                job_id=row["job_id"],
+                job_type=row["job_type"],
+                payload=row["payload"],
+                priority=row["priority"],
+                submitter=row["submitter"],
+                attempts=row["attempts"] + 1,
+            )
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, worker_id: str, job_ids: List[str]) -> None:
+        """Extend the lease on jobs this worker is still running."""
+        if not job_ids:
+            return
+        placeholders = ",".join("?" for _ in job_ids)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                f"UPDATE job_queue SET heartbeat_at = ? WHERE worker_id = ? AND state = 'claimed' "
+                f"AND job_id IN ({placeholders})",
+                [time.time(), worker_id, *job_ids],
+            )
+
+    def complete(self, job_id: str) -> None:
+        """Mark a job finished and drop its request; `requeue` stores it again on resume."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE job_queue SET state = 'done', payload = '{}', heartbeat_at = ? WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job that no worker has claimed yet. Returns True if it was queued."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE job_queue SET state = 'cancelled', payload = '{}' WHERE job_id = ? AND state = 'queued'",
+                (job_id,),
+            )
+            return cur.rowcount > 0
+
+    def queue_depths(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job_type, COUNT(*) AS n FROM job_queue WHERE state = 'queued' GROUP BY job_type"
+            ).fetchall()
+        return {r["job_type"]: r["n"] for r in rows}
+
+    def running_counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job_type, COUNT(*) AS n FROM job_queue WHERE state = 'claimed' GROUP BY job_type"
+            ).fetchall()
+        return {r["job_type"]: r["n"] for r in rows}
@@ -0,0 +1,50 @@
+"""
+Job type registry - maps job type names to request models and runner functions
+
+Runners are imported lazily so the executor, the durable queue and the
+worker process can all resolve them without import cycles with the routers.
+"""
+from typing import Callable, FrozenSet, Tuple, Type
+from pydantic import BaseModel
+
+JOB_TYPES = ("research", "emails", "emails_batch", "send")
+
+# Per-request credentials. They are never written to the job queue or the
+# checkpoint store; jobs read from disk fall back to the environment.
+SECRET_FIELDS: FrozenSet[str] = frozenset({"serper_key", "firecrawl_key", "sendgrid_key", "mailersend_key", "smtp_pass"})
+
+
+def request_json(req: BaseModel) -> str:
+    """The request as JSON for storing on disk, without its credentials."""
+    return req.json(exclude=set(SECRET_FIELDS & set(type(req).__fields__)))
+
+
+def request_secrets(req: BaseModel) -> FrozenSet[str]:
+    """Names of the credential fields set on a request."""
+    return frozenset(name for name in SECRET_FIELDS & set(type(req).__fields__) if getattr(req, name))
+
+
+def resolve_job_type(job_type: str) -> Tuple[Type[BaseModel], Callable[[str, BaseModel], None]]:
+    """
+    Return (request_model, runner) for a job type.
+
+    Raises:
+        ValueError: If the job type is unknown
+    """
+    if job_type == "research":
+        from app.models import ResearchStartRequest
+        from app.routers.research.run_research import _run_research
+        return ResearchStartRequest, _run_research
+    if job_type == "emails":
+        from app.models import EmailGenerateStartRequest
+        from app.routers.emails.run_generation import _run_email_generation
+        return EmailGenerateStartRequest, _run_email_generation
+    if job_type == "emails_batch":
+        from app.models import EmailGenerateStartRequest
+        from app.routers.emails.run_batch import _run_email_batch
+        return EmailGenerateStartRequest, _run_email_batch
+    if job_type == "send":
+        from app.models import SendStartRequest
+        from app.routers.send.run_send import _run_send
+        return SendStartRequest, _run_send
+    raise ValueError(f"unknown job type: {job_type}")
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
 from typing import Any, Dict, Optional
+from contextlib import closing
 from dataclasses import dataclass, field
+import json
+import os
+import sqlite3
 import threading
 import time
 import uuid
 
+from fastapi.encoders import jsonable_encoder
+
 
 @dataclass
 class Job:
     job_id: str
-    status: str = "queued"  # queued | running | done | error
+    status: str = "queued"  # queued | running | done | error | cancelling | cancelled
     progress: float = 0.0
     error: Optional[str] = None
     result: Any = None
     meta: Dict[str, Any] = field(default_factory=dict)
+    version: int = 0  # bumped on every update; used for status ETags
 
 
 class JobStore:
@@ -22,8 +29,8 @@ class JobStore:
         self._jobs: Dict[str, Job] = {}
         self._lock = threading.Lock()
 
-    def create(self) -> Job:
-        job = Job(job_id=str(uuid.uuid4()))
+    def create(self, job_id: Optional[str] = None) -> Job:
+        job = Job(job_id=job_id or str(uuid.uuid4()))
         with self._lock:
             self._jobs[job.job_id] = job
         return job
@@ -39,8 +46,118 @@ class JobStore:
                 return
             for k, v in kwargs.items():
                 setattr(job, k, v)
+            job.version += 1
+
+
+def sqlite_connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection suited to several processes sharing one database file."""
+    parent = os.path.dirname(db_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SqliteJobStore(JobStore):
+    """
+    Job store shared between the API and worker processes.
+
+    Results and meta are stored as JSON, so rows come back as plain dicts
+    rather than the Pydantic models the runners stored.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self._db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL,
+                    error TEXT,
+                    result TEXT,
+                    meta TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite_connect(self._db_path)
+
+    def create(self, job_id: Optional[str] = None) -> Job:
+        job = Job(job_id=job_id or str(uuid.uuid4()))
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, progress, error, result, meta, version, updated_at) "
+                "VALUES (?, ?, ?, NULL, NULL, '{}', 0, ?)",
+                (job.job_id, job.status, job.progress, time.time()),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id: str, **kwargs: Any) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row:
+                conn.execute("ROLLBACK")
+                return
+            job = self._row_to_job(row)
+            for k, v in kwargs.items():
+                setattr(job, k, v)
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, error = ?, result = ?, meta = ?, "
+                "version = version + 1, updated_at = ? WHERE job_id = ?",
+                (
+                    job.status,
+                    job.progress,
+                    job.error,
+                    None if job.result is None else json.dumps(jsonable_encoder(job.result)),
+                    json.dumps(jsonable_encoder(job.meta or {})),
+                    time.time(),
+                    job_id,
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            job_id=row["job_id"],
+            status=row["status"],
+            progress=row["progress"],
+            error=row["error"],
+            result=None if row["result"] is None else json.loads(row["result"]),
+            meta=json.loads(row["meta"] or "{}"),
+            version=row["version"],
+        )
+
+
+def job_queue_db_path() -> Optional[str]:
+    """Path of the shared job database; set JOB_QUEUE_DB to enable worker mode."""
+    return os.getenv("JOB_QUEUE_DB") or None
 
 
-job_store = JobStore()
+def _make_job_store() -> JobStore:
+    db_path = job_queue_db_path()
+    return SqliteJobStore(db_path) if db_path else JobStore()
 
 
+job_store = _make_job_store()
@@ -12,9 +12,15 @@ load_dotenv(env_path)
 from app.routers.research.start_research import router as research_start_router
 from app.routers.research.status import router as research_status_router
 from app.routers.emails.start_generation import router as emails_start_router
+from app.routers.emails.start_batch import router as emails_batch_router
 from app.routers.emails.status import router as emails_status_router
+from app.routers.emails.stream import router as emails_stream_router
 from app.routers.send.start_send import router as send_start_router
 from app.routers.send.status import router as send_status_router
+from app.routers.jobs.resume import router as jobs_resume_router
+from app.routers.jobs.cancel import router as jobs_cancel_router
+from app.routers.metrics.export import router as metrics_router
+from app.executor import job_executor
 
 
 class HealthResponse(BaseModel):
@@ -49,13 +55,21 @@ def create_app() -> FastAPI:
     def health() -> HealthResponse:
         return HealthResponse(status="ok", service="ai-backlinker", version=app.version or "0.0.0")
 
+    # Let in-flight job workers wind down instead of picking up new work
+    app.add_event_handler("shutdown", job_executor.shutdown)
+
     # Include individual router functions
     app.include_router(research_start_router)
     app.include_router(research_status_router)
     app.include_router(emails_start_router)
+    app.include_router(emails_batch_router)
     app.include_router(emails_status_router)
+    app.include_router(emails_stream_router)
     app.include_router(send_start_router)
     app.include_router(send_status_router)
+    app.include_router(jobs_resume_router)
+    app.include_router(jobs_cancel_router)
+    app.include_router(metrics_router)
 
     return app
 
@@ -13,6 +13,7 @@ class ResearchStartRequest(BaseModel):
 
     # Optional CSV output path; if not set, defaults to data/research_{job_id}.csv
     out_csv: Optional[str] = Field(None, description="Optional path to auto-save results as CSV")
+    priority: int = Field(0, ge=-10, le=10, description="Scheduling priority; higher runs first")
 
 
 class ResearchResultRow(BaseModel):
@@ -55,6 +56,10 @@ class ResearchJobStatusResponse(BaseModel):
     error: Optional[str] = None
     results: Optional[List[ResearchResultRow]] = None
     saved_csv_path: Optional[str] = None
+    total_results: Optional[int] = Field(None, description="Number of result rows before paging")
+    timings: Optional[Dict[str, Any]] = Field(None, description="Per-stage timing breakdown (wall_s, stages, slowest)")
+    offset: int = 0
+    limit: Optional[int] = None
 
 
 # Phase 3: Email generation
@@ -70,11 +75,20 @@ class EmailGenerateStartRequest(BaseModel):
     your_name: str = Field("John Doe")
     your_email: str = Field("john@example.com")
     topic: Optional[str] = Field(None, description="Proposed topic (optional)")
-    take: int = Field(5, ge=1, le=100)
+    keyword: Optional[str] = Field(None, description="Campaign keyword rows are ranked by (default: the research job's keyword)")
+    take: int = Field(5, ge=1, le=100, description="Most relevant rows to draft for from a research job (rows and selected_urls are all drafted)")
 
     # LLM config
     provider: str = Field("gemini")
     model: Optional[str] = Field(None)
+    fresh: bool = Field(False, description="Bypass the LLM response cache and draft every row again")
+    batch_size: int = Field(1, ge=1, le=20, description="Sites drafted per LLM request (1 = one request per email)")
+    hedge: Optional[bool] = Field(None, description="Send a duplicate request to the other provider when the primary is slower than its p95 (default: LLM_HEDGE)")
+    stream: bool = Field(False, description="Stream drafts into live previews (status `previews`, /emails/generate/stream/{job_id}); batch_size 1 only")
+    template: Optional[str] = Field(None, description="Email body with {slots}; the LLM only writes {research_hook}, {topic_pitch} and {value_prop}")
+    summarize: Optional[bool] = Field(None, description="Summarize each page once (cached by URL and content) and draft from the summary (default: PAGE_SUMMARIES)")
+
+    priority: int = Field(0, ge=-10, le=10, description="Scheduling priority; higher runs first")
 
 
 class EmailRow(BaseModel):
@@ -90,6 +104,12 @@ class EmailRow(BaseModel):
     note: str
     provider: str
     model: str
+    prompt_tokens: int = 0
+    relevance: float = 0.0
+    completion_tokens: int = 0
+    llm_latency_s: float = 0.0
+    llm_attempts: int = 0
+    cost_usd: Optional[float] = None
 
 
 class EmailGenerateStartResponse(BaseModel):
@@ -103,6 +123,13 @@ class EmailGenerateStatusResponse(BaseModel):
     error: Optional[str] = None
     results: Optional[List[EmailRow]] = None
     saved_csv_path: Optional[str] = None
+    total_results: Optional[int] = Field(None, description="Number of result rows before paging")
+    timings: Optional[Dict[str, Any]] = Field(None, description="Per-stage timing breakdown (wall_s, stages, slowest)")
+    llm_usage: Optional[Dict[str, Any]] = Field(None, description="LLM calls, retries, tokens, latency and estimated cost of the job, in total and by provider/model")
+    batch: Optional[Dict[str, Any]] = Field(None, description="OpenAI batch (id, status, request_counts) of a batch job")
+    previews: Optional[Dict[str, Any]] = Field(None, description="Drafts streaming in, by row index (url, body so far, done) while a streamed job runs")
+    offset: int = 0
+    limit: Optional[int] = None
 
 
 # Phase 4: Sending
@@ -123,6 +150,7 @@ class SendStartRequest(BaseModel):
 
     rate_limit_per_sec: float = Field(10.0, ge=0.1, le=100.0)
     dry_run: bool = False
+    concurrency: Optional[int] = Field(None, ge=1, le=20, description="Parallel SMTP connections (SMTP only; default SMTP_CONCURRENCY)")
 
     # Provider-specific (optional - will use environment variables for SMTP)
     sandbox: Optional[bool] = Field(None, description="SendGrid sandbox mode")
@@ -137,6 +165,7 @@ class SendStartRequest(BaseModel):
 
     # Output
     out_csv: Optional[str] = Field(None, description="Where to save outcomes CSV (default data/send_{job_id}.csv)")
+    priority: int = Field(0, ge=-10, le=10, description="Scheduling priority; higher runs first")
 
 
 class SendStartResponse(BaseModel):
@@ -150,5 +179,25 @@ class SendStatusResponse(BaseModel):
     error: Optional[str] = None
     results: Optional[List[dict]] = None
     saved_csv_path: Optional[str] = None
+    total_results: Optional[int] = Field(None, description="Number of result rows before paging")
+    timings: Optional[Dict[str, Any]] = Field(None, description="Per-stage timing breakdown (wall_s, stages, slowest)")
+    offset: int = 0
+    limit: Optional[int] = None
+
+
+
 
+# Job control (resume / cancel)
 
+class JobResumeRequest(BaseModel):
+    """Credentials are not checkpointed; pass them again or rely on env."""
+    serper_key: Optional[str] = None
+    firecrawl_key: Optional[str] = None
+    sendgrid_key: Optional[str] = None
+    mailersend_key: Optional[str] = None
+    smtp_pass: Optional[str] = Field(None, description="SMTP password (optional - uses SMTP_PASS from .env)")
+
+
+class JobActionResponse(BaseModel):
+    job_id: str
+    status: str
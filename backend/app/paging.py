@@ -0,0 +1,87 @@
+"""
+Paging and conditional-request helpers shared by the job status endpoints
+"""
+from typing import Any, List, Optional, Tuple
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.jobs import Job
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated ``fields`` query parameter into column names."""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return names or None
+
+
+def status_etag(job: Job, offset: int, limit: Optional[int], fields: Optional[List[str]]) -> str:
+    """
+    Build the ETag for a status response.
+
+    The tag changes whenever the job is updated (``Job.version``) and also
+    differs per page/projection, so a cached first page never satisfies a
+    request for the second one.
+    """
+    view = f"{offset}:{limit}:{','.join(fields or [])}"
+    digest = hashlib.sha1(f"{job.job_id}:{view}".encode("utf-8")).hexdigest()[:12]
+    return f'W/"{job.version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Return True if the request's If-None-Match header matches ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def page_results(
+    results: Optional[List[Any]],
+    offset: int,
+    limit: Optional[int],
+    fields: Optional[List[str]],
+) -> Tuple[Optional[List[Any]], Optional[int]]:
+    """
+    Slice a job's result list and optionally project each row to ``fields``.
+
+    Returns:
+        (page, total) where total is the unpaged row count. Projected rows are
+        plain dicts; unprojected rows are returned as stored.
+    """
+    if results is None:
+        return None, None
+    total = len(results)
+    end = offset + limit if limit is not None else None
+    page = results[offset:end]
+    if fields:
+        projected = []
+        for r in page:
+            data = jsonable_encoder(r)
+            projected.append({k: data.get(k) for k in fields})
+        page = projected
+    return page, total
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag."""
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def status_response(payload: BaseModel, page: Optional[List[Any]], projected: bool, etag: str) -> JSONResponse:
+    """
+    Serialize a status model with its ETag.
+
+    Projected pages are dicts with a subset of columns and therefore cannot be
+    validated against the row models, so they are attached after encoding.
+    """
+    content = jsonable_encoder(payload)
+    if projected:
+        content["results"] = page
+    return JSONResponse(content=content, headers={"ETag": etag})
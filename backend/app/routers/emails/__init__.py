@@ -2,6 +2,8 @@
 Emails router package - handles email generation operations
 """
 from .start_generation import start_email_generation
+from .start_batch import start_email_batch
 from .status import email_generation_status
+from .stream import email_generation_stream
 
-__all__ = ['start_email_generation', 'email_generation_status']
+__all__ = ['start_email_generation', 'start_email_batch', 'email_generation_status', 'email_generation_stream']
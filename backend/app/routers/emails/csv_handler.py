@@ -3,17 +3,27 @@ CSV handling utilities for email generation results
 """
 from pathlib import Path
 import csv
+import json
 from loguru import logger
-from typing import List
+from typing import Any, Dict, List, Optional
 
-def save_emails_csv(emails: List[dict], out_csv: str | None, job_id: str) -> str | None:
+def save_emails_csv(
+    emails: List[dict], out_csv: str | None, job_id: str, llm_usage: Optional[Dict[str, Any]] = None
+) -> str | None:
     """
     Save email generation results to CSV file.
+
+    With ``llm_usage`` (the job's usage summary), the job totals are written
+    next to the CSV as ``<name>.usage.json``. They cover what the per-draft
+    columns cannot: page summary calls, failed and retried calls, and the
+    tokens a batch actually reported. A totals row would be sent as an email
+    if the CSV were fed to /send/start, so they are kept out of it.
     
     Args:
         emails: List of generated email data
         out_csv: Optional output CSV path
         job_id: Job ID for default naming
+        llm_usage: Job LLM usage totals (llm.usage.UsageTotals.summary())
         
     Returns:
         str | None: Path to saved CSV file, or None if failed
@@ -29,7 +39,7 @@ def save_emails_csv(emails: List[dict], out_csv: str | None, job_id: str) -> str
             out_file.parent.mkdir(parents=True, exist_ok=True)
         with out_file.open("w", newline="", encoding="utf-8-sig") as f:
             fieldnames = [
-                "to_email","subject","body","url","domain","title","context_source","excerpt_chars","status","note","provider","model"
+                "to_email","subject","body","url","domain","title","context_source","excerpt_chars","status","note","provider","model","prompt_tokens","completion_tokens","llm_latency_s","llm_attempts","cost_usd","relevance"
             ]
             writer = csv.DictWriter(
                 f,
@@ -44,6 +54,9 @@ def save_emails_csv(emails: List[dict], out_csv: str | None, job_id: str) -> str
                 rec["body"] = (rec.get("body") or "").replace("\r"," ").replace("\n"," ")[:4000]
                 writer.writerow(rec)
         saved_path = str(out_file.resolve())
+        if llm_usage is not None:
+            usage_file = out_file.with_suffix(".usage.json")
+            usage_file.write_text(json.dumps({"job_id": job_id, "llm_usage": llm_usage}, indent=2), encoding="utf-8")
     except Exception as exc:
         logger.warning(f"auto-save emails CSV failed: {exc}")
     
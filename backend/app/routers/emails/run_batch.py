@@ -0,0 +1,129 @@
+"""
+Run batch email generation job - drafts a campaign through the OpenAI Batch API
+"""
+import os
+import httpx
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from app.models import EmailGenerateStartRequest, EmailRow
+from app.jobs import job_store
+from app.checkpoints import JobCancelled, open_checkpoint
+from observability import job_timings, stage, record_provider_error, error_code
+from emails import generate_emails_via_batch
+from llm.core import _get_openai_api_key
+from llm.openai_batch import OpenAIBatchClient, wait_for_batch
+from llm.summaries import ensure_page_summaries
+from llm.usage import usage_scope
+from .csv_handler import save_emails_csv
+from .run_generation import _select_rows
+
+
+def _poll_interval_s() -> float:
+    try:
+        return max(0.1, float(os.getenv("OPENAI_BATCH_POLL_S", "30")))
+    except ValueError:
+        return 30.0
+
+
+def _batch_meta(batch: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": batch.get("id"), "status": batch.get("status"), "request_counts": batch.get("request_counts")}
+
+
+def _run_email_batch(job_id: str, req: EmailGenerateStartRequest) -> None:
+    """
+    Execute a batch email generation job on a job executor worker thread.
+
+    The batch id is checkpointed as soon as the batch is created, so a
+    resumed job (after a restart or error) picks up the same batch instead
+    of submitting and paying for it again. Cancelling the job cancels the
+    batch. While waiting, ``meta["batch"]`` carries its id, status and
+    request counts.
+
+    Args:
+        job_id: Unique identifier for the job
+        req: Email generation request parameters (provider must be OpenAI)
+    """
+    checkpoint = None
+    meta: Dict[str, Any] = {}
+    with job_timings(job_id, "emails_batch") as timings, usage_scope() as usage:
+        try:
+            job_store.update(job_id, status="running", progress=0.05)
+            checkpoint = open_checkpoint(job_id, "emails_batch", req)
+            selected = _select_rows(req)
+            # Summaries already made are reused; new ones would need real-time requests.
+            if req.summarize is not False:
+                ensure_page_summaries(selected, generate=False)
+            key = _get_openai_api_key()
+            if not key:
+                raise ValueError("OPENAI_API_KEY is required for batch generation")
+            client = OpenAIBatchClient(key)
+
+            def on_status(batch: Dict[str, Any]) -> None:
+                meta.update(batch=_batch_meta(batch), timings=timings.summary(), llm_usage=usage.summary())
+                counts = batch.get("request_counts") or {}
+                total = counts.get("total") or 0
+                finished = (counts.get("completed") or 0) + (counts.get("failed") or 0)
+                progress = 0.2 + 0.6 * finished / total if total else 0.2
+                job_store.update(job_id, progress=progress, meta=dict(meta))
+
+            def run_batch(lines: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+                recorded = checkpoint.done.get("batch")
+                if recorded:
+                    batch_id = recorded["id"]
+                    logger.info(f"batch email job {job_id} resuming OpenAI batch {batch_id}")
+                else:
+                    with stage("openai_batch_submit"):
+                        batch = client.submit(lines, metadata={"job_id": job_id})
+                    batch_id = batch["id"]
+                    # No cancel check here: the wait below cancels the batch itself.
+                    checkpoint.record("batch", {"id": batch_id, "requests": len(lines)}, check_cancel=False)
+                    on_status(batch)
+                batch = wait_for_batch(
+                    client,
+                    batch_id,
+                    poll_interval_s=_poll_interval_s(),
+                    on_status=on_status,
+                    check_stop=checkpoint.raise_if_cancelled,
+                )
+                if batch.get("status") != "completed":
+                    logger.warning(f"OpenAI batch {batch_id} ended {batch.get('status')}; unanswered rows are drafted in real time")
+                with stage("openai_batch_results"):
+                    return client.results(batch)
+
+            def on_draft(done: int, total: int) -> None:
+                meta.update(timings=timings.summary(), llm_usage=usage.summary())
+                job_store.update(job_id, progress=0.8 + 0.15 * done / total, meta=dict(meta))
+
+            try:
+                emails = generate_emails_via_batch(
+                    selected,
+                    subject=req.subject,
+                    your_name=req.your_name,
+                    your_email=req.your_email,
+                    proposed_topic=req.topic,
+                    run_batch=run_batch,
+                    model=req.model,
+                    fresh=req.fresh,
+                    on_draft=on_draft,
+                )
+            except httpx.HTTPError as exc:
+                record_provider_error("openai", error_code(exc))
+                raise
+            finally:
+                client.close()
+            rows_out = [EmailRow(**e) for e in emails]
+            saved_path = save_emails_csv(emails, None, job_id, usage.summary())  # Use default path
+
+            meta.update(saved_csv_path=saved_path, timings=timings.summary(), llm_usage=usage.summary())
+            job_store.update(job_id, status="done", progress=1.0, result=rows_out, meta=dict(meta))
+            checkpoint.finish("done")
+        except JobCancelled:
+            logger.info(f"batch email job {job_id} cancelled")
+            job_store.update(job_id, status="cancelled", meta={**meta, "timings": timings.summary(), "llm_usage": usage.summary()})
+            if checkpoint:
+                checkpoint.finish("cancelled")
+        except Exception as exc:
+            logger.error(f"batch email job failed: {exc}")
+            job_store.update(job_id, status="error", error=str(exc), meta={**meta, "timings": timings.summary(), "llm_usage": usage.summary()})
+            if checkpoint:
+                checkpoint.finish("error")
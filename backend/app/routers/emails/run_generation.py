@@ -1,67 +1,189 @@
 """
 Run email generation job - orchestrates email creation process
 """
-from typing import List
+from typing import Any, Dict, List
+import os
+import threading
+import time
 from loguru import logger
 from app.models import EmailGenerateStartRequest, EmailRow
 from app.jobs import job_store
+from observability import job_timings
 from app.models import ResearchResultRow
 from .csv_handler import save_emails_csv
-from emails import generate_emails_for_rows
+from emails import generate_emails_for_rows, generate_emails_from_template
+from emails.templates import TEMPLATE_BATCH_SIZE
+from llm.summaries import ensure_page_summaries, summaries_enabled
+from llm.usage import usage_scope
+from scraping import relevance_scores
+
+
+def _select_rows(req: EmailGenerateStartRequest) -> List[dict]:
+    """
+    Rows to draft for: the request's rows, or a finished research job's
+    (optionally limited to selected_urls).
+
+    Rows are ranked by BM25 relevance of their title and excerpt to the
+    campaign keyword and topic (see scraping.relevance); among equally
+    relevant rows, those with a contact email come first. Each row gets its
+    ``relevance`` score. Only research rows that were not picked with
+    selected_urls are cut to the ``take`` best; rows passed in ``rows`` and
+    selected URLs are all drafted.
+
+    Raises:
+        ValueError: If neither source is usable
+    """
+    # Build source rows
+    rows: List[dict]
+    keyword = req.keyword
+    if req.rows:
+        rows = [r.dict() if hasattr(r, "dict") else r for r in req.rows]
+    elif req.research_job_id:
+        rjob = job_store.get(req.research_job_id)
+        if not rjob or rjob.status != "done" or not rjob.result:
+            raise ValueError("research_job_id not found or not done")
+        src = [r.dict() if hasattr(r, "dict") else r for r in rjob.result]
+        keyword = keyword or (rjob.meta or {}).get("keyword")
+        if req.selected_urls:
+            urls_set = set(req.selected_urls)
+            rows = [r for r in src if (r.get("url") in urls_set)]
+        else:
+            rows = src
+    else:
+        raise ValueError("Provide either rows or research_job_id")
+
+    # Most relevant first; ties go to rows with contact_email
+    query = " ".join(q for q in (keyword, req.topic) if q)
+    for row, score in zip(rows, relevance_scores(rows, query)):
+        row["relevance"] = round(score, 3)
+    ranked = sorted(rows, key=lambda r: (-r["relevance"], not r.get("contact_email")))
+    # Explicit rows and selected URLs are drafted in full, as before ranking.
+    return ranked if req.rows or req.selected_urls else ranked[:req.take]
+
+
+def _store_summaries(req: EmailGenerateStartRequest, rows: List[dict]) -> None:
+    """Copy new page summaries onto the research job's rows, so its status shows them."""
+    found = {r.get("url"): r for r in rows if r.get("page_summary")}
+    rjob = job_store.get(req.research_job_id) if req.research_job_id and found else None
+    if not rjob or not rjob.result:
+        return
+    changed = False
+    out = []
+    for r in rjob.result:
+        row = r.dict() if hasattr(r, "dict") else dict(r)
+        summarized = found.get(row.get("url"))
+        if summarized and row.get("page_summary") != summarized["page_summary"]:
+            row["page_summary"] = summarized["page_summary"]
+            row["content_highlights"] = list(summarized.get("content_highlights") or [])
+            changed = True
+        out.append(ResearchResultRow(**row))
+    if changed:
+        job_store.update(req.research_job_id, result=out)
+
+
+def _preview_interval_s() -> float:
+    try:
+        return max(0.0, float(os.getenv("DRAFT_PREVIEW_INTERVAL_S", "0.25")))
+    except ValueError:
+        return 0.25
+
 
 def _run_email_generation(job_id: str, req: EmailGenerateStartRequest) -> None:
     """
-    Execute the email generation job in the background.
+    Execute the email generation job on a job executor worker thread.
+
+    Unless ``req.summarize`` is false, pages without a summary are
+    summarized first (see llm.summaries) and drafted from the summary.
+
+    With ``req.stream`` (and batch_size 1), partial draft bodies go into
+    ``meta["previews"]`` (row index -> url, body, done) as they stream in,
+    at most every DRAFT_PREVIEW_INTERVAL_S seconds. The previews are
+    dropped from meta once the job has its results.
+
+    ``meta["llm_usage"]`` totals the job's LLM calls: tokens, latency,
+    retries and estimated cost (see llm.usage).
     
     Args:
         job_id: Unique identifier for the job
         req: Email generation request parameters
     """
-    try:
-        job_store.update(job_id, status="running", progress=0.05)
-
-        # Build source rows
-        rows: List[dict]
-        if req.rows:
-            rows = [r.dict() if hasattr(r, "dict") else r for r in req.rows]
-        elif req.research_job_id:
-            rjob = job_store.get(req.research_job_id)
-            if not rjob or rjob.status != "done" or not rjob.result:
-                raise ValueError("research_job_id not found or not done")
-            src = [r.dict() if hasattr(r, "dict") else r for r in rjob.result]
-            if req.selected_urls:
-                urls_set = set(req.selected_urls)
-                rows = [r for r in src if (r.get("url") in urls_set)]
+    with job_timings(job_id, "emails") as timings, usage_scope() as usage:
+        try:
+            job_store.update(job_id, status="running", progress=0.05)
+
+            selected = _select_rows(req)
+
+            # Summarize pages not seen before; drafts then use the summaries
+            if req.summarize if req.summarize is not None else summaries_enabled():
+                job_store.update(job_id, progress=0.1)
+                ensure_page_summaries(selected, provider=req.provider, model=req.model)
+                _store_summaries(req, selected)
+
+            # Generate
+            job_store.update(job_id, progress=0.2)
+
+            previews: Dict[str, Dict[str, Any]] = {}
+            lock = threading.Lock()
+            last_push = [0.0]
+            interval = _preview_interval_s()
+
+            def meta() -> Dict[str, Any]:
+                out: Dict[str, Any] = {"timings": timings.summary(), "llm_usage": usage.summary()}
+                if previews:
+                    out["previews"] = {k: dict(v) for k, v in previews.items()}
+                return out
+
+            def on_draft(done: int, total: int) -> None:
+                with lock:
+                    last_push[0] = time.monotonic()
+                    job_store.update(job_id, progress=0.2 + 0.75 * done / total, meta=meta())
+
+            def on_preview(index: int, body: str, done: bool) -> None:
+                with lock:
+                    previews[str(index)] = {"url": selected[index].get("url", ""), "body": body, "done": done}
+                    # Finished drafts are pushed by on_draft, which follows.
+                    if not done and time.monotonic() - last_push[0] >= interval:
+                        last_push[0] = time.monotonic()
+                        job_store.update(job_id, meta=meta())
+
+            if req.template is not None:
+                emails = generate_emails_from_template(
+                    selected,
+                    req.template,
+                    subject=req.subject,
+                    your_name=req.your_name,
+                    your_email=req.your_email,
+                    proposed_topic=req.topic,
+                    provider=req.provider,
+                    model=req.model,
+                    on_draft=on_draft,
+                    fresh=req.fresh,
+                    batch_size=req.batch_size if req.batch_size > 1 else TEMPLATE_BATCH_SIZE,
+                    hedge=req.hedge,
+                )
             else:
-                rows = src
-        else:
-            raise ValueError("Provide either rows or research_job_id")
-
-        # Prefer rows with contact_email
-        with_email = [r for r in rows if r.get("contact_email")] 
-        others = [r for r in rows if not r.get("contact_email")]
-        # Generate emails for ALL selected URLs, not limited by take parameter
-        selected = with_email + others
-
-        # Generate
-        job_store.update(job_id, progress=0.2)
-        emails = generate_emails_for_rows(
-            selected,
-            subject=req.subject,
-            your_name=req.your_name,
-            your_email=req.your_email,
-            proposed_topic=req.topic,
-            provider=req.provider,
-            model=req.model,
-            gemini_api_key=None,  # Use environment variable
-            openai_api_key=None,  # Use environment variable
-        )
-        rows_out = [EmailRow(**e) for e in emails]
-
-        # Save CSV using the extracted function
-        saved_path = save_emails_csv(emails, None, job_id)  # Use default path
-
-        job_store.update(job_id, status="done", progress=1.0, result=rows_out, meta={"saved_csv_path": saved_path})
-    except Exception as exc:
-        logger.error(f"email generation job failed: {exc}")
-        job_store.update(job_id, status="error", error=str(exc))
+                emails = generate_emails_for_rows(
+                    selected,
+                    subject=req.subject,
+                    your_name=req.your_name,
+                    your_email=req.your_email,
+                    proposed_topic=req.topic,
+                    provider=req.provider,
+                    model=req.model,
+                    gemini_api_key=None,  # Use environment variable
+                    openai_api_key=None,  # Use environment variable
+                    on_draft=on_draft,
+                    fresh=req.fresh,
+                    batch_size=req.batch_size,
+                    hedge=req.hedge,
+                    on_preview=on_preview if req.stream else None,
+                )
+            rows_out = [EmailRow(**e) for e in emails]
+
+            # Save CSV using the extracted function
+            saved_path = save_emails_csv(emails, None, job_id, usage.summary())  # Use default path
+
+            job_store.update(job_id, status="done", progress=1.0, result=rows_out, meta={"saved_csv_path": saved_path, "timings": timings.summary(), "llm_usage": usage.summary()})
+        except Exception as exc:
+            logger.error(f"email generation job failed: {exc}")
+            job_store.update(job_id, status="error", error=str(exc), meta={"timings": timings.summary(), "llm_usage": usage.summary()})
@@ -0,0 +1,41 @@
+"""
+Start batch email generation endpoint - queues a campaign for the OpenAI Batch API
+"""
+from fastapi import APIRouter, HTTPException, Request
+from app.models import EmailGenerateStartRequest, EmailGenerateStartResponse
+from app.jobs import job_store
+from app.executor import job_executor, request_submitter
+
+router = APIRouter(prefix="/emails", tags=["emails"])
+
+@router.post("/batch/start", response_model=EmailGenerateStartResponse, summary="Start batch email generation job")
+def start_email_batch(req: EmailGenerateStartRequest, request: Request) -> EmailGenerateStartResponse:
+    """
+    Start an email generation job that drafts through the OpenAI Batch API.
+
+    Results arrive within 24 hours at batch pricing; poll
+    /emails/generate/status/{job_id} as for a real-time job.
+
+    Args:
+        req: Email generation request parameters (provider must be OpenAI)
+        request: Incoming request (identifies the submitter for fair scheduling)
+
+    Returns:
+        EmailGenerateStartResponse: Job ID for tracking
+
+    Raises:
+        HTTPException: 400 if the provider is not OpenAI, or a template is given
+    """
+    if (req.provider or "").strip().lower() != "openai":
+        raise HTTPException(status_code=400, detail="batch generation is only available with provider 'openai'")
+    if req.template is not None:
+        raise HTTPException(status_code=400, detail="templates are drafted in real time; use /emails/generate/start")
+    job = job_store.create()
+    job_executor.submit(
+        "emails_batch",
+        job.job_id,
+        req,
+        priority=req.priority,
+        submitter=request_submitter(request),
+    )
+    return EmailGenerateStartResponse(job_id=job.job_id)
@@ -1,25 +1,40 @@
 """
-Start email generation endpoint - creates and queues email generation jobs
+Start email generation endpoint - creates email generation jobs and queues them on the job executor
 """
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Request
 from app.models import EmailGenerateStartRequest, EmailGenerateStartResponse
 from app.jobs import job_store
-from .run_generation import _run_email_generation
+from app.executor import job_executor, request_submitter
+from emails import validate_template
 
 router = APIRouter(prefix="/emails", tags=["emails"])
 
 @router.post("/generate/start", response_model=EmailGenerateStartResponse, summary="Start email generation job")
-def start_email_generation(req: EmailGenerateStartRequest, bg: BackgroundTasks) -> EmailGenerateStartResponse:
+def start_email_generation(req: EmailGenerateStartRequest, request: Request) -> EmailGenerateStartResponse:
     """
     Start a new email generation job.
     
     Args:
         req: Email generation request parameters
-        bg: Background task manager
+        request: Incoming request (identifies the submitter for fair scheduling)
         
     Returns:
         EmailGenerateStartResponse: Job ID for tracking
+
+    Raises:
+        HTTPException: 400 if the template uses an unknown slot
     """
+    if req.template is not None:
+        try:
+            validate_template(req.template)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
     job = job_store.create()
-    bg.add_task(_run_email_generation, job.job_id, req)
+    job_executor.submit(
+        "emails",
+        job.job_id,
+        req,
+        priority=req.priority,
+        submitter=request_submitter(request),
+    )
     return EmailGenerateStartResponse(job_id=job.job_id)
@@ -1,37 +1,62 @@
 """
 Email generation status endpoint - provides job progress and results
 """
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.models import EmailGenerateStatusResponse
 from app.jobs import job_store
+from app.paging import parse_fields, status_etag, etag_matches, page_results, not_modified, status_response
 
 router = APIRouter(prefix="/emails", tags=["emails"])
 
 @router.get("/generate/status/{job_id}", response_model=EmailGenerateStatusResponse, summary="Get email generation job status")
-def email_generation_status(job_id: str) -> EmailGenerateStatusResponse:
+def email_generation_status(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0, description="Index of the first result row to return"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of result rows to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated result columns to include"),
+):
     """
     Get the status and results of an email generation job.
-    
+
     Args:
         job_id: Unique identifier for the job
-        
+        request: Incoming request (for If-None-Match)
+        offset: Index of the first result row to return
+        limit: Maximum number of result rows to return (all if omitted)
+        fields: Comma-separated result columns to include (all if omitted)
+
     Returns:
-        EmailGenerateStatusResponse: Job status and results
-        
+        EmailGenerateStatusResponse: Job status and results, or 304 if unchanged
+
     Raises:
         HTTPException: If job not found
     """
     job = job_store.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="job not found")
+    field_names = parse_fields(fields)
+    etag = status_etag(job, offset, limit, field_names)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     saved_csv_path = None
     if job.status == "done":
         saved_csv_path = (job.meta or {}).get("saved_csv_path")
-    return EmailGenerateStatusResponse(
+    page, total = page_results(job.result if job.status == "done" else None, offset, limit, field_names)
+    payload = EmailGenerateStatusResponse(
         job_id=job.job_id,
         status=job.status,
         progress=job.progress,
         error=job.error,
-        results=job.result if job.status == "done" else None,
+        results=None if field_names else page,
         saved_csv_path=saved_csv_path,
+        total_results=total,
+        timings=(job.meta or {}).get("timings"),
+        llm_usage=(job.meta or {}).get("llm_usage"),
+        batch=(job.meta or {}).get("batch"),
+        previews=(job.meta or {}).get("previews") if job.status != "done" else None,
+        offset=offset,
+        limit=limit,
     )
+    return status_response(payload, page, bool(field_names), etag)
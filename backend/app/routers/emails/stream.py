@@ -0,0 +1,89 @@
+"""
+Email generation stream endpoint - live draft previews as Server-Sent Events
+"""
+from typing import Any, AsyncIterator, Dict
+import asyncio
+import json
+import time
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.jobs import job_store
+
+router = APIRouter(prefix="/emails", tags=["emails"])
+
+_POLL_S = 0.2
+_KEEPALIVE_S = 15.0
+_FINAL_STATUSES = ("done", "error", "cancelled")
+
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _job_events(job_id: str) -> AsyncIterator[str]:
+    """
+    Poll the job store and emit what changed: ``progress`` (status,
+    progress), ``preview`` (index, url, body so far, done) per draft, and a
+    final ``end`` (status, error, total_results) before closing.
+
+    The wait between polls is on the event loop, so an open stream holds no
+    worker thread; only the store read (SQLite in worker mode) borrows one.
+    """
+    sent: Dict[str, Any] = {}
+    last_progress = None
+    last_version = -1
+    last_write = time.monotonic()
+    while True:
+        job = await run_in_threadpool(job_store.get, job_id)
+        if job is None:
+            yield _event("end", {"status": "missing", "error": "job not found", "total_results": None})
+            return
+        if job.version != last_version:
+            last_version = job.version
+            progress = (job.status, job.progress)
+            if progress != last_progress:
+                last_progress = progress
+                yield _event("progress", {"status": job.status, "progress": job.progress})
+                last_write = time.monotonic()
+            for index, preview in ((job.meta or {}).get("previews") or {}).items():
+                if sent.get(index) != preview:
+                    sent[index] = preview
+                    yield _event("preview", {"index": int(index), **preview})
+                    last_write = time.monotonic()
+        if job.status in _FINAL_STATUSES:
+            total = len(job.result) if job.status == "done" and job.result else None
+            yield _event("end", {"status": job.status, "error": job.error, "total_results": total})
+            return
+        if time.monotonic() - last_write >= _KEEPALIVE_S:
+            yield ": keep-alive\n\n"
+            last_write = time.monotonic()
+        await asyncio.sleep(_POLL_S)
+
+
+@router.get("/generate/stream/{job_id}", summary="Stream email generation progress and draft previews")
+def email_generation_stream(job_id: str) -> StreamingResponse:
+    """
+    Stream an email generation job as Server-Sent Events.
+
+    Drafts of a job started with ``"stream": true`` arrive as ``preview``
+    events while the LLM writes them, so the first words show up after the
+    provider's time to first token rather than after the whole draft.
+    Fetch the finished rows from the status endpoint after ``end``.
+
+    Args:
+        job_id: Unique identifier for the job
+
+    Returns:
+        StreamingResponse: text/event-stream of progress, preview and end events
+
+    Raises:
+        HTTPException: If job not found
+    """
+    if not job_store.get(job_id):
+        raise HTTPException(status_code=404, detail="job not found")
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
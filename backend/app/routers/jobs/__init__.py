@@ -0,0 +1,7 @@
+"""
+Jobs router package - resume and cancel for any job type
+"""
+from .resume import resume_job
+from .cancel import cancel_job
+
+__all__ = ['resume_job', 'cancel_job']
@@ -0,0 +1,42 @@
+"""
+Cancel job endpoint - drops queued jobs and stops running ones at their next checkpoint
+"""
+from fastapi import APIRouter, HTTPException
+from app.models import JobActionResponse
+from app.jobs import job_store
+from app.checkpoints import checkpoint_store
+from app.executor import job_executor
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("/{job_id}/cancel", response_model=JobActionResponse, summary="Cancel a job")
+def cancel_job(job_id: str) -> JobActionResponse:
+    """
+    Cancel a job.
+
+    Queued jobs are removed from the queue at once. Running research and send
+    jobs stop after the URL/row in progress, freeing their worker; what they
+    finished stays checkpointed and can be resumed.
+
+    Args:
+        job_id: Unique identifier for the job
+
+    Returns:
+        JobActionResponse: "cancelled", or "cancelling" while a running job winds down
+
+    Raises:
+        HTTPException: 404 if not found, 409 if finished or not cancellable while running
+    """
+    job = job_store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    if job.status in ("done", "error", "cancelled"):
+        raise HTTPException(status_code=409, detail=f"job is {job.status}")
+    if job_executor.cancel(job_id):
+        job_store.update(job_id, status="cancelled")
+        return JobActionResponse(job_id=job_id, status="cancelled")
+    if not checkpoint_store.job_request(job_id):
+        raise HTTPException(status_code=409, detail="job does not support cancellation while running")
+    checkpoint_store.request_cancel(job_id)
+    job_store.update(job_id, status="cancelling")
+    return JobActionResponse(job_id=job_id, status="cancelling")
@@ -0,0 +1,58 @@
+"""
+Resume job endpoint - re-runs a job from its last checkpoint
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from app.models import JobActionResponse, JobResumeRequest
+from app.jobs import job_store
+from app.checkpoints import checkpoint_store
+from app.executor import job_executor, request_submitter
+from app.job_types import resolve_job_type
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("/{job_id}/resume", response_model=JobActionResponse, summary="Resume a job from its last checkpoint")
+def resume_job(job_id: str, request: Request, body: Optional[JobResumeRequest] = None) -> JobActionResponse:
+    """
+    Queue a stopped research or send job again; finished items are skipped.
+
+    Works for jobs that failed, were cancelled, or were lost when the process
+    died (the request is recovered from the checkpoint store). Credentials
+    are not checkpointed: pass the job's keys or SMTP password again, or the
+    job uses the ones from the environment.
+
+    Args:
+        job_id: Unique identifier for the job
+        request: Incoming request (identifies the submitter for fair scheduling)
+        body: Optional credentials for the resumed job
+
+    Returns:
+        JobActionResponse: The job's new status
+
+    Raises:
+        HTTPException: 404 if the job has no checkpoint, 409 if it is still active
+    """
+    registered = checkpoint_store.job_request(job_id)
+    if not registered or not registered[0]:
+        raise HTTPException(status_code=404, detail="no checkpoint for job")
+    job_type, payload = registered
+    job = job_store.get(job_id)
+    if job and job.status in ("queued", "running", "cancelling"):
+        raise HTTPException(status_code=409, detail=f"job is {job.status}")
+    req_model, _ = resolve_job_type(job_type)
+    req = req_model.parse_raw(payload)
+    if body is not None:
+        credentials = {k: v for k, v in body.dict(exclude_none=True).items() if k in req_model.__fields__}
+        req = req.copy(update=credentials)
+    if job is None:
+        job_store.create(job_id)
+    job_store.update(job_id, status="queued", progress=0.0, error=None)
+    checkpoint_store.set_state(job_id, "active")
+    job_executor.resubmit(
+        job_type,
+        job_id,
+        req,
+        priority=getattr(req, "priority", 0),
+        submitter=request_submitter(request),
+    )
+    return JobActionResponse(job_id=job_id, status="queued")
@@ -0,0 +1,6 @@
+"""
+Metrics router package - Prometheus scrape endpoint
+"""
+from .export import metrics
+
+__all__ = ['metrics']
@@ -0,0 +1,30 @@
+"""
+Metrics endpoint - exposes pipeline metrics in Prometheus text format
+"""
+from fastapi import APIRouter, Response
+from app.executor import job_executor
+from app.job_types import JOB_TYPES
+from observability import CONTENT_TYPE, QUEUE_DEPTH, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=Response)
+def metrics() -> Response:
+    """
+    Render stage latency histograms, cache/fallback/error counters and job
+    queue depths for Prometheus to scrape.
+
+    Returns:
+        Response: Prometheus text exposition format
+    """
+    sample_job_gauges()
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
+def sample_job_gauges() -> None:
+    """Refresh the queued/running job gauges from the executor (or durable queue)."""
+    queued = job_executor.queue_depths()
+    running = job_executor.running_counts()
+    for job_type in JOB_TYPES:
+        QUEUE_DEPTH.set(queued.get(job_type, 0), job_type=job_type, state="queued")
+        QUEUE_DEPTH.set(running.get(job_type, 0), job_type=job_type, state="running")
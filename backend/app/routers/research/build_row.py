@@ -3,6 +3,7 @@ Build research row from URL - extracts website data and contact information
 """
 from scraping import scrape_website, _collect_page_text, _strip_html_tags, _collapse_whitespace, _extract_emails, _http_fetch_text, _choose_best_email, _extract_links, _classify_support_links
 from urllib.parse import urlparse
+from observability import stage, RESEARCH_ROWS
 
 def _build_row_from_url(url: str, firecrawl_key: str | None) -> dict:
     """
@@ -28,11 +29,13 @@ def _build_row_from_url(url: str, firecrawl_key: str | None) -> dict:
         if html_http:
             html_text = html_http
     excerpt = _collapse_whitespace(raw_text)[:1500]
-    emails = _extract_emails((md_text + "\n" + html_text))
-    domain = urlparse(url).netloc
-    best_email = _choose_best_email(emails, domain)
-    links = _extract_links(html_text, url)
-    g_url, c_url = _classify_support_links(links)
+    with stage("extract_contacts"):
+        emails = _extract_emails((md_text + "\n" + html_text))
+        domain = urlparse(url).netloc
+        best_email = _choose_best_email(emails, domain)
+        links = _extract_links(html_text, url)
+        g_url, c_url = _classify_support_links(links)
+    RESEARCH_ROWS.inc(context_source=context_source)
     return {
         "url": url,
         "title": "",
@@ -1,25 +1,31 @@
 """
-Start research endpoint - creates and queues research jobs
+Start research endpoint - creates research jobs and queues them on the job executor
 """
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, Request
 from app.models import ResearchStartRequest, ResearchStartResponse
 from app.jobs import job_store
-from .run_research import _run_research
+from app.executor import job_executor, request_submitter
 
 router = APIRouter(prefix="/research", tags=["research"])
 
 @router.post("/start", response_model=ResearchStartResponse, summary="Start research job")
-def start_research(req: ResearchStartRequest, bg: BackgroundTasks) -> ResearchStartResponse:
+def start_research(req: ResearchStartRequest, request: Request) -> ResearchStartResponse:
     """
     Start a new research job.
     
     Args:
         req: Research request parameters
-        bg: Background task manager
+        request: Incoming request (identifies the submitter for fair scheduling)
         
     Returns:
         ResearchStartResponse: Job ID for tracking
     """
     job = job_store.create()
-    bg.add_task(_run_research, job.job_id, req)
+    job_executor.submit(
+        "research",
+        job.job_id,
+        req,
+        priority=req.priority,
+        submitter=request_submitter(request),
+    )
     return ResearchStartResponse(job_id=job.job_id)
@@ -1,30 +1,46 @@
 """
 Research status endpoint - provides job progress and results
 """
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from pathlib import Path
 from app.models import ResearchJobStatusResponse
 from app.jobs import job_store
+from app.paging import parse_fields, status_etag, etag_matches, page_results, not_modified, status_response
 
 router = APIRouter(prefix="/research", tags=["research"])
 
 @router.get("/status/{job_id}", response_model=ResearchJobStatusResponse, summary="Get research job status")
-def research_status(job_id: str) -> ResearchJobStatusResponse:
+def research_status(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0, description="Index of the first result row to return"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of result rows to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated result columns to include"),
+):
     """
     Get the status and results of a research job.
-    
+
     Args:
         job_id: Unique identifier for the job
-        
+        request: Incoming request (for If-None-Match)
+        offset: Index of the first result row to return
+        limit: Maximum number of result rows to return (all if omitted)
+        fields: Comma-separated result columns to include (all if omitted)
+
     Returns:
-        ResearchJobStatusResponse: Job status and results
-        
+        ResearchJobStatusResponse: Job status and results, or 304 if unchanged
+
     Raises:
         HTTPException: If job not found
     """
     job = job_store.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="job not found")
+    field_names = parse_fields(fields)
+    etag = status_etag(job, offset, limit, field_names)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     # Compute saved CSV path if defaulting
     saved_csv_path = None
     if job.status == "done":
@@ -34,11 +50,17 @@ def research_status(job_id: str) -> ResearchJobStatusResponse:
             default_path = Path("data") / f"research_{job_id}.csv"
             if default_path.exists():
                 saved_csv_path = str(default_path.resolve())
-    return ResearchJobStatusResponse(
+    page, total = page_results(job.result if job.status == "done" else None, offset, limit, field_names)
+    payload = ResearchJobStatusResponse(
         job_id=job.job_id,
         status=job.status,
         progress=job.progress,
         error=job.error,
-        results=job.result if job.status == "done" else None,
+        results=None if field_names else page,
         saved_csv_path=saved_csv_path,
+        total_results=total,
+        timings=(job.meta or {}).get("timings"),
+        offset=offset,
+        limit=limit,
     )
+    return status_response(payload, page, bool(field_names), etag)
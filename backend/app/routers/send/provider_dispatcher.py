@@ -1,12 +1,19 @@
 """
 Provider dispatch logic for email sending
 """
-from typing import List
+from typing import Callable, Dict, List, Optional
 from loguru import logger
 from email_providers import send_bulk_sendgrid, send_bulk_mailersend
 from email_providers.smtp import send_bulk_emails
 
-def dispatch_to_provider(provider: str, input_csv: str, req_params: dict) -> List[dict]:
+def dispatch_to_provider(
+    provider: str,
+    input_csv: str,
+    req_params: dict,
+    done_rows: Optional[Dict[int, dict]] = None,
+    on_outcome: Optional[Callable[[dict], None]] = None,
+    before_send: Optional[Callable[[int], None]] = None,
+) -> List[dict]:
     """
     Dispatch email sending to the appropriate provider.
     
@@ -14,6 +21,9 @@ def dispatch_to_provider(provider: str, input_csv: str, req_params: dict) -> Lis
         provider: Email provider name (sendgrid, mailersend, smtp)
         input_csv: Path to input CSV file
         req_params: Request parameters for the provider
+        done_rows: Outcomes of rows already handled by an earlier run (not resent)
+        on_outcome: Called with each new per-row outcome
+        before_send: Called with the row number just before each send
         
     Returns:
         List[dict]: Results from the send operation
@@ -30,6 +40,9 @@ def dispatch_to_provider(provider: str, input_csv: str, req_params: dict) -> Lis
             sandbox=bool(req_params.get("sandbox")),
             rate_limit_per_sec=req_params.get("rate_limit_per_sec"),
             dry_run=req_params.get("dry_run"),
+            done_rows=done_rows,
+            on_outcome=on_outcome,
+            before_send=before_send,
         )
     elif provider == "mailersend":
         # SDK uses env MAILERSEND_API_KEY if api_key not set here
@@ -42,6 +55,9 @@ def dispatch_to_provider(provider: str, input_csv: str, req_params: dict) -> Lis
             from_email=req_params["from_email"],
             rate_limit_per_sec=req_params.get("rate_limit_per_sec"),
             dry_run=req_params.get("dry_run"),
+            done_rows=done_rows,
+            on_outcome=on_outcome,
+            before_send=before_send,
         )
     elif provider == "smtp":
         results = send_bulk_emails(
@@ -53,6 +69,10 @@ def dispatch_to_provider(provider: str, input_csv: str, req_params: dict) -> Lis
             smtp_password=req_params["smtp_pass"],
             rate_limit_per_sec=req_params.get("rate_limit_per_sec"),
             dry_run=req_params.get("dry_run"),
+            done_rows=done_rows,
+            on_outcome=on_outcome,
+            before_send=before_send,
+            concurrency=req_params.get("concurrency"),
         )
     else:
         raise ValueError("provider must be one of: sendgrid, mailersend, smtp")
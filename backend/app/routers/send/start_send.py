@@ -1,25 +1,31 @@
 """
-Start send endpoint - creates and queues send jobs
+Start send endpoint - creates send jobs and queues them on the job executor
 """
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, Request
 from app.models import SendStartRequest, SendStartResponse
 from app.jobs import job_store
-from .run_send import _run_send
+from app.executor import job_executor, request_submitter
 
 router = APIRouter(prefix="/send", tags=["send"])
 
 @router.post("/start", response_model=SendStartResponse, summary="Start send job")
-def start_send(req: SendStartRequest, bg: BackgroundTasks) -> SendStartResponse:
+def start_send(req: SendStartRequest, request: Request) -> SendStartResponse:
     """
     Start a new send job.
     
     Args:
         req: Send request parameters
-        bg: Background task manager
+        request: Incoming request (identifies the submitter for fair scheduling)
         
     Returns:
         SendStartResponse: Job ID for tracking
     """
     job = job_store.create()
-    bg.add_task(_run_send, job.job_id, req)
+    job_executor.submit(
+        "send",
+        job.job_id,
+        req,
+        priority=req.priority,
+        submitter=request_submitter(request),
+    )
     return SendStartResponse(job_id=job.job_id)
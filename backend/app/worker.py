@@ -0,0 +1,147 @@
+"""
+Job worker - runs research, email generation and send jobs from the durable queue
+
+Run from the backend folder, next to the API:
+
+    JOB_QUEUE_DB=data/jobs.sqlite3 uvicorn app.main:app
+    JOB_QUEUE_DB=data/jobs.sqlite3 python -m app.worker --concurrency 4
+
+Start as many workers as you like on the machine that holds the database
+file, on a local disk. SQLite's WAL mode relies on shared memory on one
+host and its locking is unreliable over NFS/SMB, so leases and claims
+would silently break across machines; spreading workers over several hosts
+needs a real broker. Per-type limits (RESEARCH_/EMAILS_/EMAILS_BATCH_/SEND_CONCURRENCY) are
+enforced across all of them.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import Set
+
+from dotenv import load_dotenv
+from loguru import logger
+
+env_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
+load_dotenv(env_path)
+
+
+def serve_metrics(port: int) -> None:
+    """Expose this worker's metrics for Prometheus on http://0.0.0.0:<port>/metrics."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from observability import CONTENT_TYPE, render_metrics
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="worker-metrics", daemon=True).start()
+
+
+def run_worker(db_path: str, concurrency: int, poll_interval: float = 1.0, metrics_port: int = 0) -> None:
+    """
+    Claim and run queued jobs on ``concurrency`` threads until interrupted.
+
+    Args:
+        db_path: Shared job database (same file the API uses)
+        concurrency: Number of jobs this process runs at once
+        poll_interval: Seconds to sleep when the queue is empty
+        metrics_port: Serve /metrics on this port (0 = off)
+    """
+    # The job store is chosen from JOB_QUEUE_DB at import time, so set it
+    # before anything imports app.jobs.
+    os.environ["JOB_QUEUE_DB"] = db_path
+    from app.executor import default_limits
+    from app.job_queue import SqliteJobQueue
+    from app.job_types import resolve_job_type
+    from app.jobs import job_store
+
+    queue = SqliteJobQueue(db_path)
+    limits = default_limits()
+    max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    stop = threading.Event()
+    active: Set[str] = set()
+    active_lock = threading.Lock()
+
+    def heartbeat() -> None:
+        while not stop.wait(queue.lease_s / 3):
+            with active_lock:
+                job_ids = list(active)
+            try:
+                queue.heartbeat(worker_id, job_ids)
+            except Exception as exc:
+                logger.warning(f"worker heartbeat failed: {exc}")
+
+    def loop() -> None:
+        while not stop.is_set():
+            try:
+                item = queue.claim(worker_id, limits)
+            except Exception as exc:
+                logger.warning(f"worker claim failed: {exc}")
+                item = None
+            if item is None:
+                stop.wait(poll_interval)
+                continue
+            with active_lock:
+                active.add(item.job_id)
+            try:
+                if item.attempts > max_attempts:
+                    # A worker died on this job every time; stop retrying it.
+                    job_store.update(item.job_id, status="error", error=f"gave up after {max_attempts} attempts")
+                    continue
+                req_model, runner = resolve_job_type(item.job_type)
+                logger.info(f"worker {worker_id}: running {item.job_type} job {item.job_id} (attempt {item.attempts})")
+                runner(item.job_id, req_model.parse_raw(item.payload))
+            except Exception as exc:
+                logger.error(f"worker {worker_id}: {item.job_type} job {item.job_id} crashed: {exc}")
+                job_store.update(item.job_id, status="error", error=str(exc))
+            finally:
+                queue.complete(item.job_id)
+                with active_lock:
+                    active.discard(item.job_id)
+
+    if metrics_port:
+        serve_metrics(metrics_port)
+    threads = [threading.Thread(target=heartbeat, name="worker-heartbeat", daemon=True)]
+    threads += [threading.Thread(target=loop, name=f"worker-{i}", daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    logger.info(f"worker {worker_id} started: concurrency={concurrency} db={db_path}")
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        stop.set()
+    logger.info(f"worker {worker_id} stopping; waiting for running jobs to finish")
+    for t in threads[1:]:
+        t.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI Backlinker job worker")
+    parser.add_argument("--db", default=os.getenv("JOB_QUEUE_DB", "data/jobs.sqlite3"), help="Shared job database path")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "4")))
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("WORKER_METRICS_PORT", "0")), help="Serve /metrics on this port (0 = off)")
+    args = parser.parse_args()
+    run_worker(args.db, max(1, args.concurrency), args.poll_interval, args.metrics_port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Benchmarks Package - offline performance suites (run with python -m benchmarks.<suite>)
+"""
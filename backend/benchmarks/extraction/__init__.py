@@ -0,0 +1,16 @@
+"""
+Extraction Benchmark Package - corpus-based speed, memory and quality checks for scraping extractors
+"""
+from .runner import (
+    load_corpus,
+    run_benchmark,
+    compare_results,
+    format_report,
+)
+
+__all__ = [
+    'load_corpus',
+    'run_benchmark',
+    'compare_results',
+    'format_report',
+]
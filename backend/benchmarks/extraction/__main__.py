@@ -0,0 +1,52 @@
+"""
+Extraction benchmark CLI
+
+Run from the backend folder:
+
+    python -m benchmarks.extraction                 # report, compared to baseline.json
+    python -m benchmarks.extraction --save          # refresh baseline.json
+    python -m benchmarks.extraction --check         # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import sys
+
+from .runner import BASELINE_PATH, compare_results, format_report, run_benchmark
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark for the research content extractors")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results JSON")
+    parser.add_argument("--save", action="store_true", help="Write this run's results to --baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if anything regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed speed/memory drift (fraction)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds per extractor speed run")
+    parser.add_argument("--json", action="store_true", help="Print the full results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(min_time_s=args.min_time)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results, baseline))
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    if baseline:
+        problems = compare_results(results, baseline, args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        if problems and args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
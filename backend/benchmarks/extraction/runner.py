@@ -0,0 +1,260 @@
+"""
+Extraction benchmark - speed, peak memory and excerpt quality of the research extractors
+
+Runs `_strip_html_tags`, `_extract_emails`, `_extract_links` and
+`_classify_support_links` over the checked-in HTML corpus (corpus/*.html,
+described by corpus/manifest.json) without any network access.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+from loguru import logger
+
+from scraping import (
+    _strip_html_tags,
+    _collapse_whitespace,
+    _extract_emails,
+    _extract_links,
+    _classify_support_links,
+)
+from scraping.content_extraction import _score_content_quality
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Same excerpt the research pipeline keeps per row.
+EXCERPT_CHARS = 1500
+
+
+@dataclass
+class Page:
+    name: str
+    cms: str
+    url: str
+    html: str
+    expect_phrases: List[str] = field(default_factory=list)
+    boilerplate: List[str] = field(default_factory=list)
+    expect_emails: List[str] = field(default_factory=list)
+    expect_guidelines: str = ""
+    expect_contact: str = ""
+
+
+def load_corpus(corpus_dir: str = CORPUS_DIR) -> List[Page]:
+    """Load every page listed in the corpus manifest."""
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = []
+    for entry in manifest["pages"]:
+        with open(os.path.join(corpus_dir, entry["file"]), encoding="utf-8") as f:
+            html = f.read()
+        pages.append(Page(
+            name=entry["file"],
+            cms=entry.get("cms", ""),
+            url=entry["url"],
+            html=html,
+            expect_phrases=entry.get("expect_phrases", []),
+            boilerplate=entry.get("boilerplate", []),
+            expect_emails=entry.get("expect_emails", []),
+            expect_guidelines=entry.get("expect_guidelines", ""),
+            expect_contact=entry.get("expect_contact", ""),
+        ))
+    return pages
+
+
+def _excerpt(page: Page) -> str:
+    return _collapse_whitespace(_strip_html_tags(page.html))[:EXCERPT_CHARS]
+
+
+def extractors(pages: List[Page]) -> Dict[str, Callable[[Page], Any]]:
+    """The benchmarked functions, each taking one page."""
+    links = {p.name: _extract_links(p.html, p.url) for p in pages}
+    return {
+        "strip_html_tags": lambda p: _strip_html_tags(p.html),
+        "extract_emails": lambda p: _extract_emails(p.html),
+        "extract_links": lambda p: _extract_links(p.html, p.url),
+        "classify_support_links": lambda p: _classify_support_links(links[p.name]),
+    }
+
+
+def measure_speed(fn: Callable[[Page], Any], pages: List[Page], min_time_s: float) -> Dict[str, float]:
+    """Run whole passes over the corpus until min_time_s has elapsed."""
+    fn(pages[0])  # warm-up (imports, regex compilation)
+    passes = 0
+    start = time.perf_counter()
+    while True:
+        for p in pages:
+            fn(p)
+        passes += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time_s:
+            break
+    n = passes * len(pages)
+    mb = passes * sum(len(p.html) for p in pages) / 1e6
+    return {"pages_per_sec": round(n / elapsed, 2), "mb_per_sec": round(mb / elapsed, 3)}
+
+
+def measure_peak_memory(fn: Callable[[Page], Any], pages: List[Page]) -> Dict[str, float]:
+    """Largest traced allocation peak while processing a single page."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for p in pages:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn(p)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": round(max(peaks) / 1024, 1)}
+
+
+def measure_quality(pages: List[Page]) -> Dict[str, Any]:
+    """Per-page and aggregate quality against the manifest expectations."""
+    per_page: Dict[str, Dict[str, Any]] = {}
+    recalls: List[float] = []
+    scores: List[float] = []
+    boilerplate_hits = 0
+    emails_expected = emails_found = emails_correct = 0
+    guidelines_ok = contact_ok = 0
+    for p in pages:
+        start = time.perf_counter()
+        excerpt = _excerpt(p)
+        strip_ms = (time.perf_counter() - start) * 1000
+        lower = excerpt.lower()
+        found = [ph for ph in p.expect_phrases if ph.lower() in lower]
+        noise = [b for b in p.boilerplate if b.lower() in lower]
+        emails = set(_extract_emails(p.html))
+        expected = {e.lower() for e in p.expect_emails}
+        g_url, c_url = _classify_support_links(_extract_links(p.html, p.url))
+        score = _score_content_quality(excerpt)
+
+        scores.append(score)
+        if p.expect_phrases:
+            recalls.append(len(found) / len(p.expect_phrases))
+        boilerplate_hits += len(noise)
+        emails_expected += len(expected)
+        emails_found += len(emails)
+        emails_correct += len(emails & expected)
+        guidelines_ok += int(g_url == p.expect_guidelines)
+        contact_ok += int(c_url == p.expect_contact)
+        per_page[p.name] = {
+            "cms": p.cms,
+            "html_kib": round(len(p.html) / 1024, 1),
+            "strip_ms": round(strip_ms, 1),
+            "excerpt_chars": len(excerpt),
+            "quality_score": round(score, 3),
+            "phrase_recall": round(len(found) / len(p.expect_phrases), 3) if p.expect_phrases else None,
+            "boilerplate_hits": noise,
+            "emails_missing": sorted(expected - emails),
+            "emails_unexpected": sorted(emails - expected),
+            "guidelines_url": g_url,
+            "contact_url": c_url,
+        }
+    n = len(pages)
+    summary = {
+        "mean_quality_score": round(sum(scores) / n, 3),
+        "mean_phrase_recall": round(sum(recalls) / len(recalls), 3) if recalls else None,
+        "boilerplate_hits": boilerplate_hits,
+        "email_precision": round(emails_correct / emails_found, 3) if emails_found else 1.0,
+        "email_recall": round(emails_correct / emails_expected, 3) if emails_expected else 1.0,
+        "guidelines_accuracy": round(guidelines_ok / n, 3),
+        "contact_accuracy": round(contact_ok / n, 3),
+    }
+    return {"summary": summary, "pages": per_page}
+
+
+def run_benchmark(pages: Optional[List[Page]] = None, min_time_s: float = 1.0) -> Dict[str, Any]:
+    """
+    Benchmark every extractor over the corpus.
+
+    Args:
+        pages: Corpus to use (the checked-in corpus if omitted)
+        min_time_s: Minimum wall time per extractor for the speed measurement
+
+    Returns:
+        dict: Machine-readable results (environment, speed, memory, quality)
+    """
+    pages = pages or load_corpus()
+    # Per-page debug logging would dominate the timings.
+    logger.disable("scraping")
+    try:
+        speed: Dict[str, Dict[str, float]] = {}
+        for name, fn in extractors(pages).items():
+            speed[name] = {**measure_speed(fn, pages, min_time_s), **measure_peak_memory(fn, pages)}
+        quality = measure_quality(pages)
+    finally:
+        logger.enable("scraping")
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+        "corpus": {
+            "pages": len(pages),
+            "total_kib": round(sum(len(p.html) for p in pages) / 1024, 1),
+        },
+        "extractors": speed,
+        "quality": quality,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    List regressions of ``current`` against ``baseline``.
+
+    Speed and memory may drift by ``tolerance`` (fraction) before they count,
+    since they depend on the machine; quality numbers are deterministic, so
+    any drop counts.
+    """
+    problems: List[str] = []
+    for name, base in baseline.get("extractors", {}).items():
+        cur = current["extractors"].get(name)
+        if cur is None:
+            problems.append(f"{name}: missing from current run")
+            continue
+        if cur["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+            problems.append(f"{name}: {cur['pages_per_sec']} pages/s vs baseline {base['pages_per_sec']}")
+        if cur["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            problems.append(f"{name}: peak {cur['peak_kib']} KiB vs baseline {base['peak_kib']}")
+    cur_q = current["quality"]["summary"]
+    for key, base_v in baseline.get("quality", {}).get("summary", {}).items():
+        cur_v = cur_q.get(key)
+        if base_v is None or cur_v is None:
+            continue
+        worse = cur_v > base_v if key == "boilerplate_hits" else cur_v < base_v - 1e-9
+        if worse:
+            problems.append(f"quality {key}: {cur_v} vs baseline {base_v}")
+    return problems
+
+
+def format_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Human-readable table, with the change against the baseline when given."""
+    lines = [
+        f"corpus: {results['corpus']['pages']} pages, {results['corpus']['total_kib']} KiB"
+        f" | python {results['environment']['python']} ({results['environment']['machine']})",
+        "",
+        f"{'extractor':<24}{'pages/s':>12}{'MB/s':>10}{'peak KiB':>11}{'vs baseline':>14}",
+    ]
+    for name, r in results["extractors"].items():
+        delta = ""
+        base = (baseline or {}).get("extractors", {}).get(name)
+        if base and base.get("pages_per_sec"):
+            delta = f"{(r['pages_per_sec'] / base['pages_per_sec'] - 1) * 100:+.1f}%"
+        lines.append(f"{name:<24}{r['pages_per_sec']:>12}{r['mb_per_sec']:>10}{r['peak_kib']:>11}{delta:>14}")
+    lines.append("")
+    lines.append("quality:")
+    base_q = (baseline or {}).get("quality", {}).get("summary", {})
+    for key, value in results["quality"]["summary"].items():
+        suffix = f" (baseline {base_q[key]})" if key in base_q and base_q[key] != value else ""
+        lines.append(f"  {key:<22}{value}{suffix}")
+    return "\n".join(lines)
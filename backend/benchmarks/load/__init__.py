@@ -0,0 +1,14 @@
+"""
+Load Test Package - end-to-end API load harness with local provider stand-ins
+"""
+from .harness import LoadConfig, run_load, format_report
+from .standins import Profile, StandIns, parse_profiles
+
+__all__ = [
+    'LoadConfig',
+    'run_load',
+    'format_report',
+    'Profile',
+    'StandIns',
+    'parse_profiles',
+]
@@ -0,0 +1,69 @@
+"""
+Load test CLI
+
+Run from the backend folder:
+
+    python -m benchmarks.load --levels 1,2,4,8 --duration 60
+    python -m benchmarks.load --latency firecrawl=5000:2000 --errors openai=0.05 --llm openai
+    python -m benchmarks.load --json results/load.json
+"""
+import argparse
+import json
+import sys
+
+from .harness import LoadConfig, format_report, run_load
+from .standins import PROVIDERS, StandIns, parse_profiles
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end load test of the API against local provider stand-ins")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated numbers of concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds per level")
+    parser.add_argument("--max-results", type=int, default=5, help="Research max_results per pipeline")
+    parser.add_argument("--llm", choices=["gemini", "openai"], default="gemini", help="Draft provider")
+    parser.add_argument("--batch-size", type=int, default=1, help="Sites per LLM request in the emails job")
+    parser.add_argument(
+        "--server-limits",
+        help="Fixed per-type limits, e.g. research=2,emails=4,send=1 (default: every limit equals the level)",
+    )
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=MS[:JITTER]",
+                        help=f"Stand-in latency; providers: {', '.join(PROVIDERS)}")
+    parser.add_argument("--errors", action="append", default=[], metavar="PROVIDER=RATE",
+                        help="Stand-in error rate (0..1)")
+    parser.add_argument("--capacity", action="append", default=[], metavar="PROVIDER=N",
+                        help="Stand-in concurrent request capacity; beyond it requests get 429 + Retry-After")
+    parser.add_argument("--json", metavar="PATH", help="Also write machine-readable results here")
+    args = parser.parse_args()
+
+    try:
+        profiles = parse_profiles(args.latency, args.errors, args.capacity)
+    except ValueError as exc:
+        parser.error(str(exc))
+    limits = None
+    if args.server_limits:
+        limits = {k: int(v) for k, v in (part.split("=", 1) for part in args.server_limits.split(","))}
+    cfg = LoadConfig(
+        levels=[int(x) for x in args.levels.split(",") if x.strip()],
+        duration_s=args.duration,
+        max_results=args.max_results,
+        llm_provider=args.llm,
+        batch_size=args.batch_size,
+        server_limits=limits,
+    )
+
+    stand_ins = StandIns(profiles).start()
+    try:
+        results = run_load(cfg, stand_ins)
+    finally:
+        stand_ins.stop()
+
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"profiles": {k: vars(p) for k, p in profiles.items()}, "levels": results}, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
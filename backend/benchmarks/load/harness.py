@@ -0,0 +1,319 @@
+"""
+Load harness - drives research → emails → send pipelines against a real API process
+
+For each concurrency level a fresh `uvicorn app.main:app` is started in a
+temporary directory with every provider pointed at the stand-ins (see
+standins.py). Virtual users then run whole pipelines back to back for a fixed
+duration while the API process's CPU, memory and thread count are sampled.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from .standins import StandIns
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+JOB_TYPES = ("research", "emails", "send")
+STATUS_PATHS = {"research": "/research/status", "emails": "/emails/generate/status", "send": "/send/status"}
+
+
+@dataclass
+class LoadConfig:
+    levels: List[int] = field(default_factory=lambda: [1, 2, 4, 8])
+    duration_s: float = 60.0
+    max_results: int = 5
+    llm_provider: str = "gemini"
+    batch_size: int = 1  # sites per LLM request in the emails job
+    server_limits: Optional[Dict[str, int]] = None  # None: per-type limits follow the level
+    poll_interval_s: float = 0.25
+    job_timeout_s: float = 600.0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0..100); None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct * len(ordered) / 100.0))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ProcessSampler:
+    """Samples CPU time, RSS and threads of a process from /proc (Linux); no-op elsewhere."""
+
+    def __init__(self, pid: int, interval_s: float = 0.5) -> None:
+        self.pid = pid
+        self.interval_s = interval_s
+        self.peak_rss_mib = 0.0
+        self.peak_threads = 0
+        self._cpu_start = self._cpu_seconds()
+        self._cpu_end = self._cpu_start
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-sampler", daemon=True)
+
+    def _cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def _sample(self) -> None:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        self.peak_rss_mib = max(self.peak_rss_mib, int(line.split()[1]) / 1024)
+                    elif line.startswith("Threads:"):
+                        self.peak_threads = max(self.peak_threads, int(line.split()[1]))
+        except (OSError, ValueError):
+            pass
+        cpu = self._cpu_seconds()
+        if cpu is not None:
+            self._cpu_end = cpu
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def start(self) -> "ProcessSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        cpu = None if self._cpu_start is None else round(self._cpu_end - self._cpu_start, 2)
+        return {
+            "cpu_s": cpu,
+            "peak_rss_mib": round(self.peak_rss_mib, 1) if self.peak_rss_mib else None,
+            "peak_threads": self.peak_threads or None,
+        }
+
+
+class ApiProcess:
+    """`uvicorn app.main:app` in a scratch directory (CSV outputs and checkpoints land there)."""
+
+    def __init__(self, env: Dict[str, str]) -> None:
+        self.port = _free_port()
+        self.workdir = tempfile.mkdtemp(prefix="backlinker-load-")
+        full_env = {k: v for k, v in os.environ.items() if k != "JOB_QUEUE_DB"}
+        full_env.update(env)
+        full_env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + full_env.get("PYTHONPATH", "")
+        self._log = open(os.path.join(self.workdir, "api.log"), "w")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning"],
+            cwd=self.workdir,
+            env=full_env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def wait_ready(self, timeout_s: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"API exited early; see {self._log.name}")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"API did not become ready; see {self._log.name}")
+
+    def stop(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self._log.close()
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.job_latency: Dict[str, List[float]] = {t: [] for t in JOB_TYPES}
+        self.pipeline_latency: List[float] = []
+        self.jobs_done = 0
+        self.errors: Dict[str, int] = {}
+        self.emails_sent = 0
+        self.fallback_drafts = 0
+
+    def job(self, job_type: str, seconds: float) -> None:
+        with self.lock:
+            self.job_latency[job_type].append(seconds)
+            self.jobs_done += 1
+
+    def error(self, what: str) -> None:
+        with self.lock:
+            self.errors[what] = self.errors.get(what, 0) + 1
+
+
+def _run_job(client: httpx.Client, cfg: LoadConfig, job_type: str, start_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Start one job and poll it to completion; returns the final status (with all results)."""
+    resp = client.post(start_path, json=payload)
+    resp.raise_for_status()
+    job_id = resp.json()["job_id"]
+    deadline = time.monotonic() + cfg.job_timeout_s
+    while time.monotonic() < deadline:
+        time.sleep(cfg.poll_interval_s)
+        status = client.get(f"{STATUS_PATHS[job_type]}/{job_id}", params={"limit": 1}).json()
+        if status["status"] in ("done", "error", "cancelled"):
+            if status["status"] != "done":
+                raise RuntimeError(f"{job_type} job {status['status']}: {status.get('error')}")
+            return client.get(f"{STATUS_PATHS[job_type]}/{job_id}").json()
+    raise RuntimeError(f"{job_type} job timed out")
+
+
+def _virtual_user(api_url: str, cfg: LoadConfig, user: int, deadline: float, rec: _Recorder) -> None:
+    n = 0
+    with httpx.Client(base_url=api_url, timeout=60, headers={"X-Submitter": f"load-user-{user}"}) as client:
+        while time.monotonic() < deadline:
+            n += 1
+            started = time.monotonic()
+            stage = "research"
+            try:
+                t0 = time.monotonic()
+                research = _run_job(client, cfg, "research", "/research/start", {
+                    "keyword": f"load user {user} pipeline {n}",
+                    "max_results": cfg.max_results,
+                })
+                rec.job("research", time.monotonic() - t0)
+
+                stage = "emails"
+                t0 = time.monotonic()
+                drafts = _run_job(client, cfg, "emails", "/emails/generate/start", {
+                    "research_job_id": research["job_id"],
+                    "provider": cfg.llm_provider,
+                    "batch_size": cfg.batch_size,
+                    "your_name": "Load Test",
+                    "your_email": "load@backlinker.test",
+                })
+                rec.job("emails", time.monotonic() - t0)
+                with rec.lock:
+                    # placeholder drafts mean the LLM stand-in was not reached (or errored)
+                    rec.fallback_drafts += sum(1 for d in drafts.get("results") or [] if d.get("status") == "fallback")
+
+                stage = "send"
+                rows = [
+                    {"to_email": d["to_email"], "subject": d["subject"], "body": d["body"]}
+                    for d in drafts.get("results") or [] if d.get("to_email")
+                ]
+                t0 = time.monotonic()
+                outcomes = _run_job(client, cfg, "send", "/send/start", {
+                    "provider": "smtp",
+                    "from_email": "load@backlinker.test",
+                    "rows": rows,
+                    "rate_limit_per_sec": 100,
+                })
+                rec.job("send", time.monotonic() - t0)
+                with rec.lock:
+                    rec.emails_sent += sum(1 for o in outcomes.get("results") or [] if o.get("status") == "sent")
+                    rec.pipeline_latency.append(time.monotonic() - started)
+            except Exception as exc:
+                rec.error(f"{stage}: {type(exc).__name__}")
+
+
+def run_level(stand_ins: StandIns, cfg: LoadConfig, level: int) -> Dict[str, Any]:
+    """Run ``level`` concurrent virtual users for ``cfg.duration_s`` against a fresh API process."""
+    limits = cfg.server_limits or {t: level for t in JOB_TYPES}
+    env = dict(stand_ins.env())
+    env.update({f"{t.upper()}_CONCURRENCY": str(n) for t, n in limits.items()})
+    # Virtual users repeat the same prompts and pages; measure the provider path, not cache hits.
+    env["LLM_CACHE"] = "0"
+    env["PAGE_SUMMARIES"] = "0"
+    api = ApiProcess(env)
+    try:
+        api.wait_ready()
+        sampler = ProcessSampler(api.proc.pid).start()
+        rec = _Recorder()
+        started = time.monotonic()
+        deadline = started + cfg.duration_s
+        users = [
+            threading.Thread(target=_virtual_user, args=(api.url, cfg, u, deadline, rec), daemon=True)
+            for u in range(level)
+        ]
+        for t in users:
+            t.start()
+        for t in users:
+            t.join()
+        elapsed = time.monotonic() - started
+        resources = sampler.stop()
+    finally:
+        api.stop()
+
+    def lat(values: List[float]) -> Dict[str, Optional[float]]:
+        p50, p99 = percentile(values, 50), percentile(values, 99)
+        return {"n": len(values), "p50_s": round(p50, 2) if p50 is not None else None,
+                "p99_s": round(p99, 2) if p99 is not None else None}
+
+    minutes = elapsed / 60.0
+    cpu = resources["cpu_s"]
+    return {
+        "level": level,
+        "server_limits": limits,
+        "elapsed_s": round(elapsed, 1),
+        "pipelines": len(rec.pipeline_latency),
+        "jobs": rec.jobs_done,
+        "jobs_per_min": round(rec.jobs_done / minutes, 2),
+        "pipelines_per_min": round(len(rec.pipeline_latency) / minutes, 2),
+        "emails_sent": rec.emails_sent,
+        "fallback_drafts": rec.fallback_drafts,
+        "errors": rec.errors,
+        "pipeline_latency": lat(rec.pipeline_latency),
+        "job_latency": {t: lat(v) for t, v in rec.job_latency.items()},
+        "resources": {**resources, "cpu_pct": round(100 * cpu / elapsed, 1) if cpu is not None else None},
+    }
+
+
+def run_load(cfg: LoadConfig, stand_ins: StandIns) -> List[Dict[str, Any]]:
+    """Run every level in ``cfg.levels`` in turn."""
+    return [run_level(stand_ins, cfg, level) for level in cfg.levels]
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    header = (f"{'users':>5} {'jobs/min':>9} {'pipe/min':>9} {'pipe p50':>9} {'pipe p99':>9} "
+              f"{'res p99':>8} {'llm p99':>8} {'send p99':>8} {'cpu%':>6} {'rss MiB':>8} {'thr':>4}  errors")
+    lines = [header]
+
+    def s(v: Any) -> str:
+        return "-" if v is None else str(v)
+
+    for r in results:
+        jl = r["job_latency"]
+        res = r["resources"]
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(r["errors"].items())) or "-"
+        if r["fallback_drafts"]:
+            errors += f" (fallback drafts: {r['fallback_drafts']})"
+        lines.append(
+            f"{r['level']:>5} {r['jobs_per_min']:>9} {r['pipelines_per_min']:>9} "
+            f"{s(r['pipeline_latency']['p50_s']):>9} {s(r['pipeline_latency']['p99_s']):>9} "
+            f"{s(jl['research']['p99_s']):>8} {s(jl['emails']['p99_s']):>8} {s(jl['send']['p99_s']):>8} "
+            f"{s(res['cpu_pct']):>6} {s(res['peak_rss_mib']):>8} {s(res['peak_threads']):>4}  {errors}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,659 @@
+"""
+Provider stand-ins - local fakes of Serper, Firecrawl, OpenAI (chat and Batch API), Gemini, the scraped sites and SMTP
+
+Each stand-in runs on its own port with a latency/error profile, so the API
+can be driven end to end without keys, network access or sending real mail.
+Pages come from the extraction benchmark corpus.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import socketserver
+import threading
+import time
+
+try:
+    import aiosmtpd  # noqa: F401
+    AIOSMTPD_AVAILABLE = True
+except ImportError:
+    AIOSMTPD_AVAILABLE = False
+
+from benchmarks.extraction.runner import CORPUS_DIR
+
+PROVIDERS = ("serper", "firecrawl", "openai", "gemini", "site", "smtp")
+_STREAM_CHUNK_S = 0.02
+
+
+@dataclass
+class Profile:
+    """Latency (mean ± uniform jitter, milliseconds), error rate and capacity of one stand-in."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    capacity: int = 0  # concurrent requests served; beyond it: 429 + Retry-After (0 = unlimited)
+
+    def delay(self) -> None:
+        ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def fails(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+# Rough production-like defaults; override per provider on the command line.
+DEFAULT_PROFILES: Dict[str, Profile] = {
+    "serper": Profile(400, 150),
+    "firecrawl": Profile(2500, 1000),
+    "openai": Profile(3000, 1500),
+    "gemini": Profile(2000, 1000),
+    "site": Profile(300, 200),
+    "smtp": Profile(150, 50),
+}
+
+
+def parse_profiles(latency: List[str], errors: List[str], capacity: List[str] = ()) -> Dict[str, Profile]:
+    """
+    Build profiles from ``provider=mean[:jitter]`` latency, ``provider=rate`` error
+    and ``provider=n`` capacity specs.
+
+    Raises:
+        ValueError: On an unknown provider or malformed spec
+    """
+    profiles = {k: Profile(p.latency_ms, p.jitter_ms, p.error_rate) for k, p in DEFAULT_PROFILES.items()}
+    for spec in latency:
+        name, _, value = spec.partition("=")
+        if name not in profiles or not value:
+            raise ValueError(f"bad latency spec {spec!r}; use provider=mean_ms[:jitter_ms] with provider in {PROVIDERS}")
+        mean, _, jitter = value.partition(":")
+        profiles[name].latency_ms = float(mean)
+        profiles[name].jitter_ms = float(jitter or 0)
+    for spec in errors:
+        name, _, value = spec.partition("=")
+        if name not in profiles or not value:
+            raise ValueError(f"bad error spec {spec!r}; use provider=rate with provider in {PROVIDERS}")
+        profiles[name].error_rate = float(value)
+    for spec in capacity:
+        name, _, value = spec.partition("=")
+        if name not in profiles or not value:
+            raise ValueError(f"bad capacity spec {spec!r}; use provider=n with provider in {PROVIDERS}")
+        profiles[name].capacity = int(value)
+    return profiles
+
+
+def _load_pages() -> List[Tuple[str, str]]:
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        files = [p["file"] for p in json.load(f)["pages"]]
+    pages = []
+    for name in files:
+        with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+            pages.append((name, f.read()))
+    return pages
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, handler, profile: Profile, pages: List[Tuple[str, str]]) -> None:
+        super().__init__(("127.0.0.1", 0), handler)
+        self.profile = profile
+        self.pages = pages
+        self.site_url = ""
+        self.batch_store = _BatchStore()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0  # requests answered 429 for exceeding the profile's capacity
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _body(self) -> Dict[str, Any]:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, payload: Any, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, content_type: str, pieces: List[bytes]) -> None:
+        """A close-delimited streamed response: one piece every _STREAM_CHUNK_S after the profile latency."""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(_STREAM_CHUNK_S)
+            self.wfile.write(piece)
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _profiled(self) -> bool:
+        """Apply latency; answer with an error (and return False) when the profile says so."""
+        server = self.server
+        with server.lock:
+            if server.profile.capacity and server.in_flight >= server.profile.capacity:
+                server.rejected += 1
+                busy = True
+            else:
+                server.in_flight += 1
+                busy = False
+        if busy:
+            self._send(429, {"error": {"message": "stand-in rate limit", "code": 429}}, headers={"Retry-After": "1"})
+            return False
+        try:
+            server.profile.delay()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        if server.profile.fails():
+            self._send(503, {"error": {"message": "stand-in injected failure", "code": 503, "status": "UNAVAILABLE"}})
+            return False
+        return True
+
+    def _page_for(self, url: str) -> Tuple[str, str]:
+        # /<n>/<corpus file>: the corpus file, whatever the prefix
+        name = url.rstrip("/").rsplit("/", 1)[-1]
+        for page in self.server.pages:
+            if page[0] == name:
+                return page
+        return self.server.pages[int(hashlib.md5(url.encode()).hexdigest(), 16) % len(self.server.pages)]
+
+
+class SerperHandler(_Handler):
+    def do_GET(self) -> None:  # reachability probe
+        self._send(200, {"ok": True})
+
+    def do_POST(self) -> None:
+        body = self._body()
+        if not self._profiled():
+            return
+        q = str(body.get("q", ""))
+        num = int(body.get("num") or 10)
+        seed = int(hashlib.md5(q.encode()).hexdigest(), 16)
+        organic = []
+        for i in range(num):
+            name, _ = self.server.pages[(seed + i) % len(self.server.pages)]
+            organic.append({
+                "title": f"{q} - result {i + 1}",
+                "link": f"{self.server.site_url}/{seed % 100000}-{i}/{name}",
+                "snippet": f"Guest post guidelines for {q}.",
+                "position": i + 1,
+            })
+        self._send(200, {"searchParameters": {"q": q}, "organic": organic})
+
+
+class FirecrawlHandler(_Handler):
+    def do_POST(self) -> None:
+        body = self._body()
+        if not self._profiled():
+            return
+        url = str(body.get("url", ""))
+        _, html = self._page_for(url)
+        text = re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", html))
+        self._send(200, {"success": True, "data": {"markdown": text[:20000], "html": html, "metadata": {"sourceURL": url}}})
+
+
+class SiteHandler(_Handler):
+    def do_GET(self) -> None:
+        if not self._profiled():
+            return
+        _, html = self._page_for(self.path)
+        self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+
+
+_DRAFT = (
+    "Subject: Guest post idea\n\nHi there,\n\nI enjoyed your recent articles and would love to contribute "
+    "a practical, well-researched guest post for your readers. I can send a detailed outline this week.\n\n"
+    "Best regards"
+)
+
+
+def _draft_answer(prompt: str, json_output: bool) -> str:
+    """
+    The canned draft; for a batched prompt one draft per "[n]" site marker as
+    JSON, for a template slot prompt one short value per listed slot, and
+    for a page summary prompt a summary and highlights per page.
+    """
+    if not json_output:
+        return _DRAFT
+    ids = [int(m) for m in re.findall(r"^\[(\d+)\]$", prompt, flags=re.MULTILINE)]
+    if "\nSLOTS:\n" in prompt:
+        section = prompt.split("\nSLOTS:\n", 1)[1].split("\n\n", 1)[0]
+        slots = re.findall(r"^- ([a-z_]+): ", section, flags=re.MULTILINE)
+        return json.dumps({"sites": [{"id": i, **{s: f"Stand-in {s.replace('_', ' ')} {i}." for s in slots}} for i in ids]})
+    if "\nPAGES:\n" in prompt:
+        return json.dumps({"pages": [
+            {"id": i, "summary": f"Stand-in summary of page {i}.", "highlights": [f"Stand-in highlight {i}.{n}" for n in (1, 2)]}
+            for i in ids
+        ]})
+    return json.dumps({"emails": [{"id": i, "body": _DRAFT} for i in ids]})
+
+
+def _chunks(text: str, words: int = 4) -> List[str]:
+    """The answer split into streamed pieces of a few words."""
+    parts = re.findall(r"\S+\s*|\s+", text)
+    return ["".join(parts[i:i + words]) for i in range(0, len(parts), words)]
+
+
+def _chat_completion_stream(body: Dict[str, Any]) -> List[bytes]:
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    json_output = (body.get("response_format") or {}).get("type") == "json_object"
+    chunk_id = f"chatcmpl-{random.getrandbits(48):x}"
+    events = []
+    for piece in _chunks(_draft_answer(prompt, json_output)) + [None]:
+        delta = {"content": piece} if piece is not None else {}
+        events.append({
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None if piece is not None else "stop"}],
+        })
+    return [f"data: {json.dumps(e)}\n\n".encode("utf-8") for e in events] + [b"data: [DONE]\n\n"]
+
+
+def _chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    json_output = (body.get("response_format") or {}).get("type") == "json_object"
+    answer = _draft_answer(prompt, json_output)
+    return {
+        "id": f"chatcmpl-{random.getrandbits(48):x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stand-in"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(answer) // 4,
+                  "total_tokens": (len(prompt) + len(answer)) // 4},
+    }
+
+
+class _BatchStore:
+    """Files and batches of the Batch API stand-in."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+
+    def add_file(self, data: bytes) -> str:
+        file_id = f"file-{random.getrandbits(48):x}"
+        with self.lock:
+            self.files[file_id] = data
+        return file_id
+
+    def create(self, body: Dict[str, Any], profile: Profile) -> Dict[str, Any]:
+        with self.lock:
+            data = self.files.get(body.get("input_file_id", ""))
+        if data is None:
+            raise KeyError("input file not found")
+        lines = [json.loads(line) for line in data.decode("utf-8").splitlines() if line.strip()]
+        batch = {
+            "id": f"batch_{random.getrandbits(48):x}",
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "input_file_id": body.get("input_file_id"),
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "metadata": body.get("metadata"),
+            "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        threading.Thread(target=self._process, args=(batch["id"], lines, profile), daemon=True).start()
+        return dict(batch)
+
+    def _process(self, batch_id: str, lines: List[Dict[str, Any]], profile: Profile) -> None:
+        # The whole batch takes one profile latency ("turnaround"); each line
+        # fails with the profile's error rate.
+        with self.lock:
+            self.batches[batch_id]["status"] = "in_progress"
+        profile.delay()
+        out, err = [], []
+        for line in lines:
+            with self.lock:
+                batch = self.batches[batch_id]
+                if batch["status"] == "cancelling":
+                    break
+                if profile.fails():
+                    batch["request_counts"]["failed"] += 1
+                    err.append({"id": f"req_{random.getrandbits(32):x}", "custom_id": line.get("custom_id"),
+                                "response": {"status_code": 503, "body": {"error": "stand-in injected failure"}}})
+                else:
+                    batch["request_counts"]["completed"] += 1
+                    out.append({"id": f"req_{random.getrandbits(32):x}", "custom_id": line.get("custom_id"),
+                                "response": {"status_code": 200, "body": _chat_completion(line.get("body") or {})}})
+        with self.lock:
+            batch = self.batches[batch_id]
+            if out:
+                batch["output_file_id"] = self._jsonl(out)
+            if err:
+                batch["error_file_id"] = self._jsonl(err)
+            batch["status"] = "cancelled" if batch["status"] == "cancelling" else "completed"
+
+    def _jsonl(self, records: List[Dict[str, Any]]) -> str:
+        # Called with the lock held.
+        file_id = f"file-{random.getrandbits(48):x}"
+        self.files[file_id] = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+        return file_id
+
+    def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            return json.loads(json.dumps(batch)) if batch else None
+
+    def cancel(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch and batch["status"] in ("validating", "in_progress"):
+                batch["status"] = "cancelling"
+        return self.get(batch_id)
+
+
+class OpenAIHandler(_Handler):
+    """Chat completions, plus the Batch API (files, batches) answered from _BatchStore."""
+
+    def _upload(self) -> None:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        header = f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode("utf-8")
+        message = BytesParser(policy=policy.default).parsebytes(header + raw)
+        data = b""
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                data = part.get_payload(decode=True) or b""
+        file_id = self.server.batch_store.add_file(data)
+        self._send(200, {"id": file_id, "object": "file", "bytes": len(data), "purpose": "batch"})
+
+    def do_GET(self) -> None:
+        store = self.server.batch_store
+        parts = self.path.strip("/").split("/")
+        if len(parts) == 3 and parts[1] == "batches":
+            batch = store.get(parts[2])
+            self._send(200 if batch else 404, batch or {"error": "batch not found"})
+        elif len(parts) == 4 and parts[1] == "files" and parts[3] == "content":
+            with store.lock:
+                data = store.files.get(parts[2])
+            if data is None:
+                self._send(404, {"error": "file not found"})
+            else:
+                self._send(200, data, "application/jsonl")
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        store = self.server.batch_store
+        parts = self.path.strip("/").split("/")
+        if parts[-1] == "files":
+            self._upload()
+            return
+        if parts[-1] == "batches":
+            try:
+                self._send(200, store.create(self._body(), self.server.profile))
+            except KeyError as exc:
+                self._send(400, {"error": str(exc)})
+            return
+        if len(parts) == 4 and parts[1] == "batches" and parts[3] == "cancel":
+            self._body()
+            batch = store.cancel(parts[2])
+            self._send(200 if batch else 404, batch or {"error": "batch not found"})
+            return
+        body = self._body()
+        if not self._profiled():
+            return
+        if body.get("stream"):
+            self._stream("text/event-stream", _chat_completion_stream(body))
+            return
+        self._send(200, _chat_completion(body))
+
+
+class GeminiHandler(_Handler):
+    def do_POST(self) -> None:
+        body = self._body()
+        if not self._profiled():
+            return
+        prompt = "\n".join(
+            str(part.get("text", "")) for c in body.get("contents", []) for part in c.get("parts", [])
+        )
+        json_output = (body.get("generationConfig") or {}).get("responseMimeType") == "application/json"
+        answer = _draft_answer(prompt, json_output)
+        if ":streamGenerateContent" in self.path:
+            # A JSON array of responses, one candidate chunk each (what the REST transport parses).
+            items = [
+                {"candidates": [{"content": {"parts": [{"text": piece}], "role": "model"}, "index": 0}]}
+                for piece in _chunks(answer)
+            ]
+            # The last chunk carries the usage totals.
+            items[-1]["usageMetadata"] = {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(answer) // 4}
+            items = [json.dumps(item) for item in items]
+            pieces = [("[" if i == 0 else ",\n") + item for i, item in enumerate(items)] + ["]"]
+            self._stream("application/json", [p.encode("utf-8") for p in pieces])
+            return
+        self._send(200, {
+            "candidates": [{"content": {"parts": [{"text": answer}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(answer) // 4},
+        })
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    server: "SMTPSink"
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def _readline(self) -> Optional[str]:
+        raw = self.rfile.readline(65536)
+        return raw.decode("utf-8", "replace").rstrip("\r\n") if raw else None
+
+    def handle(self) -> None:
+        self._reply("220 stand-in ESMTP ready")
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-stand-in")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 SIZE 10485760")
+            elif verb == "AUTH":
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].upper() == "LOGIN":
+                    self._reply("334 " + base64.b64encode(b"Username:").decode())
+                    self._readline()
+                    self._reply("334 " + base64.b64encode(b"Password:").decode())
+                    self._readline()
+                elif len(parts) == 2:  # AUTH PLAIN without initial response
+                    self._reply("334 ")
+                    self._readline()
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    data_line = self._readline()
+                    if data_line is None or data_line == ".":
+                        break
+                self.server.profile.delay()
+                if self.server.profile.fails():
+                    self._reply("451 4.3.0 stand-in injected failure")
+                else:
+                    with self.server.lock:
+                        self.server.messages += 1
+                    self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Accepts and discards mail, counting messages."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 256
+
+    def __init__(self, profile: Profile) -> None:
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.messages = 0
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AiosmtpdSink:
+    """The same sink on aiosmtpd, which behaves more like a real MTA; used when installed."""
+
+    def __init__(self, profile: Profile) -> None:
+        from aiosmtpd.controller import Controller  # type: ignore
+        from aiosmtpd.smtp import AuthResult  # type: ignore
+
+        self.profile = profile
+        self.messages = 0
+        self.port = _free_port()
+        # aiosmtpd 1.4 logs a deprecation warning about its own attribute on every AUTH.
+        logging.getLogger("mail.log").setLevel(logging.ERROR)
+        self._controller = Controller(
+            self,
+            hostname="127.0.0.1",
+            port=self.port,
+            auth_require_tls=False,
+            authenticator=lambda *args: AuthResult(success=True),
+        )
+
+    async def handle_DATA(self, server, session, envelope) -> str:  # noqa: N802 - aiosmtpd hook name
+        ms = self.profile.latency_ms + random.uniform(-self.profile.jitter_ms, self.profile.jitter_ms)
+        await asyncio.sleep(max(0.0, ms) / 1000.0)
+        if self.profile.fails():
+            return "451 4.3.0 stand-in injected failure"
+        self.messages += 1
+        return "250 OK queued"
+
+    def serve_forever(self) -> None:
+        self._controller.start()
+
+    def shutdown(self) -> None:
+        self._controller.stop()
+
+    def server_close(self) -> None:
+        pass
+
+
+def make_smtp_sink(profile: Profile):
+    """aiosmtpd sink if aiosmtpd is installed, else the built-in one."""
+    if AIOSMTPD_AVAILABLE:
+        return AiosmtpdSink(profile)
+    return SMTPSink(profile)
+
+
+class StandIns:
+    """Start/stop every stand-in and expose the environment that points the API at them."""
+
+    def __init__(self, profiles: Dict[str, Profile]) -> None:
+        self.profiles = profiles
+        self._pages = _load_pages()
+        self._servers: Dict[str, _Server] = {}
+        self._smtp: Any = None
+
+    def start(self) -> "StandIns":
+        handlers = {
+            "site": SiteHandler,
+            "serper": SerperHandler,
+            "firecrawl": FirecrawlHandler,
+            "openai": OpenAIHandler,
+            "gemini": GeminiHandler,
+        }
+        for name, handler in handlers.items():
+            server = _Server(handler, self.profiles[name], self._pages)
+            threading.Thread(target=server.serve_forever, name=f"standin-{name}", daemon=True).start()
+            self._servers[name] = server
+        self._servers["serper"].site_url = self._servers["site"].url
+
+        self._smtp = make_smtp_sink(self.profiles["smtp"])
+        if isinstance(self._smtp, AiosmtpdSink):
+            self._smtp.serve_forever()  # starts its own event loop thread
+        else:
+            threading.Thread(target=self._smtp.serve_forever, name="standin-smtp", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        if self._smtp is not None:
+            self._smtp.shutdown()
+            self._smtp.server_close()
+
+    @property
+    def messages_received(self) -> int:
+        return self._smtp.messages if self._smtp is not None else 0
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that route every provider call of the API to the stand-ins."""
+        return {
+            "SERPER_API_URL": self._servers["serper"].url,
+            "SERPER_API_KEY": "load-test",
+            "FIRECRAWL_API_URL": self._servers["firecrawl"].url,
+            "FIRECRAWL_API_KEY": "load-test",
+            "OPENAI_BASE_URL": f"{self._servers['openai'].url}/v1",
+            "OPENAI_API_KEY": "load-test",
+            "GEMINI_API_ENDPOINT": self._servers["gemini"].url,
+            "GEMINI_API_KEY": "load-test",
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(self._smtp.port),
+            "SMTP_USER": "load-test",
+            "SMTP_PASS": "load-test",
+            "SMTP_STARTTLS": "0",
+        }
@@ -0,0 +1,3 @@
+"""
+Replay Package - record/replay research runs through a scrape cassette
+"""
@@ -0,0 +1,76 @@
+"""
+Research record/replay CLI
+
+Run from the backend folder:
+
+    # once, against the live providers (needs SERPER_API_KEY / FIRECRAWL_API_KEY)
+    python -m benchmarks.replay --cassette cassettes/seo.jsonl.gz --record --keyword "seo tools" --max-results 10
+
+    # as often as you like, offline
+    python -m benchmarks.replay --cassette cassettes/seo.jsonl.gz --keyword "seo tools" --max-results 10 --repeat 3
+    python -m benchmarks.replay --cassette cassettes/seo.jsonl.gz --keyword "seo tools" --max-results 10 --latency-scale 0
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from loguru import logger
+
+from observability import job_timings
+from scraping import find_backlink_opportunities, use_cassette
+
+
+def _replay_keys(cassette) -> dict:
+    """
+    Placeholder keys for the providers the recording used, so replay takes the
+    same code paths without real keys. Recording uses the environment's keys.
+    """
+    if cassette.mode == "record":
+        return {}
+    kinds = cassette.kinds()
+    return {
+        "serper_api_key": "cassette" if "serper_search" in kinds else None,
+        "firecrawl_api_key": "cassette" if "firecrawl_scrape" in kinds else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record or replay the provider calls of one research run")
+    parser.add_argument("--cassette", required=True, help="Cassette archive (.jsonl.gz)")
+    parser.add_argument("--record", action="store_true", help="Call the live providers and record them")
+    parser.add_argument("--keyword", required=True)
+    parser.add_argument("--max-results", type=int, default=10)
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Replay latency multiplier (1 = as recorded, 0 = none)")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of replay runs")
+    parser.add_argument("--json", action="store_true", help="Print the timing breakdown of each run as JSON")
+    args = parser.parse_args()
+
+    if args.record and os.path.exists(args.cassette):
+        parser.error(f"{args.cassette} exists; record into a new file")
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    runs = 1 if args.record else max(1, args.repeat)
+    for run in range(1, runs + 1):
+        mode = "record" if args.record else "replay"
+        with use_cassette(args.cassette, mode, args.latency_scale) as cassette:
+            with job_timings(f"{mode}-{run}", "research") as timings:
+                start = time.perf_counter()
+                rows = find_backlink_opportunities(args.keyword, max_results=args.max_results, **_replay_keys(cassette))
+                wall = time.perf_counter() - start
+            summary = timings.summary()
+        stats = cassette.stats()
+        print(f"{mode} run {run}: {len(rows)} rows in {wall:.2f}s | calls recorded={stats['recorded']} "
+              f"replayed={stats['replayed']} missing={stats['misses']}")
+        top = sorted(summary["stages"].items(), key=lambda kv: -kv[1]["total_s"])[:6]
+        print("  " + ", ".join(f"{name} {s['total_s']}s/{s['count']}" for name, s in top))
+        if args.json:
+            print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
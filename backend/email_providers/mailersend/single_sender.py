@@ -5,6 +5,7 @@ import os
 import time
 from typing import Dict, Any
 from loguru import logger
+from observability import stage, record_provider_error, error_code
 from .env_validator import _require_env
 
 def send_one_mailersend(
@@ -51,9 +52,11 @@ def send_one_mailersend(
     while True:
         attempt += 1
         try:
-            response = mailer.send(mail_body)
+            with stage("send_mailersend", attempt=attempt):
+                response = mailer.send(mail_body)
             if response.status_code == 202:
                 return response.status_code
+            record_provider_error("mailersend", response.status_code)
             if response.status_code in (429, 500, 502, 503) and attempt < max_retries:
                 sleep_s = backoff_base * (2 ** (attempt - 1))
                 logger.warning(f"MailerSend {response.status_code}; retrying in {sleep_s:.1f}s (attempt {attempt}/{max_retries})")
@@ -61,6 +64,7 @@ def send_one_mailersend(
                 continue
             return response.status_code
         except Exception as exc:
+            record_provider_error("mailersend", error_code(exc))
             if attempt < max_retries:
                 sleep_s = backoff_base * (2 ** (attempt - 1))
                 logger.warning(f"MailerSend exception; retrying in {sleep_s:.1f}s (attempt {attempt}/{max_retries}): {exc}")
@@ -3,7 +3,7 @@ Bulk email sending via SendGrid
 """
 import csv
 import time
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any
 from loguru import logger
 from .single_sender import send_one_sendgrid
 
@@ -15,23 +15,41 @@ def send_bulk_sendgrid(
     sandbox: bool = False,
     rate_limit_per_sec: float = 10.0,
     dry_run: bool = False,
+    done_rows: Dict[int, Dict] | None = None,
+    on_outcome: Callable[[Dict], None] | None = None,
+    before_send: Callable[[int], None] | None = None,
 ) -> List[Dict]:
     """Bulk send via SendGrid from a CSV with columns: to_email, subject, body.
 
+    Rows listed in ``done_rows`` (1-based row number -> outcome) are not sent
+    again; their stored outcome is reported instead. ``before_send`` is called
+    with the row number just before a message goes out and ``on_outcome`` with
+    each new outcome, so callers can checkpoint progress.
+
     Returns list of outcomes per row.
     """
     outcomes: List[Dict] = []
+
+    def _emit(outcome: Dict) -> None:
+        outcomes.append(outcome)
+        if on_outcome:
+            on_outcome(outcome)
+
     delay = 1.0 / max(1.0, rate_limit_per_sec)
 
     with open(in_csv, "r", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
         for i, row in enumerate(reader, start=1):
+            if done_rows and i in done_rows:
+                outcomes.append(done_rows[i])
+                continue
+
             to_email = (row.get("to_email") or "").strip()
             subject = (row.get("subject") or "").strip()
             body = (row.get("body") or "").strip()
 
             if not to_email or not subject or not body:
-                outcomes.append({
+                _emit({
                     "row": i,
                     "to_email": to_email,
                     "status": "error",
@@ -41,7 +59,7 @@ def send_bulk_sendgrid(
                 continue
 
             if dry_run:
-                outcomes.append({
+                _emit({
                     "row": i,
                     "to_email": to_email,
                     "status": "dry_run",
@@ -50,6 +68,8 @@ def send_bulk_sendgrid(
                 })
                 continue
 
+            if before_send:
+                before_send(i)
             try:
                 status_code = send_one_sendgrid(
                     to_email=to_email,
@@ -60,7 +80,7 @@ def send_bulk_sendgrid(
                     sandbox=sandbox,
                 )
                 if status_code == 202:
-                    outcomes.append({
+                    _emit({
                         "row": i,
                         "to_email": to_email,
                         "status": "sent",
@@ -68,7 +88,7 @@ def send_bulk_sendgrid(
                         "message": "Email sent successfully"
                     })
                 else:
-                    outcomes.append({
+                    _emit({
                         "row": i,
                         "to_email": to_email,
                         "status": "error",
@@ -76,7 +96,7 @@ def send_bulk_sendgrid(
                         "message": f"SendGrid returned status {status_code}"
                     })
             except Exception as exc:
-                outcomes.append({
+                _emit({
                     "row": i,
                     "to_email": to_email,
                     "status": "error",
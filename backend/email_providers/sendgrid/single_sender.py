@@ -5,6 +5,7 @@ import os
 import time
 from typing import Dict, Any
 from loguru import logger
+from observability import stage, record_provider_error, error_code
 from .env_validator import _require_env
 
 def send_one_sendgrid(
@@ -51,9 +52,16 @@ def send_one_sendgrid(
     attempt = 0
     while True:
         attempt += 1
-        resp = sg.client.mail.send.post(request_body=mail.get())
+        try:
+            with stage("send_sendgrid", attempt=attempt):
+                resp = sg.client.mail.send.post(request_body=mail.get())
+        except Exception as exc:
+            # python_http_client raises for 4xx/5xx instead of returning them
+            record_provider_error("sendgrid", error_code(exc))
+            raise
         if resp.status_code == 202:
             return resp.status_code
+        record_provider_error("sendgrid", resp.status_code)
         if resp.status_code in (429, 500, 502, 503) and attempt < max_retries:
             sleep_s = backoff_base * (2 ** (attempt - 1))
             logger.warning(f"SendGrid {resp.status_code}; retrying in {sleep_s:.1f}s (attempt {attempt}/{max_retries})")
@@ -4,9 +4,13 @@ SMTP Email Provider Package
 from .single_sender import send_one_smtp
 from .bulk_sender import send_bulk_smtp
 from .dispatcher import send_bulk_emails
+from .pool import SMTPDeliveryUnknown, SMTPSessionPool, smtp_pool
 
 __all__ = [
     'send_one_smtp',
     'send_bulk_smtp',
-    'send_bulk_emails'
+    'send_bulk_emails',
+    'SMTPDeliveryUnknown',
+    'SMTPSessionPool',
+    'smtp_pool',
 ]
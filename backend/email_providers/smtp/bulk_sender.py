@@ -1,12 +1,46 @@
 """
 Bulk email sending via SMTP
 """
+import contextvars
 import csv
+import os
+import queue
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional
 from loguru import logger
+from .pool import smtp_pool
 from .single_sender import send_one_smtp
 
+_DEFAULT_CONCURRENCY = 4
+
+
+def smtp_concurrency() -> int:
+    """Parallel SMTP sends per bulk job (SMTP_CONCURRENCY, default 4)."""
+    try:
+        return max(1, int(os.getenv("SMTP_CONCURRENCY", str(_DEFAULT_CONCURRENCY))))
+    except ValueError:
+        return _DEFAULT_CONCURRENCY
+
+
+class _Pacer:
+    """Spaces sends at least ``1 / rate`` seconds apart, across all threads."""
+
+    def __init__(self, rate_per_sec: float) -> None:
+        self.interval = 1.0 / rate_per_sec
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def send_bulk_smtp(
     in_csv: str,
     *,
@@ -17,89 +51,149 @@ def send_bulk_smtp(
     smtp_password: str,
     rate_limit_per_sec: float = 10.0,
     dry_run: bool = False,
+    done_rows: Dict[int, Dict] | None = None,
+    on_outcome: Callable[[Dict], None] | None = None,
+    before_send: Callable[[int], None] | None = None,
+    concurrency: Optional[int] = None,
 ) -> List[Dict]:
     """Bulk send via SMTP from a CSV with columns: to_email, subject, body.
 
-    Returns list of outcomes per row.
+    ``concurrency`` workers (default SMTP_CONCURRENCY, at most SMTP_POOL_SIZE)
+    take rows from a shared queue and send on their own pooled sessions.
+    ``rate_limit_per_sec`` holds for all of them together: sends start at
+    least ``1 / rate`` seconds apart.
+
+    Rows listed in ``done_rows`` (1-based row number -> outcome) are not sent
+    again; their stored outcome is reported instead. ``before_send`` is called
+    with the row number just before a message goes out and ``on_outcome`` with
+    each new outcome as it happens, so callers can checkpoint progress. Both
+    are called from one thread at a time. If ``before_send`` raises (e.g. the
+    job was cancelled), no further rows are started; sends in progress finish,
+    then the exception is raised.
+
+    Returns list of outcomes per row, in row order.
     """
-    outcomes: List[Dict] = []
-    delay = 1.0 / max(1.0, rate_limit_per_sec)
+    outcomes: Dict[int, Dict] = {}
+    callback_lock = threading.Lock()
+
+    def _emit(outcome: Dict) -> None:
+        with callback_lock:
+            outcomes[outcome["row"]] = outcome
+            if on_outcome:
+                on_outcome(outcome)
 
-    # Count total emails for progress tracking
     with open(in_csv, "r", encoding="utf-8-sig") as f:
-        total_emails = sum(1 for _ in csv.DictReader(f))
-    
+        rows = list(csv.DictReader(f))
+    total_emails = len(rows)
+
     logger.info(f"Starting to send {total_emails} emails via SMTP")
 
-    with open(in_csv, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader, start=1):
-            to_email = (row.get("to_email") or "").strip()
-            subject = (row.get("subject") or "").strip()
-            body = (row.get("body") or "").strip()
-
-            if not to_email or not subject or not body:
-                outcomes.append({
-                    "row": i,
-                    "to_email": to_email,
-                    "status": "error",
-                    "code": "missing_data",
-                    "message": "Missing required field(s)"
-                })
-                continue
+    pending: "queue.Queue[tuple]" = queue.Queue()
+    for i, row in enumerate(rows, start=1):
+        if done_rows and i in done_rows:
+            outcomes[i] = done_rows[i]
+            continue
+
+        to_email = (row.get("to_email") or "").strip()
+        subject = (row.get("subject") or "").strip()
+        body = (row.get("body") or "").strip()
+
+        if not to_email or not subject or not body:
+            _emit({
+                "row": i,
+                "to_email": to_email,
+                "status": "error",
+                "code": "missing_data",
+                "message": "Missing required field(s)"
+            })
+            continue
+
+        if dry_run:
+            _emit({
+                "row": i,
+                "to_email": to_email,
+                "status": "dry_run",
+                "code": "200",
+                "message": "Would send email"
+            })
+            continue
 
-            if dry_run:
-                outcomes.append({
+        pending.put((i, to_email, subject, body))
+
+    pacer = _Pacer(max(1.0, rate_limit_per_sec))
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def _send_row(i: int, to_email: str, subject: str, body: str) -> None:
+        try:
+            logger.info(f"Sending email {i}/{total_emails} to {to_email}")
+            success = send_one_smtp(
+                to_email=to_email,
+                subject=subject,
+                body_text=body,
+                from_email=from_email,
+                smtp_server=smtp_server,
+                smtp_port=smtp_port,
+                smtp_user=smtp_user,
+                smtp_password=smtp_password,
+            )
+            if success:
+                _emit({
                     "row": i,
                     "to_email": to_email,
-                    "status": "dry_run",
+                    "status": "sent",
                     "code": "200",
-                    "message": "Would send email"
+                    "message": "Email sent successfully"
                 })
-                continue
-
-            try:
-                logger.info(f"Sending email {i}/{total_emails} to {to_email}")
-                success = send_one_smtp(
-                    to_email=to_email,
-                    subject=subject,
-                    body_text=body,
-                    from_email=from_email,
-                    smtp_server=smtp_server,
-                    smtp_port=smtp_port,
-                    smtp_user=smtp_user,
-                    smtp_password=smtp_password,
-                )
-                if success:
-                    outcomes.append({
-                        "row": i,
-                        "to_email": to_email,
-                        "status": "sent",
-                        "code": "200",
-                        "message": "Email sent successfully"
-                    })
-                    logger.info(f"✅ Email {i}/{total_emails} sent successfully to {to_email}")
-                else:
-                    outcomes.append({
-                        "row": i,
-                        "to_email": to_email,
-                        "status": "error",
-                        "code": "smtp_failed",
-                        "message": "SMTP send failed"
-                    })
-                    logger.error(f"❌ Email {i}/{total_emails} failed to send to {to_email}")
-            except Exception as exc:
-                outcomes.append({
+                logger.info(f"✅ Email {i}/{total_emails} sent successfully to {to_email}")
+            else:
+                _emit({
                     "row": i,
                     "to_email": to_email,
                     "status": "error",
-                    "code": "exception",
-                    "message": str(exc)
+                    "code": "smtp_failed",
+                    "message": "SMTP send failed"
                 })
-                logger.error(f"❌ Email {i}/{total_emails} exception for {to_email}: {exc}")
+                logger.error(f"❌ Email {i}/{total_emails} failed to send to {to_email}")
+        except Exception as exc:
+            _emit({
+                "row": i,
+                "to_email": to_email,
+                "status": "error",
+                "code": "exception",
+                "message": str(exc)
+            })
+            logger.error(f"❌ Email {i}/{total_emails} exception for {to_email}: {exc}")
+
+    def _worker() -> None:
+        while not stop.is_set():
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                return
+            pacer.wait()
+            if stop.is_set():
+                return
+            if before_send:
+                try:
+                    with callback_lock:
+                        before_send(item[0])
+                except BaseException as exc:
+                    errors.append(exc)
+                    stop.set()
+                    return
+            _send_row(*item)
 
-            if not dry_run:
-                time.sleep(delay)
+    pool_size = smtp_pool(smtp_server, smtp_port, smtp_user, smtp_password).size
+    workers = min(pending.qsize(), concurrency or smtp_concurrency(), pool_size)
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp-send") as executor:
+            for _ in range(workers):
+                # a context copy per worker keeps the job's timing spans
+                executor.submit(contextvars.copy_context().run, _worker)
+    if errors:
+        raise errors[0]
 
-    logger.info(f"Completed sending {total_emails} emails. Success: {len([o for o in outcomes if o['status'] == 'sent'])}")
-    return outcomes
+    ordered = [outcomes[i] for i in sorted(outcomes)]
+    logger.info(f"Completed sending {total_emails} emails. Success: {len([o for o in ordered if o['status'] == 'sent'])}")
+    return ordered
@@ -2,7 +2,7 @@
 Main dispatcher for email sending operations
 """
 import os
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from ..sendgrid import send_bulk_sendgrid
 from ..mailersend import send_bulk_mailersend
 from .bulk_sender import send_bulk_smtp
@@ -21,6 +21,10 @@ def send_bulk_emails(
     rate_limit_per_sec: float = 10.0,
     dry_run: bool = False,
     sandbox: bool = False,
+    done_rows: Optional[Dict[int, Dict]] = None,
+    on_outcome: Optional[Callable[[Dict], None]] = None,
+    before_send: Optional[Callable[[int], None]] = None,
+    concurrency: Optional[int] = None,
 ) -> List[Dict]:
     """Bulk send emails using the specified provider.
 
@@ -34,6 +38,10 @@ def send_bulk_emails(
         rate_limit_per_sec: Maximum emails per second
         dry_run: If True, don't actually send emails
         sandbox: If True, use sandbox mode (SendGrid only)
+        done_rows: Outcomes of rows already handled (row number -> outcome); not resent
+        on_outcome: Called with each new per-row outcome
+        before_send: Called with the row number just before each send
+        concurrency: Parallel SMTP sends (SMTP only; default SMTP_CONCURRENCY)
 
     Returns:
         List of outcomes per row
@@ -59,6 +67,10 @@ def send_bulk_emails(
             smtp_password=smtp_password,
             rate_limit_per_sec=rate_limit_per_sec,
             dry_run=dry_run,
+            done_rows=done_rows,
+            on_outcome=on_outcome,
+            before_send=before_send,
+            concurrency=concurrency,
         )
     elif provider == "sendgrid":
         if not sendgrid_api_key:
@@ -70,6 +82,9 @@ def send_bulk_emails(
             sandbox=sandbox,
             rate_limit_per_sec=rate_limit_per_sec,
             dry_run=dry_run,
+            done_rows=done_rows,
+            on_outcome=on_outcome,
+            before_send=before_send,
         )
     elif provider == "mailersend":
         if not mailersend_api_key:
@@ -80,6 +95,9 @@ def send_bulk_emails(
             api_key=mailersend_api_key,
             rate_limit_per_sec=rate_limit_per_sec,
             dry_run=dry_run,
+            done_rows=done_rows,
+            on_outcome=on_outcome,
+            before_send=before_send,
         )
     else:
         raise ValueError(f"Unknown provider: {provider}. Must be one of: smtp, sendgrid, mailersend")
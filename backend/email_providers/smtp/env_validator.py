@@ -21,3 +21,8 @@ def _require_env(name: str) -> str:
     if not value:
         raise ValueError(f"Missing required environment variable: {name}")
     return value
+
+
+def _smtp_starttls() -> bool:
+    """Whether to upgrade SMTP connections with STARTTLS (SMTP_STARTTLS, default on)."""
+    return os.getenv("SMTP_STARTTLS", "1").strip().lower() not in ("0", "false", "no", "off")
@@ -0,0 +1,270 @@
+"""
+Pooled SMTP sessions - authenticated connections reused across messages
+
+Opening an SMTP connection costs a TCP handshake, EHLO, STARTTLS (a TLS
+handshake) and AUTH. That is several round trips, usually more than the
+message itself, and providers rate-limit new connections. A pool keeps
+logged-in sessions and hands them out one caller at a time:
+
+- A session is retired after SMTP_SESSION_MAX_MESSAGES messages (default 100),
+  below the per-connection limits most providers enforce.
+- A session that sat idle for SMTP_NOOP_AFTER_S seconds (default 10) is
+  checked with NOOP before use. After SMTP_MAX_IDLE_S (default 120) it is
+  closed instead.
+- When a reused session turns out to be dead before the message went out
+  (server disconnect, reset socket), the message is sent once more on a
+  fresh session. A failure once DATA has started, or a read timeout, is
+  never resent, since the server may already have accepted the message.
+- At most SMTP_POOL_SIZE sessions (default 4) are open per server and login.
+
+Pools are shared per server, port and login for the whole process, like
+the LLM clients.
+"""
+from __future__ import annotations
+
+from email.message import Message
+from typing import Dict, List, Tuple
+import atexit
+import os
+import smtplib
+import threading
+import time
+
+from loguru import logger
+from observability import SMTP_SESSIONS, stage
+
+from .env_validator import _smtp_starttls
+
+_DEFAULT_POOL_SIZE = 4
+_DEFAULT_MAX_MESSAGES = 100
+_DEFAULT_NOOP_AFTER_S = 10.0
+_DEFAULT_MAX_IDLE_S = 120.0
+_DEFAULT_TIMEOUT_S = 60.0
+
+
+class SMTPDeliveryUnknown(smtplib.SMTPException):
+    """The connection failed after DATA started; the server may have accepted the message."""
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class _SMTP(smtplib.SMTP):
+    """smtplib.SMTP that notes when a message's DATA command was sent."""
+
+    data_started = False
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class _Session:
+    def __init__(self, smtp: _SMTP) -> None:
+        self.smtp = smtp
+        self.messages = 0
+        self.last_used = time.monotonic()
+        self.broken = False
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+
+class SMTPSessionPool:
+    """Logged-in SMTP sessions to one server, checked out one caller at a time."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        *,
+        size: int = _DEFAULT_POOL_SIZE,
+        max_messages: int = _DEFAULT_MAX_MESSAGES,
+        noop_after_s: float = _DEFAULT_NOOP_AFTER_S,
+        max_idle_s: float = _DEFAULT_MAX_IDLE_S,
+        timeout_s: float = _DEFAULT_TIMEOUT_S,
+        starttls: bool = True,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._user = user
+        self._password = password
+        self.size = max(1, int(size))
+        self.max_messages = max(1, int(max_messages))
+        self.noop_after_s = noop_after_s
+        self.max_idle_s = max_idle_s
+        self.timeout_s = timeout_s
+        self.starttls = starttls
+        self._idle: List[_Session] = []  # most recently used last
+        self._open = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _connect(self) -> _Session:
+        with stage("smtp_connect", server=self.host):
+            smtp = _SMTP(self.host, self.port, timeout=self.timeout_s)
+            try:
+                if self.starttls:
+                    smtp.starttls()
+                smtp.login(self._user, self._password)
+            except Exception:
+                smtp.close()
+                raise
+        SMTP_SESSIONS.inc(event="opened")
+        return _Session(smtp)
+
+    def _healthy(self, session: _Session) -> bool:
+        """Whether an idle session can be used (NOOP-checked after a pause)."""
+        idle = time.monotonic() - session.last_used
+        if idle >= self.max_idle_s:
+            SMTP_SESSIONS.inc(event="expired")
+            return False
+        if idle < self.noop_after_s:
+            return True
+        try:
+            if session.smtp.noop()[0] == 250:
+                return True
+        except Exception:
+            pass
+        SMTP_SESSIONS.inc(event="stale")
+        return False
+
+    def _checkout(self) -> Tuple[_Session, bool]:
+        """(session, reused): an idle healthy session, or a new one once a slot is free."""
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.size:
+                    self._cond.wait()
+                if self._closed:
+                    raise RuntimeError("SMTP session pool is closed")
+                session = self._idle.pop() if self._idle else None
+                if session is None:
+                    self._open += 1
+            if session is None:
+                try:
+                    return self._connect(), False
+                except Exception:
+                    self._discard()
+                    raise
+            if self._healthy(session):
+                SMTP_SESSIONS.inc(event="reused")
+                return session, True
+            session.close()
+            self._discard()
+
+    def _discard(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _checkin(self, session: _Session) -> None:
+        if session.broken or session.messages >= self.max_messages or self._closed:
+            if not session.broken and session.messages >= self.max_messages:
+                SMTP_SESSIONS.inc(event="retired")
+            session.close()
+            self._discard()
+            return
+        session.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    def send_message(self, msg: Message) -> None:
+        """
+        Send one message on a pooled session.
+
+        If a reused session turns out to be disconnected before DATA was
+        sent, the message is sent once more on a new session. Errors the
+        server answered with (a refused sender or recipient, a rejected
+        message) are raised and leave the session in the pool.
+
+        Raises:
+            SMTPDeliveryUnknown: The connection failed or timed out after DATA
+                started; resending could deliver the message twice
+            smtplib.SMTPException: The server refused the message or the login
+            OSError: The server could not be reached
+        """
+        while True:
+            session, reused = self._checkout()
+            session.smtp.data_started = False
+            try:
+                session.smtp.send_message(msg)
+                session.messages += 1
+                return
+            except smtplib.SMTPServerDisconnected as exc:
+                session.broken = True
+                if session.smtp.data_started:
+                    raise SMTPDeliveryUnknown(f"connection lost after DATA: {exc}") from exc
+                # getreply() reports a read timeout as a disconnect; the
+                # server may just be slow, so do not send the message again.
+                if not reused or isinstance(exc.__context__, TimeoutError):
+                    raise
+                SMTP_SESSIONS.inc(event="reconnected")
+                logger.info(f"SMTP session to {self.host} dropped ({exc}); resending on a new session")
+            except smtplib.SMTPException:
+                raise  # the server answered; sendmail() already reset the transaction
+            except OSError as exc:
+                session.broken = True
+                if session.smtp.data_started:
+                    raise SMTPDeliveryUnknown(f"connection lost after DATA: {exc}") from exc
+                raise
+            finally:
+                self._checkin(session)
+
+    def close(self) -> None:
+        """Close the idle sessions; sessions in use are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            session.close()
+
+
+_pools: Dict[Tuple[str, int, str, str, bool], SMTPSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def smtp_pool(host: str, port: int, user: str, password: str) -> SMTPSessionPool:
+    """
+    The process-wide session pool for a server and login, configured from
+    the SMTP_* settings in the module docstring (and SMTP_STARTTLS).
+    """
+    starttls = _smtp_starttls()
+    key = (host, int(port), user, password, starttls)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPSessionPool(
+                host,
+                int(port),
+                user,
+                password,
+                size=int(_env_float("SMTP_POOL_SIZE", _DEFAULT_POOL_SIZE)),
+                max_messages=int(_env_float("SMTP_SESSION_MAX_MESSAGES", _DEFAULT_MAX_MESSAGES)),
+                noop_after_s=_env_float("SMTP_NOOP_AFTER_S", _DEFAULT_NOOP_AFTER_S),
+                max_idle_s=_env_float("SMTP_MAX_IDLE_S", _DEFAULT_MAX_IDLE_S),
+                timeout_s=_env_float("SMTP_TIMEOUT_S", _DEFAULT_TIMEOUT_S),
+                starttls=starttls,
+            )
+        return pool
+
+
+@atexit.register
+def close_pools() -> None:
+    """Close every pool's idle sessions (QUIT), e.g. at shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -5,7 +5,19 @@ import time
 import smtplib
 from email.mime.text import MIMEText
 from loguru import logger
+from observability import stage, record_provider_error, error_code
 from .env_validator import _require_env
+from .pool import SMTPDeliveryUnknown, smtp_pool
+
+
+def _retryable(exc: Exception) -> bool:
+    """Whether sending again can help without risking a duplicate."""
+    if isinstance(exc, (SMTPDeliveryUnknown, smtplib.SMTPRecipientsRefused)):
+        return False
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code < 500  # 4xx is temporary, 5xx permanent
+    return True
+
 
 def send_one_smtp(
     to_email: str,
@@ -22,6 +34,11 @@ def send_one_smtp(
 ) -> bool:
     """Send a single email via SMTP.
 
+    The message goes out on a pooled, already logged-in session (see
+    email_providers.smtp.pool), so consecutive sends share one connection.
+    Temporary failures are retried; permanent refusals (5xx, refused
+    recipients) and failures after DATA, which may have been delivered, are not.
+
     Returns True if the email was sent successfully, False otherwise.
     """
     try:
@@ -34,20 +51,18 @@ def send_one_smtp(
         while True:
             attempt += 1
             try:
-                server = smtplib.SMTP(smtp_server, smtp_port)
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
-                server.quit()
+                with stage("send_smtp", attempt=attempt):
+                    smtp_pool(smtp_server, smtp_port, smtp_user, smtp_password).send_message(msg)
                 logger.info(f"Email sent successfully to {to_email}")
                 return True
             except Exception as exc:
-                if attempt < max_retries:
+                record_provider_error("smtp", error_code(exc))
+                if attempt < max_retries and _retryable(exc):
                     sleep_s = backoff_base * (2 ** (attempt - 1))
                     logger.warning(f"SMTP attempt {attempt} failed; retrying in {sleep_s:.1f}s: {exc}")
                     time.sleep(sleep_s)
                     continue
-                logger.error(f"Failed to send email to {to_email} after {max_retries} attempts: {exc}")
+                logger.error(f"Failed to send email to {to_email} after {attempt} attempt(s): {exc}")
                 return False
     except Exception as e:
         logger.error(f"Failed to send email to {to_email}: {e}")
@@ -1,10 +1,16 @@
 """
 Emails Module Package - email management functions
 """
-from .core import generate_emails_for_rows, send_email, send_follow_up_email
+from .core import (
+    generate_emails_for_rows, generate_emails_from_template, generate_emails_via_batch, send_email, send_follow_up_email,
+)
+from .templates import validate_template
 
 __all__ = [
     'generate_emails_for_rows',
+    'generate_emails_from_template',
+    'generate_emails_via_batch',
+    'validate_template',
     'send_email',
     'send_follow_up_email'
 ]
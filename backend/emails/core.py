@@ -1,15 +1,29 @@
 """
 Core Email Functions - extracted from ai_backlinking_emails.py
 """
-import smtplib
+import contextvars
+import functools
 import imaplib
 import email as email_module
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
 from loguru import logger
+from observability import span, stage, DRAFTS
+from email_providers.smtp.pool import smtp_pool
 
 # Import from the modularized LLM package
-from llm import compose_personalized_email
+from llm import (
+    LLMResult, draft_personalized_email, draft_personalized_emails_batch, draft_template_slots_batch,
+    personalized_email_prompt, prompt_tokens,
+    provider_concurrency,
+)
+from llm.summaries import summary_insights
+from llm.tokens import count_tokens
+from llm.usage import CallUsage, record_cache_hit
+from llm.openai_batch import batch_request_line, cached_completion, store_completion
+from .templates import TEMPLATE_BATCH_SIZE, LLM_SLOTS, fallback_values, fill_template, llm_slots, local_values, validate_template
 
 
 def send_email(smtp_server, smtp_port, smtp_user, smtp_password, to_email, subject, body):
@@ -35,11 +49,8 @@ def send_email(smtp_server, smtp_port, smtp_user, smtp_password, to_email, subje
         msg['Subject'] = subject
         msg.attach(MIMEText(body, 'plain'))
 
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        server.send_message(msg)
-        server.quit()
+        with stage("send_smtp"):
+            smtp_pool(smtp_server, smtp_port, smtp_user, smtp_password).send_message(msg)
 
         logger.info(f"Email sent successfully to {to_email}")
         return True
@@ -142,6 +153,125 @@ def _strip_subject_prefix(text: str) -> str:
     return text
 
 
+def _email_dict(row: dict, result, opts: dict) -> dict:
+    body = _strip_subject_prefix(result.text)
+    status = "ok"
+    note = ""
+    if result.fallback:
+        status = "fallback"
+        note = "LLM placeholder (missing key or error)"
+    elif result.cached:
+        note = "LLM response cache hit"
+    elif result.failover:
+        note = f"answered by {result.provider} (failover)"
+    DRAFTS.inc(status=status, provider=opts["provider"])
+    return {
+        "to_email": row.get("contact_email", ""),
+        "subject": opts["subject"],
+        "body": body,
+        "url": row.get("url", ""),
+        "domain": row.get("domain", ""),
+        "title": row.get("title", ""),
+        "context_source": row.get("context_source", ""),
+        "excerpt_chars": len(row.get("page_excerpt") or ""),
+        "status": status,
+        "note": note,
+        "provider": result.provider if result.failover else opts["provider"],
+        "model": result.model if result.failover else opts["model"] or "",
+        "prompt_tokens": result.prompt_tokens,
+        "completion_tokens": result.completion_tokens,
+        "llm_latency_s": result.latency_s,
+        "llm_attempts": result.attempts,
+        "cost_usd": round(result.cost_usd, 6) if result.cost_usd is not None else None,
+        "relevance": row.get("relevance", 0.0),
+    }
+
+
+def _insights(row: dict) -> str:
+    if row.get("page_summary"):
+        return summary_insights(row["page_summary"], row.get("content_highlights") or [])
+    return row.get("page_excerpt") or row.get("notes") or f"Page: {row.get('url','')}"
+
+
+def _draft_for_row(row: dict, opts: dict, on_text: Callable[[str], None] | None = None) -> dict:
+    with span("draft", url=row.get("url", "")):
+        result = draft_personalized_email(
+            row,
+            _insights(row),
+            opts["user_proposal"],
+            provider=opts["provider"],
+            model=opts["model"],
+            openai_api_key=opts["openai_api_key"],
+            gemini_api_key=opts["gemini_api_key"],
+            fresh=opts["fresh"],
+            hedge=opts["hedge"],
+            on_text=on_text,
+        )
+    return _email_dict(row, result, opts)
+
+
+def _draft_batch(rows: list[dict], opts: dict) -> list[dict]:
+    """One request for all rows; rows the answer did not cover are drafted one by one."""
+    if len(rows) == 1:
+        return [_draft_for_row(rows[0], opts)]
+    with span("draft_batch", sites=len(rows)):
+        results = draft_personalized_emails_batch(
+            [(row, _insights(row)) for row in rows],
+            opts["user_proposal"],
+            provider=opts["provider"],
+            model=opts["model"],
+            openai_api_key=opts["openai_api_key"],
+            gemini_api_key=opts["gemini_api_key"],
+            fresh=opts["fresh"],
+            hedge=opts["hedge"],
+        )
+    return [
+        _email_dict(row, result, opts) if result is not None else _draft_for_row(row, opts)
+        for row, result in zip(rows, results)
+    ]
+
+
+def _preview_text(on_preview: Callable[[int, str, bool], None], index: int, text: str) -> None:
+    on_preview(index, _strip_subject_prefix(text), False)
+
+
+def _run_chunks(
+    total: int,
+    size: int,
+    provider: str,
+    task: Callable[[list[int]], list[dict]],
+    on_draft: Callable[[int, int], None] | None,
+    on_email: Callable[[int, dict], None] | None = None,
+) -> list[dict]:
+    """
+    Run task(row indices) -> email dicts for consecutive chunks of ``size``
+    rows on a thread pool sized by the provider's concurrency cap.
+
+    on_email(index, email) and then on_draft(done, total) are called in the
+    calling thread as chunks finish. The result keeps the row order.
+    """
+    chunks = [list(range(start, min(start + size, total))) for start in range(0, total, size)]
+    workers = min(len(chunks), provider_concurrency(provider))
+    generated: list[dict | None] = [None] * total
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="draft") as pool:
+        # Each draft runs in a copy of this context so its spans land in the job's timings.
+        futures = {pool.submit(contextvars.copy_context().run, task, chunk): chunk for chunk in chunks}
+        try:
+            for fut in as_completed(futures):
+                for i, email in zip(futures[fut], fut.result()):
+                    generated[i] = email
+                    if on_email:
+                        on_email(i, email)
+                done += len(futures[fut])
+                if on_draft:
+                    on_draft(done, total)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return generated  # type: ignore[return-value]
+
+
 def generate_emails_for_rows(
     rows: list[dict],
     subject: str,
@@ -154,43 +284,250 @@ def generate_emails_for_rows(
     firecrawl_api_key: str | None = None,  # unused here but kept for parity
     gemini_api_key: str | None = None,
     openai_api_key: str | None = None,
+    on_draft: Callable[[int, int], None] | None = None,
+    fresh: bool = False,
+    batch_size: int = 1,
+    hedge: bool | None = None,
+    on_preview: Callable[[int, str, bool], None] | None = None,
 ) -> list[dict]:
-    generated: list[dict] = []
-    for row in rows:
-        insights = row.get("page_excerpt") or row.get("notes") or f"Page: {row.get('url','')}"
-        body = compose_personalized_email(
-            row,
-            insights,
-            {
-                "user_name": your_name,
-                "user_email": your_email,
-                "topic": proposed_topic or "a guest post",
-            },
-            provider=provider,
+    """
+    Draft one outreach email per row, several at a time.
+
+    Drafts run on a thread pool sized by the provider's concurrency cap
+    (GEMINI_CONCURRENCY / OPENAI_CONCURRENCY); the cap itself is enforced
+    per process in llm_text_gen, so concurrent jobs share it.
+
+    Args:
+        rows (list): Research rows to draft for.
+        on_draft (callable): Called as on_draft(done, total) in the calling
+            thread after each finished draft (used for job progress).
+        fresh (bool): Bypass the LLM response cache (drafts are still stored).
+        batch_size (int): Sites per LLM request. Above 1, the instructions
+            are sent once per batch and the answer is parsed as JSON; rows it
+            does not cover are retried individually.
+        hedge (bool): Hedge slow requests to the other provider (default: LLM_HEDGE).
+        on_preview (callable): Stream drafts (batch_size 1 only): called as
+            on_preview(index, body_so_far, False) from the drafting threads
+            while a draft streams in, and on_preview(index, body, True) in
+            the calling thread when it is finished, before on_draft.
+
+    Returns:
+        list: One email dict per row, in the order of ``rows``.
+    """
+    if not rows:
+        return []
+    opts = {
+        "subject": subject,
+        "user_proposal": {
+            "user_name": your_name,
+            "user_email": your_email,
+            "topic": proposed_topic or "a guest post",
+        },
+        "provider": provider,
+        "model": model,
+        "gemini_api_key": gemini_api_key,
+        "openai_api_key": openai_api_key,
+        "fresh": fresh,
+        "hedge": hedge,
+    }
+    size = max(1, batch_size)
+    if on_preview is not None and size == 1:
+        def task(chunk: list[int]) -> list[dict]:
+            return [_draft_for_row(rows[chunk[0]], opts, functools.partial(_preview_text, on_preview, chunk[0]))]
+
+        def on_email(i: int, email: dict) -> None:
+            on_preview(i, email["body"], True)
+
+        return _run_chunks(len(rows), size, provider, task, on_draft, on_email)
+    return _run_chunks(len(rows), size, provider, lambda chunk: _draft_batch([rows[i] for i in chunk], opts), on_draft)
+
+
+def generate_emails_via_batch(
+    rows: list[dict],
+    subject: str,
+    your_name: str,
+    your_email: str,
+    proposed_topic: str | None,
+    run_batch: Callable[[list[dict]], dict[str, str | None]],
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    fresh: bool = False,
+    on_draft: Callable[[int, int], None] | None = None,
+) -> list[dict]:
+    """
+    Draft one outreach email per row through the OpenAI Batch API.
+
+    Rows whose prompt is already in the LLM response cache are not
+    submitted (unless ``fresh``); batch answers are added to the cache.
+    Rows the batch did not answer are drafted in real time.
+
+    Args:
+        rows (list): Research rows to draft for.
+        run_batch (callable): Submits the request lines (see
+            llm.openai_batch.batch_request_line), waits for the batch and
+            returns custom_id -> text (None for a failed request).
+        on_draft (callable): As for generate_emails_for_rows; called once
+            for the batch answers, then per real-time draft.
+
+    Returns:
+        list: One email dict per row, in the order of ``rows``.
+    """
+    if not rows:
+        return []
+    model_name = model or "gpt-4o-mini"
+    opts = {
+        "subject": subject,
+        "provider": "openai",
+        "model": model,
+    }
+    user_proposal = {
+        "user_name": your_name,
+        "user_email": your_email,
+        "topic": proposed_topic or "a guest post",
+    }
+    prompts = [personalized_email_prompt(row, _insights(row), user_proposal) for row in rows]
+    generated: list[dict | None] = [None] * len(rows)
+    lines = []
+    for i, (row, prompt) in enumerate(zip(rows, prompts)):
+        text = None if fresh else cached_completion(prompt, model_name)
+        if text is not None:
+            record_cache_hit()
+            generated[i] = _email_dict(row, LLMResult(text, "openai", model_name, cached=True, prompt_tokens=prompt_tokens(prompt, "openai")), opts)
+        else:
+            lines.append(batch_request_line(f"row-{i}", prompt, model_name))
+
+    answers = run_batch(lines) if lines else {}
+    for line in lines:
+        i = int(line["custom_id"].split("-", 1)[1])
+        text = answers.get(line["custom_id"])
+        if text:
+            store_completion(prompts[i], model_name, text)
+            # Per-row estimate; the job totals get the counts the batch reported.
+            usage = CallUsage("openai", model_name, prompt_tokens(prompts[i], "openai"), count_tokens(text), batch=True)
+            generated[i] = _email_dict(
+                rows[i],
+                LLMResult(
+                    text, "openai", model_name,
+                    prompt_tokens=usage.prompt_tokens,
+                    completion_tokens=usage.completion_tokens,
+                    cost_usd=usage.cost_usd,
+                ),
+                opts,
+            )
+
+    missing = [i for i, email in enumerate(generated) if email is None]
+    done = len(rows) - len(missing)
+    if on_draft:
+        on_draft(done, len(rows))
+    if missing:
+        logger.warning(f"OpenAI batch left {len(missing)} of {len(rows)} drafts unanswered; drafting them in real time")
+        retried = generate_emails_for_rows(
+            [rows[i] for i in missing],
+            subject,
+            your_name,
+            your_email,
+            proposed_topic,
+            provider="openai",
             model=model,
             openai_api_key=openai_api_key,
-            gemini_api_key=gemini_api_key,
+            on_draft=(lambda n, _total: on_draft(done + n, len(rows))) if on_draft else None,
+            fresh=True,  # these already missed the cache above
         )
-        body = _strip_subject_prefix(body)
-        status = "ok"
-        note = ""
-        if body.startswith("[AI Draft]"):
-            status = "fallback"
-            note = "LLM placeholder (missing key or error)"
-        generated.append(
-            {
-                "to_email": row.get("contact_email", ""),
-                "subject": subject,
-                "body": body,
-                "url": row.get("url", ""),
-                "domain": row.get("domain", ""),
-                "title": row.get("title", ""),
-                "context_source": row.get("context_source", ""),
-                "excerpt_chars": len(row.get("page_excerpt") or ""),
-                "status": status,
-                "note": note,
-                "provider": provider,
-                "model": model or "",
-            }
-        )
-    return generated
+        for i, email in zip(missing, retried):
+            generated[i] = email
+    return generated  # type: ignore[return-value]
+
+
+def _template_chunk(rows: list[dict], template: str, opts: dict) -> list[dict]:
+    """Drafts for one chunk: one slot request for all rows, page data where it had no answer."""
+    slots = {name: LLM_SLOTS[name] for name in llm_slots(template)}
+    answers: list[dict | None] = [None] * len(rows)
+    result = None
+    if slots:
+        with span("template_slots", sites=len(rows)):
+            answers, result = draft_template_slots_batch(
+                [(row, _insights(row)) for row in rows],
+                slots,
+                opts["user_proposal"],
+                provider=opts["provider"],
+                model=opts["model"],
+                openai_api_key=opts["openai_api_key"],
+                gemini_api_key=opts["gemini_api_key"],
+                fresh=opts["fresh"],
+                hedge=opts["hedge"],
+            )
+    emails = []
+    for row, answer in zip(rows, answers):
+        values = local_values(row, opts["user_proposal"])
+        if slots and answer is None:
+            values.update(fallback_values(row, row.get("page_excerpt") or _insights(row), opts["user_proposal"]))
+            draft = LLMResult(fill_template(template, values), opts["provider"], opts["model"] or "", fallback=True)
+            email = _email_dict(row, draft, opts)
+            email["note"] = "template slots filled from page data (LLM unavailable)"
+        else:
+            values.update(answer or {})
+            text = fill_template(template, values)
+            if result is not None:
+                draft = result.share(text, len(rows))
+            else:
+                draft = LLMResult(text, opts["provider"], opts["model"] or "")
+            email = _email_dict(row, draft, opts)
+            email["note"] = ", ".join(n for n in ("template", email["note"]) if n)
+        emails.append(email)
+    return emails
+
+
+def generate_emails_from_template(
+    rows: list[dict],
+    template: str,
+    subject: str,
+    your_name: str,
+    your_email: str,
+    proposed_topic: str | None,
+    provider: str = "gemini",
+    model: str | None = None,
+    gemini_api_key: str | None = None,
+    openai_api_key: str | None = None,
+    on_draft: Callable[[int, int], None] | None = None,
+    fresh: bool = False,
+    batch_size: int = TEMPLATE_BATCH_SIZE,
+    hedge: bool | None = None,
+) -> list[dict]:
+    """
+    Draft one email per row from a template (see emails.templates).
+
+    The LLM only writes the template's personalization slots, a few short
+    values per site, for ``batch_size`` sites per request. Rows it did not
+    answer, or every row when it is unavailable, get slots filled from the
+    page data and status "fallback".
+
+    Raises:
+        ValueError: The template uses an unknown slot
+
+    Returns:
+        list: One email dict per row, in the order of ``rows``.
+    """
+    validate_template(template)
+    if not rows:
+        return []
+    opts = {
+        "subject": subject,
+        "user_proposal": {
+            "user_name": your_name,
+            "user_email": your_email,
+            "topic": proposed_topic or "a guest post",
+        },
+        "provider": provider,
+        "model": model,
+        "gemini_api_key": gemini_api_key,
+        "openai_api_key": openai_api_key,
+        "fresh": fresh,
+        "hedge": hedge,
+    }
+    return _run_chunks(
+        len(rows),
+        max(1, batch_size),
+        provider,
+        lambda chunk: _template_chunk([rows[i] for i in chunk], template, opts),
+        on_draft,
+    )
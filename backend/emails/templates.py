@@ -0,0 +1,97 @@
+"""
+Email templates - template-first drafting with personalization slots
+
+A template is the email body with ``{slot}`` placeholders. Two kinds of
+slots exist:
+
+- local slots, filled from the row and the sender: {site_name}, {domain},
+  {url}, {title}, {topic}, {your_name}, {your_email}
+- personalization slots, written by the LLM in one short, batched request:
+  {research_hook}, {topic_pitch}, {value_prop}
+
+When the LLM is unavailable (no key, provider error, unusable answer), the
+personalization slots are filled from the extracted page data instead, so
+every row still gets a complete draft.
+"""
+import re
+from typing import Dict, List
+
+from llm.tokens import fit_excerpt
+
+SLOT_PATTERN = re.compile(r"\{([a-z_]+)\}")
+
+LOCAL_SLOTS = ("site_name", "domain", "url", "title", "topic", "your_name", "your_email")
+
+# Slot -> instruction given to the LLM for it.
+LLM_SLOTS = {
+    "research_hook": "one sentence (max 25 words) that references a specific theme or article from the site's excerpt",
+    "topic_pitch": "a concrete guest post title on the proposed topic that fits the site's content (max 15 words, no quotes)",
+    "value_prop": "one sentence (max 25 words) on what the post gives the site's readers",
+}
+
+TEMPLATE_BATCH_SIZE = 10  # sites per slot request (the answers are a few short values each)
+_HOOK_TOKENS = 30
+
+
+def template_slots(template: str) -> List[str]:
+    """Slots used by a template, in order of first use."""
+    seen: List[str] = []
+    for name in SLOT_PATTERN.findall(template):
+        if name not in seen:
+            seen.append(name)
+    return seen
+
+
+def validate_template(template: str) -> None:
+    """
+    Check that a template only uses known slots.
+
+    Raises:
+        ValueError: The template is empty or uses an unknown slot
+    """
+    if not template.strip():
+        raise ValueError("template is empty")
+    unknown = [s for s in template_slots(template) if s not in LOCAL_SLOTS and s not in LLM_SLOTS]
+    if unknown:
+        known = ", ".join("{" + s + "}" for s in (*LOCAL_SLOTS, *LLM_SLOTS))
+        raise ValueError(f"unknown template slot(s) {', '.join('{' + s + '}' for s in unknown)}; known: {known}")
+
+
+def llm_slots(template: str) -> List[str]:
+    """The template's slots that the LLM writes."""
+    return [s for s in template_slots(template) if s in LLM_SLOTS]
+
+
+def local_values(row: dict, user_proposal: dict) -> Dict[str, str]:
+    domain = row.get("domain", "") or ""
+    title = row.get("title", "") or ""
+    return {
+        "site_name": title or domain or "your site",
+        "domain": domain,
+        "url": row.get("url", "") or "",
+        "title": title,
+        "topic": user_proposal.get("topic", "a guest post"),
+        "your_name": user_proposal.get("user_name", ""),
+        "your_email": user_proposal.get("user_email", ""),
+    }
+
+
+def fallback_values(row: dict, excerpt: str, user_proposal: dict) -> Dict[str, str]:
+    """Personalization slots from page data alone (no LLM)."""
+    site = row.get("title") or row.get("domain") or "your site"
+    topic = user_proposal.get("topic", "a guest post")
+    sentence = fit_excerpt(excerpt or "", _HOOK_TOKENS, (row.get("title", ""), topic)).strip()
+    if sentence and not sentence.startswith("Page: "):
+        hook = f'I was reading {site} and your point that "{sentence.rstrip(".")}" stuck with me.'
+    else:
+        hook = f"I have been reading {site} and enjoy the topics you cover."
+    return {
+        "research_hook": hook,
+        "topic_pitch": topic[:1].upper() + topic[1:] if topic else "A guest post for your readers",
+        "value_prop": f"It would give {site}'s readers practical, well-researched advice they can act on.",
+    }
+
+
+def fill_template(template: str, values: Dict[str, str]) -> str:
+    """Replace every known slot; anything else in braces is left as written."""
+    return SLOT_PATTERN.sub(lambda m: values.get(m.group(1), m.group(0)), template)
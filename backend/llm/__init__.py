@@ -1,9 +1,23 @@
 """
 LLM Module Package - language model functions
 """
-from .core import llm_text_gen, compose_personalized_email
+from .core import (
+    LLMResult, llm_generate, llm_text_gen, compose_personalized_email, draft_personalized_email,
+    draft_personalized_emails_batch, draft_template_slots_batch, personalized_email_prompt, prompt_tokens,
+)
+from .concurrency import provider_concurrency
+from .tokens import count_tokens
 
 __all__ = [
+    'LLMResult',
+    'llm_generate',
     'llm_text_gen',
-    'compose_personalized_email'
+    'compose_personalized_email',
+    'draft_personalized_email',
+    'draft_personalized_emails_batch',
+    'draft_template_slots_batch',
+    'personalized_email_prompt',
+    'prompt_tokens',
+    'provider_concurrency',
+    'count_tokens',
 ]
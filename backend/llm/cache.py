@@ -0,0 +1,167 @@
+"""
+LLM Response Cache - persistent, content-addressed cache of LLM completions
+
+Responses are keyed by a SHA-256 of (provider, model, temperature, system
+prompt, user prompt), so re-drafting the same rows (for example after only
+the subject changed) or two jobs sharing rows pay for each prompt once.
+Placeholder drafts are never stored.
+
+The cache is a SQLite file shared by the API and workers:
+
+- LLM_CACHE_DB: database path (default data/llm_cache.sqlite3)
+- LLM_CACHE_TTL: seconds an entry stays valid (default 7 days)
+- LLM_CACHE_MAX_ENTRIES: entries kept, least recently used evicted first (default 5000)
+- LLM_CACHE=0 disables the cache
+"""
+from __future__ import annotations
+
+from contextlib import closing
+from typing import Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+from observability import CACHE_REQUESTS
+
+_DEFAULT_TTL_S = 7 * 24 * 3600
+_DEFAULT_MAX_ENTRIES = 5000
+
+
+def cache_key(provider: str, model: str, temperature: float | None, system: str, prompt: str) -> str:
+    """Content address of one completion request."""
+    payload = json.dumps([provider, model, temperature, system, prompt], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class ResponseCache:
+    def __init__(self, db_path: str, ttl_s: float = _DEFAULT_TTL_S, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        self._db_path = db_path
+        self.ttl_s = ttl_s
+        self.max_entries = max(1, int(max_entries))
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        parent = os.path.dirname(self._db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for a key, or None when missing or expired."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT text, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_s:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, text: str, provider: str, model: str) -> None:
+        """Store a completion, then drop expired entries and trim to max_entries."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO llm_cache (key, provider, model, text, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET text = excluded.text, created_at = excluded.created_at, "
+                "accessed_at = excluded.accessed_at",
+                (key, provider, model, text, now, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_s,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+_cache: Optional[ResponseCache] = None
+_cache_path: Optional[str] = None
+_cache_lock = threading.Lock()
+
+
+def response_cache() -> Optional[ResponseCache]:
+    """The configured cache (see module docstring), or None when disabled or unusable."""
+    global _cache, _cache_path
+    if os.getenv("LLM_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    path = os.getenv("LLM_CACHE_DB") or os.path.join("data", "llm_cache.sqlite3")
+    with _cache_lock:
+        if _cache_path != path:
+            # An unusable path disables the cache (for this path) instead of failing drafts.
+            try:
+                _cache = ResponseCache(
+                    path,
+                    ttl_s=_env_number("LLM_CACHE_TTL", _DEFAULT_TTL_S),
+                    max_entries=int(_env_number("LLM_CACHE_MAX_ENTRIES", _DEFAULT_MAX_ENTRIES)),
+                )
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning(f"LLM cache disabled; cannot open {path}: {exc}")
+                _cache = None
+            _cache_path = path
+        return _cache
+
+
+def cached_lookup(key: str) -> Optional[str]:
+    """Look a key up, counting the hit or miss; cache errors count as a miss."""
+    return cached_lookup_any([key])[1]
+
+
+def cached_lookup_any(keys: Sequence[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Look keys up in order and return (key, text) of the first hit, or
+    (None, None). Counts one hit or miss; cache errors count as a miss.
+    """
+    cache = response_cache()
+    if cache is None:
+        return None, None
+    found: Tuple[Optional[str], Optional[str]] = (None, None)
+    try:
+        for key in keys:
+            text = cache.get(key)
+            if text is not None:
+                found = (key, text)
+                break
+    except sqlite3.Error as exc:
+        logger.warning(f"LLM cache read failed: {exc}")
+    CACHE_REQUESTS.inc(cache="llm", result="hit" if found[1] is not None else "miss")
+    return found
+
+
+def cache_store(key: str, text: str, provider: str, model: str) -> None:
+    cache = response_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(key, text, provider, model)
+    except sqlite3.Error as exc:
+        logger.warning(f"LLM cache write failed: {exc}")
@@ -0,0 +1,149 @@
+"""
+LLM Clients - cached, thread-safe provider clients
+
+`llm_text_gen` used to build a new OpenAI client, or reconfigure the global
+Gemini SDK, on every call. Clients are now created once per provider, API
+key and endpoint, and shared by every draft and job in the process, so
+their HTTP connections (and TLS sessions) stay alive between requests.
+The model is a per-request parameter, so one client serves every model
+used with a key.
+
+Both clients are safe to share between threads. Gemini goes through the
+generated GenerativeServiceClient with its own client options rather than
+`genai.configure`, which mutates process-wide state.
+"""
+from typing import Any, Dict, Iterator, Tuple
+import os
+import threading
+
+_clients: Dict[Tuple[str, str, str], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _cached(key: Tuple[str, str, str], factory) -> Any:
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = factory()
+        return client
+
+
+def openai_client(api_key: str) -> Any:
+    """
+    Shared OpenAI client for an API key (and OPENAI_BASE_URL, if set).
+
+    Raises:
+        ImportError: The openai package is not installed
+    """
+    from openai import OpenAI  # type: ignore
+    import httpx
+
+    base_url = os.getenv("OPENAI_BASE_URL") or ""
+
+    def factory() -> Any:
+        # An explicit httpx client keeps one keep-alive pool per key; it also
+        # avoids the SDK building one with arguments newer httpx rejects.
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            follow_redirects=True,
+        )
+        # Retries are done by llm.concurrency.call_provider, which also feeds the AIMD limit.
+        return OpenAI(api_key=api_key, base_url=base_url or None, http_client=http_client, max_retries=0)
+
+    return _cached(("openai", api_key, base_url), factory)
+
+
+def gemini_client(api_key: str) -> Any:
+    """
+    Shared Gemini GenerativeServiceClient for an API key (and GEMINI_API_ENDPOINT, if set).
+
+    Raises:
+        ImportError: The google-generativeai package is not installed
+    """
+    from google.ai import generativelanguage as glm  # type: ignore
+    from google.api_core import client_options as client_options_lib  # type: ignore
+
+    endpoint = os.getenv("GEMINI_API_ENDPOINT") or ""
+
+    def factory() -> Any:
+        options = client_options_lib.ClientOptions(api_key=api_key)
+        if endpoint:
+            # e.g. a local stand-in for load tests; only the REST transport accepts http:// endpoints
+            options.api_endpoint = endpoint
+            return glm.GenerativeServiceClient(client_options=options, transport="rest")
+        return glm.GenerativeServiceClient(client_options=options)
+
+    return _cached(("gemini", api_key, endpoint), factory)
+
+
+def _gemini_request(model: str, prompt: str, json_output: bool) -> Any:
+    from google.ai import generativelanguage as glm  # type: ignore
+
+    name = model if model.startswith(("models/", "tunedModels/")) else f"models/{model}"
+    request = glm.GenerateContentRequest(
+        model=name,
+        contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])],
+    )
+    if json_output:
+        request.generation_config = glm.GenerationConfig(response_mime_type="application/json")
+    return request
+
+
+def _record_usage(resp: Any, usage: Dict[str, int] | None) -> None:
+    """Copy the token counts Gemini reported (if any) into ``usage``."""
+    meta = getattr(resp, "usage_metadata", None)
+    if usage is None or meta is None:
+        return
+    if meta.prompt_token_count or meta.candidates_token_count:
+        usage["prompt_tokens"] = int(meta.prompt_token_count)
+        usage["completion_tokens"] = int(meta.candidates_token_count)
+
+
+def _first_candidate_text(resp: Any) -> str:
+    for candidate in resp.candidates:
+        return "".join(part.text for part in candidate.content.parts)
+    return ""
+
+
+def gemini_generate(
+    api_key: str,
+    model: str,
+    prompt: str,
+    json_output: bool = False,
+    timeout: float | None = None,
+    usage: Dict[str, int] | None = None,
+) -> str:
+    """
+    One-turn Gemini completion through the shared client.
+
+    Args:
+        json_output: Ask for a JSON response (response_mime_type application/json)
+        timeout: Request timeout in seconds
+        usage: Filled with the reported prompt_tokens and completion_tokens, if any
+
+    Returns:
+        The text of the first candidate ("" when nothing was returned, e.g. a blocked prompt)
+    """
+    request = _gemini_request(model, prompt, json_output)
+    # retry=None: retries are done by llm.concurrency.call_provider.
+    resp = gemini_client(api_key).generate_content(request=request, retry=None, timeout=timeout)
+    _record_usage(resp, usage)
+    return _first_candidate_text(resp)
+
+
+def gemini_stream(
+    api_key: str,
+    model: str,
+    prompt: str,
+    json_output: bool = False,
+    timeout: float | None = None,
+    usage: Dict[str, int] | None = None,
+) -> Iterator[str]:
+    """Like gemini_generate, but yields the text of each streamed chunk as it arrives."""
+    request = _gemini_request(model, prompt, json_output)
+    for resp in gemini_client(api_key).stream_generate_content(request=request, retry=None, timeout=timeout):
+        _record_usage(resp, usage)  # the last chunk carries the totals
+        yield _first_candidate_text(resp)
@@ -0,0 +1,406 @@
+"""
+LLM Concurrency - process-wide rate limiting, retries and adaptive concurrency per provider
+
+Every provider request made by `llm_generate` goes through `call_provider`,
+which for each attempt:
+
+- takes a request and a token estimate from the provider's token buckets
+  (GEMINI_RPM / GEMINI_TPM, OPENAI_RPM / OPENAI_TPM; unset or 0 = no limit)
+- holds one slot of the provider's adaptive concurrency limit. The limit
+  starts at GEMINI_CONCURRENCY / OPENAI_CONCURRENCY (default 4) and is
+  steered by AIMD: +1 per limit's worth of successful requests, halved on
+  a 429/503 (once per overload episode), never above the configured cap
+- on a 429, 5xx, timeout or connection error, retries up to LLM_MAX_RETRIES
+  times (default 3), waiting Retry-After when the provider sends one and
+  jittered exponential backoff otherwise
+
+Each attempt has a timeout (LLM_TIMEOUT_S, default 60) and the whole call,
+retries included, a deadline (LLM_DEADLINE_S, default 180). A circuit
+breaker per provider opens after LLM_CIRCUIT_FAILURES (default 5)
+consecutive failed attempts (rate limiting excluded) and fails calls fast
+for LLM_CIRCUIT_OPEN_S (default 30) before letting one trial request
+through. Successful attempt latencies are tracked for hedging (p95).
+
+The limits hold across all jobs in this process.
+"""
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Dict, Iterator, Optional, TypeVar
+import os
+import random
+import threading
+import time
+
+from loguru import logger
+from observability import LLM_CIRCUIT_OPEN, LLM_CONCURRENCY_LIMIT, LLM_RETRIES, error_code, record_provider_error
+
+T = TypeVar("T")
+
+_DEFAULT_CONCURRENCY = 4
+_DEFAULT_RETRIES = 3
+_DEFAULT_TIMEOUT_S = 60.0
+_DEFAULT_DEADLINE_S = 180.0
+_LATENCY_SAMPLES = 200
+_MIN_LATENCY_SAMPLES = 20
+_BACKOFF_BASE_S = 1.0
+_BACKOFF_CAP_S = 30.0
+_RETRY_AFTER_CAP_S = 60.0
+_OVERLOAD_CODES = ("429", "503")
+_RETRYABLE_NAMES = (
+    "APITimeoutError", "APIConnectionError", "Timeout", "TimeoutException", "ConnectError",
+    "ReadTimeout", "ConnectTimeout", "RemoteProtocolError", "DeadlineExceeded", "ServiceUnavailable",
+)
+
+
+class CircuitOpenError(Exception):
+    """The provider's circuit breaker is open; the call was not attempted."""
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call's deadline passed before a request could succeed."""
+
+
+class RequestCancelled(Exception):
+    """The call was abandoned by its caller (e.g. the losing side of a hedge)."""
+
+
+def normalize_provider(provider: str | None) -> str:
+    """Map provider aliases to "gemini" or "openai" (the default, as in llm_text_gen)."""
+    p = (provider or "").strip().lower()
+    return "gemini" if p in ("gemini", "google", "google-gemini") else "openai"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def provider_concurrency(provider: str | None) -> int:
+    """Configured cap for a provider (GEMINI_CONCURRENCY / OPENAI_CONCURRENCY)."""
+    name = f"{normalize_provider(provider).upper()}_CONCURRENCY"
+    return max(1, int(_env_float(name, _DEFAULT_CONCURRENCY)))
+
+
+class TokenBucket:
+    """Refills ``rate_per_min`` units a minute, holding at most ten seconds' worth."""
+
+    def __init__(self, rate_per_min: float) -> None:
+        self.rate_per_s = rate_per_min / 60.0
+        self.capacity = max(1.0, rate_per_min / 6.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0, deadline: Optional[float] = None) -> None:
+        """
+        Block until ``amount`` units are available (amounts above capacity wait for a full bucket).
+
+        Raises:
+            LLMDeadlineExceeded: The units cannot be available before the deadline (time.monotonic())
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate_per_s
+            if deadline is not None and now + wait > deadline:
+                raise LLMDeadlineExceeded("rate limit leaves no room before the deadline")
+            time.sleep(min(wait, 1.0))
+
+
+class AdaptiveLimit:
+    """Concurrency limit steered by additive increase / multiplicative decrease."""
+
+    def __init__(self, provider: str, max_limit: int) -> None:
+        self.provider = provider
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        LLM_CONCURRENCY_LIMIT.set(self.limit, provider=provider)
+
+    def acquire(self, deadline: Optional[float] = None) -> float:
+        """
+        Wait for a slot; returns the start time to pass to release().
+
+        Raises:
+            LLMDeadlineExceeded: No slot freed up before the deadline (time.monotonic())
+        """
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise LLMDeadlineExceeded(f"{self.provider}: no request slot before the deadline")
+                self._cond.wait(remaining)
+            self._in_flight += 1
+            return time.monotonic()
+
+    def release(self, started: float, overloaded: bool, succeeded: bool) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if overloaded:
+                # Requests started before the last decrease saw the same overload; halve once per episode.
+                if started >= self._last_decrease:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = time.monotonic()
+                    logger.info(f"{self.provider} overloaded; concurrency limit now {int(self.limit)}")
+            elif succeeded:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            LLM_CONCURRENCY_LIMIT.set(int(self.limit), provider=self.provider)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open (one trial) after a cool-off."""
+
+    def __init__(self, provider: str, failures: int, open_s: float) -> None:
+        self.provider = provider
+        self.failures = max(1, failures)
+        self.open_s = open_s
+        self._consecutive = 0
+        self._open_until = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        LLM_CIRCUIT_OPEN.set(0, provider=provider)
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._consecutive >= self.failures and (time.monotonic() < self._open_until or self._trial)
+
+    def allow(self) -> bool:
+        """Whether a request may be attempted now (claims the trial slot when half-open)."""
+        with self._lock:
+            if self._consecutive < self.failures:
+                return True
+            if time.monotonic() < self._open_until or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def abandon(self) -> None:
+        """Give back a trial slot claimed by allow() without an outcome (the request never went out)."""
+        with self._lock:
+            self._trial = False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            was_open = self._consecutive >= self.failures
+            self._trial = False
+            if success:
+                self._consecutive = 0
+            else:
+                self._consecutive += 1
+                if self._consecutive >= self.failures:
+                    self._open_until = time.monotonic() + self.open_s
+                    if not was_open:
+                        logger.warning(f"{self.provider} circuit open for {self.open_s:.0f}s after {self._consecutive} failures")
+            LLM_CIRCUIT_OPEN.set(1 if self._consecutive >= self.failures else 0, provider=self.provider)
+
+
+class LatencyTracker:
+    """Recent successful request latencies of one provider."""
+
+    def __init__(self) -> None:
+        self._samples: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile (0..1), or None until enough samples were seen."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < _MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class _ProviderLimits:
+    def __init__(self, provider: str) -> None:
+        name = provider.upper()
+        rpm = _env_float(f"{name}_RPM", 0)
+        tpm = _env_float(f"{name}_TPM", 0)
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.concurrency = AdaptiveLimit(provider, provider_concurrency(provider))
+        self.breaker = CircuitBreaker(
+            provider,
+            int(_env_float("LLM_CIRCUIT_FAILURES", 5)),
+            _env_float("LLM_CIRCUIT_OPEN_S", 30.0),
+        )
+        self.latency = LatencyTracker()
+
+
+_limits: Dict[str, _ProviderLimits] = {}
+_limits_lock = threading.Lock()
+
+
+def _provider_limits(provider: str) -> _ProviderLimits:
+    with _limits_lock:
+        limits = _limits.get(provider)
+        if limits is None:
+            limits = _limits[provider] = _ProviderLimits(provider)
+        return limits
+
+
+def call_deadline() -> float:
+    """Deadline (time.monotonic()) for a call starting now: LLM_DEADLINE_S away."""
+    return time.monotonic() + _env_float("LLM_DEADLINE_S", _DEFAULT_DEADLINE_S)
+
+
+def circuit_open(provider: str | None) -> bool:
+    """Whether calls to the provider are currently failing fast."""
+    return _provider_limits(normalize_provider(provider)).breaker.is_open()
+
+
+def latency_percentile(provider: str | None, q: float) -> Optional[float]:
+    """Recent successful request latency quantile of the provider, or None if not yet known."""
+    return _provider_limits(normalize_provider(provider)).latency.percentile(q)
+
+
+@contextmanager
+def provider_slot(provider: str | None, tokens: float = 0.0, deadline: Optional[float] = None) -> Iterator[None]:
+    """
+    Hold one request slot of the provider for the duration of the block,
+    after taking a request (and ``tokens``) from its rate buckets. The
+    block's outcome (success, 429/503, other error) steers the AIMD limit.
+    """
+    limits = _provider_limits(normalize_provider(provider))
+    if limits.requests:
+        limits.requests.acquire(1, deadline)
+    if limits.tokens and tokens:
+        limits.tokens.acquire(tokens, deadline)
+    started = limits.concurrency.acquire(deadline)
+    try:
+        yield
+    except BaseException as exc:
+        limits.concurrency.release(started, overloaded=error_code(exc) in _OVERLOAD_CODES, succeeded=False)
+        raise
+    limits.concurrency.release(started, overloaded=False, succeeded=True)
+
+
+def _retryable(exc: BaseException) -> bool:
+    code = error_code(exc)
+    if code.isdigit():
+        return code in ("408", "409", "429") or code.startswith("5")
+    return code in _RETRYABLE_NAMES
+
+
+def retry_after_s(exc: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait (retry-after-ms / Retry-After header), if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _backoff_s(attempt: int, exc: BaseException) -> float:
+    hinted = retry_after_s(exc)
+    if hinted is not None:
+        return min(_RETRY_AFTER_CAP_S, hinted) + random.uniform(0, 0.25)
+    return random.uniform(0, min(_BACKOFF_CAP_S, _BACKOFF_BASE_S * 2 ** attempt))  # full jitter
+
+
+def call_provider(
+    provider: str | None,
+    fn: Callable[[float], T],
+    tokens: float = 0.0,
+    deadline: Optional[float] = None,
+    cancelled: Optional[threading.Event] = None,
+) -> T:
+    """
+    Run one provider request under the provider's limits, retrying transient failures.
+
+    Args:
+        provider: Provider name or alias
+        fn: Performs the request; called with the attempt's timeout in seconds
+        tokens: Estimated prompt + completion tokens (for the TPM bucket)
+        deadline: time.monotonic() by which the call must finish (default: now + LLM_DEADLINE_S)
+        cancelled: Set by the caller to abandon the call between attempts
+
+    Returns:
+        fn()'s result
+
+    Raises:
+        CircuitOpenError: The provider's circuit is open
+        LLMDeadlineExceeded: The deadline passed
+        RequestCancelled: ``cancelled`` was set
+        Exception: The last error once retries are exhausted, or a non-retryable one
+    """
+    name = normalize_provider(provider)
+    limits = _provider_limits(name)
+    max_retries = max(0, int(_env_float("LLM_MAX_RETRIES", _DEFAULT_RETRIES)))
+    timeout_s = _env_float("LLM_TIMEOUT_S", _DEFAULT_TIMEOUT_S)
+    if deadline is None:
+        deadline = call_deadline()
+    attempt = 0
+    while True:
+        if cancelled is not None and cancelled.is_set():
+            raise RequestCancelled(f"{name} request cancelled")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded(f"{name}: deadline passed after {attempt} attempt(s)")
+        if not limits.breaker.allow():
+            raise CircuitOpenError(f"{name} circuit is open")
+        try:
+            with provider_slot(name, tokens, deadline):
+                started = time.monotonic()
+                result = fn(min(timeout_s, max(0.1, deadline - time.monotonic())))
+        except LLMDeadlineExceeded:
+            # Our own queueing (rate buckets, concurrency slot) ran out of time;
+            # the provider was never asked, so it is neither an error nor a failure.
+            limits.breaker.abandon()
+            raise
+        except Exception as exc:
+            code = error_code(exc)
+            record_provider_error(name, code)
+            if code == "429":
+                # Rate limiting is the AIMD controller's business, not a sign the
+                # provider is down: neither a failure nor a success for the breaker.
+                limits.breaker.abandon()
+            else:
+                limits.breaker.record(success=False)
+            if attempt >= max_retries or not _retryable(exc):
+                raise
+            delay = _backoff_s(attempt, exc)
+            if time.monotonic() + delay >= deadline:
+                raise
+            LLM_RETRIES.inc(provider=name, code=code)
+            logger.info(f"{name} request failed ({code}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            if cancelled is not None:
+                if cancelled.wait(delay):
+                    raise RequestCancelled(f"{name} request cancelled")
+            else:
+                time.sleep(delay)
+            attempt += 1
+            continue
+        limits.latency.add(time.monotonic() - started)
+        limits.breaker.record(success=True)
+        return result
@@ -1,8 +1,21 @@
 """
 Core LLM Functions - extracted from ai_backlinking_llm.py
 """
+import contextvars
+import json
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, Optional
 from loguru import logger
+from observability import LLM_FAILOVERS, LLM_FIRST_TOKEN, PROMPT_TOKENS, stage
+from .concurrency import call_deadline, call_provider, circuit_open, latency_percentile, normalize_provider
+from .clients import gemini_generate, gemini_stream, openai_client
+from .cache import cache_key, cached_lookup_any, cache_store
+from .tokens import count_tokens, fit_excerpt, prompt_token_budget
+from .usage import CallUsage, record_cache_hit, record_usage
 
 # Remove static environment variable loading - will read dynamically
 # SERPER_API_KEY = os.getenv("SERPER_API_KEY")
@@ -19,53 +32,396 @@ def _get_gemini_api_key():
     return os.getenv("GEMINI_API_KEY")
 
 
-def llm_text_gen(
+_OPENAI_SYSTEM_PROMPT = "You are a helpful outreach assistant who writes concise, friendly, highly personalized guest-post outreach emails."
+_OPENAI_TEMPERATURE = 0.7
+
+
+@dataclass
+class LLMResult:
+    text: str
+    provider: str
+    model: str
+    cached: bool = False  # served from the response cache
+    fallback: bool = False  # placeholder draft (missing key, error or empty answer)
+    failover: bool = False  # answered by the secondary provider (failover or hedge)
+    prompt_tokens: int = 0  # tokens sent (as reported by the provider, else a local count)
+    completion_tokens: int = 0
+    latency_s: float = 0.0  # provider call, retries included (0 for cache hits and placeholders)
+    attempts: int = 0
+    cost_usd: Optional[float] = 0.0  # estimated (see llm.usage); None for unpriced models
+
+    def share(self, text: str, n: int) -> "LLMResult":
+        """
+        One site's part of a request shared by ``n`` sites: 1/n of its
+        tokens and cost; the latency and attempts are the request's own.
+        """
+        return replace(
+            self,
+            text=text,
+            prompt_tokens=self.prompt_tokens // n,
+            completion_tokens=self.completion_tokens // n,
+            cost_usd=None if self.cost_usd is None else self.cost_usd / n,
+        )
+
+
+def _result(text: str, route, usage: CallUsage, failover: bool = False) -> "LLMResult":
+    return LLMResult(
+        text,
+        route.provider,
+        route.model,
+        failover=failover,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        latency_s=round(usage.latency_s, 3),
+        attempts=usage.attempts,
+        cost_usd=usage.cost_usd,
+    )
+
+
+def prompt_tokens(prompt: str, provider: str) -> int:
+    """Tokens a prompt sends to the provider, OpenAI's system prompt included (local count)."""
+    system = _OPENAI_SYSTEM_PROMPT if normalize_provider(provider) == "openai" else ""
+    return count_tokens(system) + count_tokens(prompt)
+
+
+def _placeholder(prompt: str, provider: str, model: str, reason: str) -> LLMResult:
+    return LLMResult(f"[AI Draft]\n{prompt.strip()}\n\n--\n{reason}", provider, model, fallback=True)
+
+
+_DEFAULT_MODELS = {"gemini": "gemini-2.5-flash", "openai": "gpt-4o-mini"}
+_PROVIDER_LABELS = {"gemini": "Gemini", "openai": "OpenAI"}
+_hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+@dataclass
+class _Route:
+    provider: str
+    model: str
+    key: str
+
+
+def _prompt_cache_key(route: _Route, prompt: str) -> str:
+    if route.provider == "gemini":
+        return cache_key("gemini", route.model, None, "", prompt)
+    return cache_key("openai", route.model, _OPENAI_TEMPERATURE, _OPENAI_SYSTEM_PROMPT, prompt)
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _hedge_after_s(provider: str) -> float:
+    """The primary's p95 latency, or LLM_HEDGE_AFTER_S (default 10) until enough requests were seen."""
+    p95 = latency_percentile(provider, 0.95)
+    if p95 is not None:
+        return p95
+    try:
+        return float(os.getenv("LLM_HEDGE_AFTER_S", "10"))
+    except ValueError:
+        return 10.0
+
+
+def _consume(pieces: Iterable[str], provider: str, started: float, on_text: Callable[[str], None]) -> str:
+    """Join streamed text pieces, reporting the text so far after each one."""
+    text = ""
+    for piece in pieces:
+        if not piece:
+            continue
+        if not text:
+            LLM_FIRST_TOKEN.observe(time.monotonic() - started, provider=provider)
+        text += piece
+        on_text(text)
+    return text
+
+
+def _complete(
+    route: _Route,
+    prompt: str,
+    json_output: bool,
+    max_tokens: int,
+    deadline: float,
+    cancelled: threading.Event | None = None,
+    on_text: Callable[[str], None] | None = None,
+) -> tuple[str, CallUsage]:
+    """
+    One completion from the route's provider (retries, limits and timeouts by call_provider).
+
+    With ``on_text``, the response is streamed and on_text gets the text so
+    far after every chunk; a retried attempt starts again from "".
+
+    The call's usage (tokens as reported by the provider, else counted
+    locally; latency; attempts) is returned with the text and added to the
+    job's totals (see llm.usage), failed calls included.
+    """
+    reported: dict[str, int] = {}
+    attempts = 0
+
+    if route.provider == "gemini":
+        def _request(timeout: float) -> str:
+            nonlocal attempts
+            attempts += 1
+            reported.clear()
+            with stage("llm_gemini", model=route.model):
+                if on_text is None:
+                    return gemini_generate(
+                        route.key, route.model, prompt, json_output=json_output, timeout=timeout, usage=reported
+                    )
+                started = time.monotonic()
+                chunks = gemini_stream(
+                    route.key, route.model, prompt, json_output=json_output, timeout=timeout, usage=reported
+                )
+                return _consume(chunks, "gemini", started, on_text)
+    else:
+        extra = {"response_format": {"type": "json_object"}} if json_output else {}
+
+        def _request(timeout: float) -> str:
+            nonlocal attempts
+            attempts += 1
+            reported.clear()
+            with stage("llm_openai", model=route.model):
+                started = time.monotonic()
+                response = openai_client(route.key).chat.completions.create(
+                    model=route.model,
+                    temperature=_OPENAI_TEMPERATURE,
+                    max_tokens=max_tokens,
+                    messages=[
+                        {"role": "system", "content": _OPENAI_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    timeout=timeout,
+                    stream=on_text is not None,
+                    **extra,
+                )
+                if on_text is None:
+                    if response.usage is not None:
+                        reported["prompt_tokens"] = response.usage.prompt_tokens
+                        reported["completion_tokens"] = response.usage.completion_tokens
+                    return response.choices[0].message.content or ""
+                # Streamed responses carry no usage with this SDK; the tokens are counted locally.
+                chunks = (chunk.choices[0].delta.content or "" for chunk in response if chunk.choices)
+                return _consume(chunks, "openai", started, on_text)
+
+    sent = prompt_tokens(prompt, route.provider)
+    PROMPT_TOKENS.observe(sent, provider=route.provider)
+    usage = CallUsage(route.provider, route.model, ok=False)
+    started = time.monotonic()
+    try:
+        text = (call_provider(
+            route.provider,
+            _request,
+            tokens=sent + max_tokens,
+            deadline=deadline,
+            cancelled=cancelled,
+        ) or "").strip()
+        usage.ok = True
+        usage.reported = bool(reported)
+        usage.prompt_tokens = reported.get("prompt_tokens", sent)
+        usage.completion_tokens = reported.get("completion_tokens", count_tokens(text))
+        return text, usage
+    finally:
+        usage.latency_s = time.monotonic() - started
+        usage.attempts = attempts
+        record_usage(usage)
+
+
+def _hedged(
+    primary: _Route,
+    secondary: _Route,
+    prompt: str,
+    json_output: bool,
+    max_tokens: int,
+    deadline: float,
+) -> tuple[_Route, str, Optional[CallUsage]]:
+    """
+    Race the primary against a duplicate on the secondary, started once the
+    primary has taken longer than its p95 latency (or has failed). The first
+    non-empty answer wins; the other request is cancelled before its next
+    attempt, and its answer, should one still arrive, is dropped.
+    """
+    cancel = {primary.provider: threading.Event(), secondary.provider: threading.Event()}
+
+    def _submit(route: _Route) -> Future:
+        fut = _hedge_pool.submit(
+            contextvars.copy_context().run,
+            _complete, route, prompt, json_output, max_tokens, deadline, cancel[route.provider],
+        )
+        futures[fut] = route
+        return fut
+
+    futures: dict[Future, _Route] = {}
+    pending = {_submit(primary)}
+    hedge_at = time.monotonic() + _hedge_after_s(primary.provider)
+    error: Exception | None = None
+    while pending:
+        hedged = len(futures) > 1
+        timeout = None if hedged else max(0.0, hedge_at - time.monotonic())
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for fut in done:
+            try:
+                text, usage = fut.result()
+            except Exception as exc:
+                error = exc
+                continue
+            if text:
+                for other in pending:
+                    cancel[futures[other].provider].set()
+                return futures[fut], text, usage
+        if not hedged:
+            reason = "hedge" if pending else "error"
+            LLM_FAILOVERS.inc(provider=secondary.provider, reason=reason)
+            logger.info(f"{primary.provider} {'slow' if pending else 'failed'}; sending the request to {secondary.provider}")
+            pending = pending | {_submit(secondary)}
+    if error is not None:
+        raise error
+    return primary, "", None
+
+
+def llm_generate(
     prompt: str,
     provider: str = "gemini",
     model: str | None = None,
     openai_api_key: str | None = None,
     gemini_api_key: str | None = None,
-) -> str:
-    """Generate text using selected provider (Gemini or OpenAI), with graceful fallback."""
-    provider_normalized = (provider or "").strip().lower()
-    if provider_normalized in ("gemini", "google", "google-gemini"):
-        key = gemini_api_key or _get_gemini_api_key()
-        if not key:
-            return f"[AI Draft]\n{prompt.strip()}\n\n--\nThis is a placeholder draft (no Gemini API key)."
-        try:
-            import google.generativeai as genai  # type: ignore
-            genai.configure(api_key=key)
-            model_name = model or "gemini-2.5-flash"
-            gmodel = genai.GenerativeModel(model_name)
-            resp = gmodel.generate_content(prompt)
-            text = getattr(resp, "text", None)
-            return (text or "").strip() or f"[AI Draft]\n{prompt.strip()}\n\n--\nNo content returned."
-        except Exception as exc:
-            logger.warning(f"Gemini generation failed: {exc}")
-            return f"[AI Draft]\n{prompt.strip()}\n\n--\nThis is a placeholder draft (Gemini error)."
-
-    # Default to OpenAI
-    key = openai_api_key or _get_openai_api_key()
-    if not key:
-        return f"[AI Draft]\n{prompt.strip()}\n\n--\nThis is a placeholder draft (no OpenAI API key)."
+    fresh: bool = False,
+    json_output: bool = False,
+    max_tokens: int = 700,
+    hedge: bool | None = None,
+    on_text: Callable[[str], None] | None = None,
+) -> LLMResult:
+    """
+    Generate text using selected provider (Gemini or OpenAI), with graceful fallback.
+
+    Completions are served from, and stored in, the LLM response cache
+    (see llm.cache); placeholders are never cached.
+
+    When the other provider also has a key (and LLM_FAILOVER is not 0), it
+    is the secondary: the request goes there straight away while the
+    primary's circuit is open, and after the primary fails. With hedging, a
+    duplicate is also sent to it once the primary has been slower than its
+    p95 latency; the first answer wins. Every request has a deadline
+    (LLM_TIMEOUT_S per attempt, LLM_DEADLINE_S overall).
+
+    Args:
+        fresh (bool): Skip the cache lookup and call the provider; the new
+            completion replaces the cached one.
+        json_output (bool): Ask the provider for a JSON object (the prompt
+            must describe it).
+        max_tokens (int): Completion token limit (OpenAI).
+        hedge (bool): Hedge slow requests to the secondary provider
+            (default: LLM_HEDGE). Streamed requests are never hedged.
+        on_text (callable): Stream the response, calling on_text with the
+            text so far as chunks arrive (once with the whole text on a
+            cache hit; not at all for placeholders).
+
+    Returns:
+        LLMResult: The text plus where it came from.
+    """
+    name = normalize_provider(provider)
+    keys = {
+        "gemini": gemini_api_key or _get_gemini_api_key(),
+        "openai": openai_api_key or _get_openai_api_key(),
+    }
+    model_name = model or _DEFAULT_MODELS[name]
+    label = _PROVIDER_LABELS[name]
+    if not keys[name]:
+        return _placeholder(prompt, name, model_name, f"This is a placeholder draft (no {label} API key).")
+    primary = _Route(name, model_name, keys[name])
+    other = "openai" if name == "gemini" else "gemini"
+    secondary = None
+    if keys[other] and _env_flag("LLM_FAILOVER", "1"):
+        secondary = _Route(other, _DEFAULT_MODELS[other], keys[other])
+
+    if not fresh:
+        # Failover answers are stored under the secondary's key; a re-run finds them there.
+        routes = {_prompt_cache_key(r, prompt): r for r in (primary, secondary) if r is not None}
+        hit_key, cached = cached_lookup_any(list(routes))
+        if cached is not None:
+            route = routes[hit_key]
+            record_cache_hit()
+            if on_text is not None:
+                on_text(cached)
+            return LLMResult(
+                cached, route.provider, route.model, cached=True, failover=route is not primary,
+                prompt_tokens=prompt_tokens(prompt, route.provider),
+            )
+    if hedge is None:
+        hedge = _env_flag("LLM_HEDGE", "0")
+    if on_text is not None:
+        hedge = False  # two racing streams would interleave their partial texts
+
+    deadline = call_deadline()
+    route, text, usage = primary, "", None
     try:
-        from openai import OpenAI  # type: ignore
-        client = OpenAI(api_key=key)
-        model_name = model or "gpt-4o-mini"
-        response = client.chat.completions.create(
-            model=model_name,
-            temperature=0.7,
-            max_tokens=700,
-            messages=[
-                {"role": "system", "content": "You are a helpful outreach assistant who writes concise, friendly, highly personalized guest-post outreach emails."},
-                {"role": "user", "content": prompt},
-            ],
-        )
-        content = (response.choices[0].message.content or "").strip()
-        return content or f"[AI Draft]\n{prompt.strip()}\n\n--\nNo content returned."
+        if secondary is not None and circuit_open(name):
+            LLM_FAILOVERS.inc(provider=other, reason="circuit_open")
+            logger.info(f"{name} circuit is open; sending the request to {other}")
+            route = secondary
+            text, usage = _complete(secondary, prompt, json_output, max_tokens, deadline, on_text=on_text)
+        elif secondary is not None and hedge:
+            route, text, usage = _hedged(primary, secondary, prompt, json_output, max_tokens, deadline)
+        else:
+            try:
+                text, usage = _complete(primary, prompt, json_output, max_tokens, deadline, on_text=on_text)
+            except Exception as exc:
+                if secondary is None:
+                    raise
+                logger.warning(f"{label} generation failed ({exc}); failing over to {other}")
+                LLM_FAILOVERS.inc(provider=other, reason="error")
+                route = secondary
+                text, usage = _complete(secondary, prompt, json_output, max_tokens, deadline, on_text=on_text)
     except Exception as exc:
-        logger.warning(f"OpenAI generation failed: {exc}")
-        return f"[AI Draft]\n{prompt.strip()}\n\n--\nThis is a placeholder draft (OpenAI error)."
+        logger.warning(f"{_PROVIDER_LABELS[route.provider]} generation failed: {exc}")
+        return _placeholder(prompt, name, model_name, f"This is a placeholder draft ({label} error).")
+    if not text:
+        return _placeholder(prompt, name, model_name, "No content returned.")
+    cache_store(_prompt_cache_key(route, prompt), text, route.provider, route.model)
+    return _result(text, route, usage, failover=route is not primary)
+
+
+def llm_text_gen(
+    prompt: str,
+    provider: str = "gemini",
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    gemini_api_key: str | None = None,
+    fresh: bool = False,
+    on_text: Callable[[str], None] | None = None,
+) -> str:
+    """
+    Generate text using selected provider (Gemini or OpenAI), with graceful fallback.
+
+    Pass ``on_text`` to stream: it is called with the text so far as the response arrives.
+    """
+    return llm_generate(prompt, provider, model, openai_api_key, gemini_api_key, fresh, on_text=on_text).text
+
+
+def draft_personalized_email(
+    website_data,
+    insights,
+    user_proposal,
+    provider: str = "gemini",
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    gemini_api_key: str | None = None,
+    fresh: bool = False,
+    hedge: bool | None = None,
+    on_text: Callable[[str], None] | None = None,
+) -> LLMResult:
+    """
+    Like compose_personalized_email, but returns the LLMResult (cache hit, fallback, failover).
+
+    ``on_text`` streams the draft (see llm_generate).
+    """
+    return llm_generate(
+        personalized_email_prompt(website_data, insights, user_proposal),
+        provider=provider,
+        model=model,
+        openai_api_key=openai_api_key,
+        gemini_api_key=gemini_api_key,
+        fresh=fresh,
+        hedge=hedge,
+        on_text=on_text,
+    )
 
 
 def compose_personalized_email(
@@ -88,34 +444,20 @@ def compose_personalized_email(
     Returns:
         str: A personalized email message.
     """
-    # Fix data access - use actual available fields
-    contact_name = website_data.get("contact_name", "") or "Webmaster"
-    site_name = website_data.get("title", "") or website_data.get("domain", "") or "your site"
-    proposed_topic = user_proposal.get("topic", "a guest post")
-    user_name = user_proposal.get("user_name", "Your Name")
-    user_email = user_proposal.get("user_email", "your_email@example.com")
-    
-    # Extract additional context for better personalization
-    domain = website_data.get("domain", "")
-    url = website_data.get("url", "")
-    page_excerpt = insights or "No content available"
-    
-    # Enhanced prompt engineering for Gemini
-    email_prompt = f"""
-You are an expert outreach specialist who writes highly personalized, compelling guest post proposals. Your goal is to create emails that show genuine research and offer real value to the target website.
+    return draft_personalized_email(
+        website_data,
+        insights,
+        user_proposal,
+        provider=provider,
+        model=model,
+        openai_api_key=openai_api_key,
+        gemini_api_key=gemini_api_key,
+    ).text
 
-TARGET WEBSITE ANALYSIS:
-- URL: {url}
-- Domain: {domain}
-- Site Name: {site_name}
-- Content Excerpt: {page_excerpt[:800] if len(page_excerpt) > 800 else page_excerpt}
 
-YOUR PROFILE:
-- Name: {user_name}
-- Email: {user_email}
-- Proposed Topic: {proposed_topic}
+_EMAIL_INTRO = "You are an expert outreach specialist who writes highly personalized, compelling guest post proposals. Your goal is to create emails that show genuine research and offer real value to the target website."
 
-CRITICAL REQUIREMENTS:
+_EMAIL_GUIDE = """CRITICAL REQUIREMENTS:
 1. **Personalized Greeting**: Start with "Dear [Domain] Team" or similar professional greeting
 2. **Show Research**: Reference 1-2 specific content themes or topics from their site excerpt
 3. **Specific Proposal**: Propose a concrete, relevant guest post topic that fits their content strategy
@@ -132,13 +474,234 @@ EMAIL STRUCTURE:
 - Call to action (1-2 lines)
 - Professional closing with contact details
 
-IMPORTANT: Make the email feel like it was written specifically for this website based on their actual content. Don't be generic - reference specific themes or topics from their page excerpt.
+IMPORTANT: Make the email feel like it was written specifically for this website based on their actual content. Don't be generic - reference specific themes or topics from their page excerpt."""
+
+
+# Instructions shared by every drafting prompt. They come first and never
+# vary. At about 400 tokens they are below the 1024-token minimum of OpenAI's
+# and Gemini's implicit prompt caching, so today they are not cached. Padding
+# them past it would cost more per prompt than the cache discount saves at
+# LLM_PROMPT_MAX_TOKENS=650. The fixed prefix only pays off if the
+# instructions grow or a provider lowers its threshold.
+_EMAIL_PREFIX = f"""
+{_EMAIL_INTRO}
+
+{_EMAIL_GUIDE}
 """
+_EXCERPT_CHARS = 800  # excerpt cut when LLM_PROMPT_MAX_TOKENS=0
+_MIN_EXCERPT_TOKENS = 40
+
+
+def _site_block(website_data, excerpt: str) -> str:
+    site_name = website_data.get("title", "") or website_data.get("domain", "") or "your site"
+    domain = website_data.get("domain", "")
+    url = website_data.get("url", "")
+    return f"""- URL: {url}
+- Domain: {domain}
+- Site Name: {site_name}
+- Content Excerpt: {excerpt}"""
+
+
+def _profile_block(user_proposal) -> str:
+    return f"""- Name: {user_proposal.get("user_name", "Your Name")}
+- Email: {user_proposal.get("user_email", "your_email@example.com")}
+- Proposed Topic: {user_proposal.get("topic", "a guest post")}"""
+
+
+def _single_prompt(website_data, excerpt: str, user_proposal) -> str:
+    return f"""{_EMAIL_PREFIX}
+TARGET WEBSITE ANALYSIS:
+{_site_block(website_data, excerpt)}
+
+YOUR PROFILE:
+{_profile_block(user_proposal)}
+"""
+
+
+def _fit_insights(website_data, insights, user_proposal) -> str:
+    """
+    The page excerpt to send for one site: the most informative sentences
+    that keep its single-site prompt within LLM_PROMPT_MAX_TOKENS.
+    """
+    excerpt = insights or "No content available"
+    budget = prompt_token_budget()
+    if budget is None:
+        return excerpt[:_EXCERPT_CHARS]
+    available = budget - count_tokens(_single_prompt(website_data, "", user_proposal))
+    keywords = (website_data.get("title", ""), user_proposal.get("topic", ""))
+    return fit_excerpt(excerpt, max(_MIN_EXCERPT_TOKENS, available), keywords)
+
+
+def personalized_email_prompt(website_data, insights, user_proposal) -> str:
+    """Outreach prompt for one site (see compose_personalized_email)."""
+    return _single_prompt(website_data, _fit_insights(website_data, insights, user_proposal), user_proposal)
+
+
+def _batch_email_prompt(sites, user_proposal) -> str:
+    """Outreach prompt for several sites; the answer is a JSON object keyed by site id."""
+    targets = "\n\n".join(
+        f"[{i}]\n{_site_block(wd, _fit_insights(wd, ins, user_proposal))}"
+        for i, (wd, ins) in enumerate(sites, start=1)
+    )
+    return f"""{_EMAIL_PREFIX}
+OUTPUT FORMAT: Respond with a JSON object only, no markdown fences:
+{{"emails": [{{"id": 1, "body": "<complete email text>"}}, ...]}}
+with exactly one entry per target website id.
+
+Write one separate email for each of the {len(sites)} target websites below. Each email must follow the requirements on its own and must only reference its own website.
+
+TARGET WEBSITES:
+{targets}
+
+YOUR PROFILE:
+{_profile_block(user_proposal)}
+"""
+
+
+def _parse_batch_entries(text: str, list_key: str, fields) -> dict[int, dict[str, str]]:
+    """Site id -> {field: text} from a batched JSON answer; entries missing a field are skipped."""
+    t = text or ""
+    try:
+        # Tolerates markdown fences or chatter around the object.
+        data = json.loads(t[t.find("{"):t.rfind("}") + 1])
+    except ValueError:
+        return {}
+    entries = data.get(list_key) if isinstance(data, dict) else None
+    out: dict[int, dict[str, str]] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            site_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        values = {f: entry.get(f) for f in fields}
+        if all(isinstance(v, str) and v.strip() for v in values.values()):
+            out[site_id] = {f: v.strip() for f, v in values.items()}
+    return out
 
-    return llm_text_gen(
-        email_prompt,
+
+def _parse_batch_bodies(text: str) -> dict[int, str]:
+    """Site id -> email body from a batched answer; malformed entries are skipped."""
+    return {i: entry["body"] for i, entry in _parse_batch_entries(text, "emails", ("body",)).items()}
+
+
+def draft_personalized_emails_batch(
+    sites,
+    user_proposal,
+    provider: str = "gemini",
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    gemini_api_key: str | None = None,
+    fresh: bool = False,
+    hedge: bool | None = None,
+) -> list[LLMResult | None]:
+    """
+    Draft emails for several sites with one LLM request.
+
+    The shared instructions are sent once and the answer is a JSON object
+    with one body per site.
+
+    Args:
+        sites (list): (website_data, insights) pairs.
+        user_proposal (dict): As for compose_personalized_email.
+
+    Returns:
+        list: One LLMResult per site, in order; None where the answer had no
+        usable body for that site (the caller drafts those individually).
+    """
+    result = llm_generate(
+        _batch_email_prompt(sites, user_proposal),
+        provider=provider,
+        model=model,
+        openai_api_key=openai_api_key,
+        gemini_api_key=gemini_api_key,
+        fresh=fresh,
+        json_output=True,
+        max_tokens=min(16000, 700 * len(sites)),
+        hedge=hedge,
+    )
+    if result.fallback:
+        return [None] * len(sites)
+    bodies = _parse_batch_bodies(result.text)
+    if len(bodies) < len(sites):
+        logger.warning(f"Batched draft answered {len(bodies)} of {len(sites)} sites; drafting the rest one by one")
+    return [
+        result.share(bodies[i], len(sites)) if i in bodies else None
+        for i in range(1, len(sites) + 1)
+    ]
+
+
+# Static part of the slot-filling prompt (see draft_template_slots_batch).
+_SLOT_PREFIX = """
+You write short personalization snippets for guest post outreach emails. The rest of each email is a fixed template, so write only the requested snippets: first person, friendly and professional, specific to each website's own content, with no greetings, sign-offs or placeholders.
+
+OUTPUT FORMAT: Respond with a JSON object only, no markdown fences:
+{"sites": [{"id": 1, "<slot name>": "<text>", ...}, ...]}
+with exactly one entry per target website id and every slot filled.
+"""
+_SLOT_EXCERPT_TOKENS = 120
+_SLOT_MAX_TOKENS = 50
+
+
+def _slot_prompt(sites, slots, user_proposal) -> str:
+    slot_lines = "\n".join(f"- {name}: {instruction}" for name, instruction in slots.items())
+    targets = "\n\n".join(
+        f"[{i}]\n" + _site_block(
+            wd,
+            fit_excerpt(ins or "No content available", _SLOT_EXCERPT_TOKENS, (wd.get("title", ""), user_proposal.get("topic", ""))),
+        )
+        for i, (wd, ins) in enumerate(sites, start=1)
+    )
+    return f"""{_SLOT_PREFIX}
+SLOTS:
+{slot_lines}
+
+PROPOSED TOPIC: {user_proposal.get("topic", "a guest post")}
+
+TARGET WEBSITES:
+{targets}
+"""
+
+
+def draft_template_slots_batch(
+    sites,
+    slots: dict[str, str],
+    user_proposal,
+    provider: str = "gemini",
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    gemini_api_key: str | None = None,
+    fresh: bool = False,
+    hedge: bool | None = None,
+) -> tuple[list[dict[str, str] | None], LLMResult]:
+    """
+    Write the personalization slots of a template for several sites with one short LLM request.
+
+    Args:
+        sites (list): (website_data, insights) pairs.
+        slots (dict): Slot name -> instruction for the LLM.
+        user_proposal (dict): As for compose_personalized_email.
+
+    Returns:
+        tuple: One {slot: text} per site, in order (None where the answer
+        had no complete entry for that site), and the LLMResult of the
+        request (provider, cache hit, fallback, prompt tokens).
+    """
+    result = llm_generate(
+        _slot_prompt(sites, slots, user_proposal),
         provider=provider,
         model=model,
         openai_api_key=openai_api_key,
         gemini_api_key=gemini_api_key,
+        fresh=fresh,
+        json_output=True,
+        max_tokens=min(16000, _SLOT_MAX_TOKENS * len(slots) * len(sites) + 20 * len(sites)),
+        hedge=hedge,
     )
+    if result.fallback:
+        return [None] * len(sites), result
+    entries = _parse_batch_entries(result.text, "sites", tuple(slots))
+    if len(entries) < len(sites):
+        logger.warning(f"Slot fill answered {len(entries)} of {len(sites)} sites; filling the rest from page data")
+    return [entries.get(i) for i in range(1, len(sites) + 1)], result
@@ -0,0 +1,206 @@
+"""
+OpenAI Batch API - submit many chat completions as one asynchronous batch
+
+Batches are processed within 24 hours at a lower price and under a separate
+rate limit, so large campaigns do not compete with interactive drafting.
+The flow is: upload the requests as a JSONL file, create the batch, poll
+until it reaches a terminal status, then download the output (and error)
+file. Each line carries a ``custom_id`` that maps its answer back to a row.
+
+The pinned openai SDK predates the Batch API, so this talks to the REST
+endpoints directly. OPENAI_BASE_URL is honoured (e.g. the load-test stand-in).
+"""
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import time
+
+import httpx
+from loguru import logger
+
+from .cache import cache_key, cache_store, cached_lookup
+from .core import _OPENAI_SYSTEM_PROMPT, _OPENAI_TEMPERATURE
+from .usage import CallUsage, record_usage
+
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+_MAX_POLL_ERRORS = 20  # consecutive failed polls before giving up
+_POLL_BACKOFF_CAP_S = 300.0
+
+
+def batch_request_line(custom_id: str, prompt: str, model: str, max_tokens: int = 700) -> Dict[str, Any]:
+    """One line of a batch input file: the same chat completion llm_generate would send."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "temperature": _OPENAI_TEMPERATURE,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "system", "content": _OPENAI_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+        },
+    }
+
+
+def _completion_key(prompt: str, model: str) -> str:
+    # Same key as a real-time llm_generate call, so both modes share cache entries.
+    return cache_key("openai", model, _OPENAI_TEMPERATURE, _OPENAI_SYSTEM_PROMPT, prompt)
+
+
+def cached_completion(prompt: str, model: str) -> Optional[str]:
+    """A cached answer to this prompt (from either mode), counted as hit or miss."""
+    return cached_lookup(_completion_key(prompt, model))
+
+
+def store_completion(prompt: str, model: str, text: str) -> None:
+    cache_store(_completion_key(prompt, model), text, "openai", model)
+
+
+class OpenAIBatchClient:
+    def __init__(self, api_key: str, base_url: str | None = None, timeout_s: float = 60.0) -> None:
+        base = base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+        self._http = httpx.Client(
+            base_url=base.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout_s,
+        )
+
+    def close(self) -> None:
+        self._http.close()
+
+    def _json(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        resp = self._http.request(method, path, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    def submit(self, lines: List[Dict[str, Any]], metadata: Dict[str, str] | None = None) -> Dict[str, Any]:
+        """
+        Upload the request lines and create a batch.
+
+        Returns:
+            The batch object (``id``, ``status``, ...)
+
+        Raises:
+            httpx.HTTPError: The upload or batch creation failed
+        """
+        data = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines).encode("utf-8")
+        upload = self._json(
+            "POST",
+            "/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", data, "application/jsonl")},
+        )
+        body: Dict[str, Any] = {
+            "input_file_id": upload["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        }
+        if metadata:
+            body["metadata"] = metadata
+        return self._json("POST", "/batches", json=body)
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        return self._json("GET", f"/batches/{batch_id}")
+
+    def cancel(self, batch_id: str) -> Dict[str, Any]:
+        return self._json("POST", f"/batches/{batch_id}/cancel")
+
+    def _file_lines(self, file_id: str) -> List[Dict[str, Any]]:
+        resp = self._http.get(f"/files/{file_id}/content")
+        resp.raise_for_status()
+        return [json.loads(line) for line in resp.text.splitlines() if line.strip()]
+
+    def results(self, batch: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        """
+        Answers of a finished batch by custom_id. The token usage of each
+        answer is added to the job's LLM usage totals (see llm.usage).
+
+        Returns:
+            custom_id -> completion text, or None for a request that failed
+            (requests missing from both files are absent)
+        """
+        out: Dict[str, Optional[str]] = {}
+        for key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(key)
+            if not file_id:
+                continue
+            for line in self._file_lines(file_id):
+                response = line.get("response") or {}
+                body = response.get("body") or {}
+                text = None
+                if response.get("status_code") == 200:
+                    choices = body.get("choices") or []
+                    if choices:
+                        text = ((choices[0].get("message") or {}).get("content") or "").strip() or None
+                usage = body.get("usage") or {}
+                record_usage(CallUsage(
+                    "openai",
+                    body.get("model") or "",
+                    int(usage.get("prompt_tokens") or 0),
+                    int(usage.get("completion_tokens") or 0),
+                    reported=bool(usage),
+                    ok=text is not None,
+                    batch=True,
+                ))
+                out[line.get("custom_id", "")] = text
+        return out
+
+
+def wait_for_batch(
+    client: OpenAIBatchClient,
+    batch_id: str,
+    poll_interval_s: float = 30.0,
+    on_status: Callable[[Dict[str, Any]], None] | None = None,
+    check_stop: Callable[[], None] | None = None,
+) -> Dict[str, Any]:
+    """
+    Poll a batch until it reaches a terminal status.
+
+    Args:
+        on_status: Called with the batch object after every poll
+        check_stop: Called about once a second while waiting; an exception it
+            raises (e.g. JobCancelled) cancels the batch and propagates
+
+    A failed poll (network error, 408/429 or 5xx) is retried with
+    exponential backoff; the batch keeps running at OpenAI meanwhile. Other
+    4xx answers, or _MAX_POLL_ERRORS failures in a row, are raised.
+
+    Returns:
+        The batch object in its terminal status
+
+    Raises:
+        httpx.HTTPError: The batch could not be polled
+    """
+    errors = 0
+    while True:
+        try:
+            batch = client.retrieve(batch_id)
+        except httpx.HTTPError as exc:
+            status = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+            errors += 1
+            if (status is not None and status < 500 and status not in (408, 429)) or errors >= _MAX_POLL_ERRORS:
+                raise
+            wait_s = min(_POLL_BACKOFF_CAP_S, poll_interval_s * 2 ** (errors - 1))
+            logger.warning(f"Polling OpenAI batch {batch_id} failed ({exc}); retrying in {wait_s:.0f}s")
+        else:
+            errors = 0
+            if on_status:
+                on_status(batch)
+            if batch.get("status") in TERMINAL_STATUSES:
+                return batch
+            wait_s = poll_interval_s
+        deadline = time.monotonic() + wait_s
+        while time.monotonic() < deadline:
+            if check_stop:
+                try:
+                    check_stop()
+                except BaseException:
+                    try:
+                        client.cancel(batch_id)
+                    except httpx.HTTPError as exc:
+                        logger.warning(f"Could not cancel OpenAI batch {batch_id}: {exc}")
+                    raise
+            time.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
@@ -0,0 +1,326 @@
+"""
+Page summaries - one LLM digest per page, reused by every campaign
+
+Drafting used to hand the raw page excerpt to every prompt, so pitching the
+same site with a new proposal re-digested the same page. The summarization
+stage runs once per canonical URL and content hash. It writes a short
+summary plus a few content highlights, which fill ``page_summary`` and
+``content_highlights`` on the research row. Later drafts use those instead
+of the excerpt, which makes their prompts smaller. When the page changes,
+its hash changes and it is summarized again.
+
+Summaries live in a SQLite file shared by the API and workers:
+
+- PAGE_SUMMARY_DB: database path (default data/page_summaries.sqlite3)
+- PAGE_SUMMARY_MAX_ENTRIES: summaries kept, oldest dropped first (default 20000)
+- PAGE_SUMMARIES=0 turns the stage off (drafts use the excerpt again)
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+from observability import CACHE_REQUESTS, span
+
+from .concurrency import provider_concurrency
+from .core import _site_block, llm_generate
+from .tokens import fit_excerpt
+
+SUMMARY_BATCH_SIZE = 5
+_MIN_PAGE_CHARS = 300  # shorter pages are used as they are
+_PAGE_TOKENS = 600
+_MAX_HIGHLIGHTS = 5
+_DEFAULT_MAX_ENTRIES = 20000
+_TRACKING_PARAMS = ("gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref")
+
+_SUMMARY_PREFIX = """
+You summarize web pages for guest post outreach research. For each page write:
+- summary: 2-3 neutral sentences on what the site publishes and who it is for
+- highlights: up to 5 short, specific items worth referencing in a pitch (article themes, recurring topics, notable claims), each under 15 words
+
+Use only the page content given; do not invent facts.
+
+OUTPUT FORMAT: Respond with a JSON object only, no markdown fences:
+{"pages": [{"id": 1, "summary": "<text>", "highlights": ["<text>", ...]}, ...]}
+with exactly one entry per page id.
+"""
+
+
+@dataclass
+class PageSummary:
+    summary: str
+    highlights: List[str] = field(default_factory=list)
+
+
+def canonical_url(url: str) -> str:
+    """
+    The URL a page is known by: lower-case scheme and host, no default port,
+    fragment, trailing slash or tracking parameters (utm_*, gclid, ...), and
+    sorted query parameters.
+    """
+    parts = urlsplit((url or "").strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    """Hash of the page text, insensitive to whitespace changes."""
+    return hashlib.sha256(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+
+def page_text(row: dict) -> str:
+    """The text a row's summary is made from."""
+    return row.get("full_page_text") or row.get("page_excerpt") or ""
+
+
+def summary_insights(summary: str, highlights: List[str]) -> str:
+    """The "insights" a draft gets for a summarized page."""
+    lines = [summary.strip()]
+    lines += [f"- {h.strip()}" for h in highlights if h and h.strip()]
+    return "\n".join(lines)
+
+
+class SummaryStore:
+    def __init__(self, db_path: str, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        self._db_path = db_path
+        self.max_entries = max(1, int(max_entries))
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS page_summaries (
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    highlights TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (url, content_hash)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS page_summaries_created ON page_summaries (created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        parent = os.path.dirname(self._db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, url: str, digest: str) -> Optional[PageSummary]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT summary, highlights FROM page_summaries WHERE url = ? AND content_hash = ?", (url, digest)
+            ).fetchone()
+        return PageSummary(row[0], json.loads(row[1])) if row else None
+
+    def put(self, url: str, digest: str, summary: PageSummary, provider: str, model: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO page_summaries "
+                "(url, content_hash, summary, highlights, provider, model, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, summary.summary, json.dumps(summary.highlights), provider, model, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM page_summaries WHERE rowid IN ("
+                "SELECT rowid FROM page_summaries ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+_store: Optional[SummaryStore] = None
+_store_path: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def summaries_enabled() -> bool:
+    return os.getenv("PAGE_SUMMARIES", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def summary_store() -> Optional[SummaryStore]:
+    """The configured store (see module docstring), or None when summaries are off or it cannot be opened."""
+    global _store, _store_path
+    if not summaries_enabled():
+        return None
+    path = os.getenv("PAGE_SUMMARY_DB") or os.path.join("data", "page_summaries.sqlite3")
+    with _store_lock:
+        if _store_path != path:
+            try:
+                max_entries = int(float(os.getenv("PAGE_SUMMARY_MAX_ENTRIES", str(_DEFAULT_MAX_ENTRIES))))
+            except ValueError:
+                max_entries = _DEFAULT_MAX_ENTRIES
+            try:
+                _store = SummaryStore(path, max_entries=max_entries)
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning(f"Page summaries disabled; cannot open {path}: {exc}")
+                _store = None
+            _store_path = path
+        return _store
+
+
+def _summary_prompt(pages: List[Tuple[dict, str]]) -> str:
+    blocks = "\n\n".join(
+        f"[{i}]\n" + _site_block(row, fit_excerpt(text, _PAGE_TOKENS, (row.get("title", ""),)))
+        for i, (row, text) in enumerate(pages, start=1)
+    )
+    return f"""{_SUMMARY_PREFIX}
+PAGES:
+{blocks}
+"""
+
+
+def _parse_summaries(text: str) -> Dict[int, PageSummary]:
+    t = text or ""
+    try:
+        data = json.loads(t[t.find("{"):t.rfind("}") + 1])
+    except ValueError:
+        return {}
+    entries = data.get("pages") if isinstance(data, dict) else None
+    out: Dict[int, PageSummary] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            page_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        summary = entry.get("summary")
+        highlights = entry.get("highlights")
+        if not isinstance(summary, str) or not summary.strip():
+            continue
+        if not isinstance(highlights, list):
+            highlights = []
+        out[page_id] = PageSummary(
+            summary.strip(),
+            [h.strip() for h in highlights if isinstance(h, str) and h.strip()][:_MAX_HIGHLIGHTS],
+        )
+    return out
+
+
+def summarize_pages(
+    pages: List[Tuple[dict, str]],
+    provider: str = "gemini",
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    gemini_api_key: str | None = None,
+) -> Tuple[List[Optional[PageSummary]], str, str]:
+    """
+    Summarize several pages with one LLM request.
+
+    Args:
+        pages: (row, page text) pairs
+
+    Returns:
+        One PageSummary per page, in order (None where the answer had none),
+        plus the provider and model that answered
+    """
+    result = llm_generate(
+        _summary_prompt(pages),
+        provider=provider,
+        model=model,
+        openai_api_key=openai_api_key,
+        gemini_api_key=gemini_api_key,
+        json_output=True,
+        max_tokens=min(16000, 250 * len(pages)),
+    )
+    if result.fallback:
+        return [None] * len(pages), result.provider, result.model
+    parsed = _parse_summaries(result.text)
+    return [parsed.get(i) for i in range(1, len(pages) + 1)], result.provider, result.model
+
+
+def ensure_page_summaries(
+    rows: List[dict],
+    provider: str = "gemini",
+    model: str | None = None,
+    openai_api_key: str | None = None,
+    gemini_api_key: str | None = None,
+    generate: bool = True,
+) -> int:
+    """
+    Fill ``page_summary`` and ``content_highlights`` on rows that lack them,
+    from the store or (with ``generate``) by summarizing the missing pages,
+    SUMMARY_BATCH_SIZE per request. Rows whose page text is too short to be
+    worth summarizing, or whose summary failed, are left as they are.
+
+    Returns:
+        Number of pages summarized by the LLM in this call
+    """
+    store = summary_store()
+    if store is None:
+        return 0
+    pending: Dict[Tuple[str, str], List[dict]] = {}
+    for row in rows:
+        text = page_text(row)
+        if row.get("page_summary") or len(text) < _MIN_PAGE_CHARS:
+            continue
+        pending.setdefault((canonical_url(row.get("url", "")), content_hash(text)), []).append(row)
+
+    missing: List[Tuple[str, str]] = []
+    for key, same_page in pending.items():
+        try:
+            found = store.get(*key)
+        except sqlite3.Error as exc:
+            logger.warning(f"page summary read failed: {exc}")
+            found = None
+        CACHE_REQUESTS.inc(cache="page_summary", result="hit" if found is not None else "miss")
+        if found is None:
+            missing.append(key)
+            continue
+        for row in same_page:
+            row["page_summary"], row["content_highlights"] = found.summary, list(found.highlights)
+    if not generate or not missing:
+        return 0
+
+    chunks = [missing[i:i + SUMMARY_BATCH_SIZE] for i in range(0, len(missing), SUMMARY_BATCH_SIZE)]
+
+    def summarize(chunk: List[Tuple[str, str]]) -> int:
+        pages = [(pending[key][0], page_text(pending[key][0])) for key in chunk]
+        with span("summarize_pages", pages=len(pages)):
+            summaries, used_provider, used_model = summarize_pages(
+                pages, provider, model, openai_api_key, gemini_api_key
+            )
+        done = 0
+        for key, summary in zip(chunk, summaries):
+            if summary is None:
+                continue
+            done += 1
+            try:
+                store.put(*key, summary, used_provider, used_model)
+            except sqlite3.Error as exc:
+                logger.warning(f"page summary write failed: {exc}")
+            for row in pending[key]:
+                row["page_summary"], row["content_highlights"] = summary.summary, list(summary.highlights)
+        return done
+
+    workers = min(len(chunks), provider_concurrency(provider))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize") as pool:
+        # Each chunk runs in a copy of this (the caller's) context, so its spans
+        # land in the job's timings and its LLM calls in the job's usage.
+        futures = [pool.submit(contextvars.copy_context().run, summarize, chunk) for chunk in chunks]
+        counts = [fut.result() for fut in futures]
+    if sum(counts) < len(missing):
+        logger.warning(f"Summarized {sum(counts)} of {len(missing)} pages; the rest are drafted from their excerpt")
+    return sum(counts)
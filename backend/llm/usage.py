@@ -0,0 +1,185 @@
+"""
+LLM usage - per-call token, latency and cost accounting, totalled per job
+
+Every provider call records the prompt and completion tokens the provider
+reported, falling back to a local count when the response carries none. It
+also records the call's latency, with queueing and retries included, and its
+number of attempts. Inside `usage_scope()`, which the job runners open
+around a job, the calls are totalled per provider and model. The totals go
+into `Job.meta["llm_usage"]`. As with job timings, work handed to other
+threads must run in a copy of the context to be counted.
+
+Cost is estimated from a per-model price table in USD per million tokens.
+LLM_PRICES overrides or extends it with JSON such as
+``{"gpt-4o-mini": [0.15, 0.6]}``. Calls to models without a price are
+counted, but not costed. Batch API calls are priced at half the rate.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+import json
+import os
+import threading
+
+from loguru import logger
+
+# USD per million (prompt, completion) tokens; longest matching prefix wins.
+_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+_BATCH_DISCOUNT = 0.5
+
+_current: ContextVar[Optional["UsageTotals"]] = ContextVar("llm_usage", default=None)
+
+
+@dataclass
+class CallUsage:
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_s: float = 0.0  # whole call: limits, retries and backoff included
+    attempts: int = 1
+    reported: bool = False  # token counts came from the provider (else local counts)
+    ok: bool = True
+    batch: bool = False  # OpenAI Batch API (half price)
+
+    @property
+    def cost_usd(self) -> Optional[float]:
+        if not self.ok:
+            return 0.0
+        price = model_price(self.model)
+        if price is None:
+            return None
+        cost = (self.prompt_tokens * price[0] + self.completion_tokens * price[1]) / 1_000_000
+        return cost * _BATCH_DISCOUNT if self.batch else cost
+
+
+def _price_table() -> Dict[str, Tuple[float, float]]:
+    raw = os.getenv("LLM_PRICES")
+    if not raw:
+        return _PRICES
+    try:
+        extra = {str(k): (float(v[0]), float(v[1])) for k, v in json.loads(raw).items()}
+    except (ValueError, TypeError, IndexError, AttributeError) as exc:
+        logger.warning(f"LLM_PRICES ignored ({exc}); expected {{\"model\": [prompt_usd, completion_usd]}}")
+        return _PRICES
+    return {**_PRICES, **extra}
+
+
+def model_price(model: str) -> Optional[Tuple[float, float]]:
+    """(prompt, completion) USD per million tokens for a model, or None when unknown."""
+    name = (model or "").split("/")[-1]
+    table = _price_table()
+    matches = [key for key in table if name == key or name.startswith(key + "-")]
+    return table[max(matches, key=len)] if matches else None
+
+
+class UsageTotals:
+    """Thread-safe usage totals of one job, per provider/model."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._cache_hits = 0
+
+    def add(self, call: CallUsage) -> None:
+        cost = call.cost_usd
+        with self._lock:
+            m = self._models.setdefault(
+                f"{call.provider}/{call.model}",
+                {
+                    "calls": 0, "failed_calls": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                    "latency_s": 0.0, "max_latency_s": 0.0, "cost_usd": 0.0, "priced": True,
+                },
+            )
+            m["calls"] += 1
+            m["failed_calls"] += 0 if call.ok else 1
+            m["retries"] += max(0, call.attempts - 1)
+            m["prompt_tokens"] += call.prompt_tokens
+            m["completion_tokens"] += call.completion_tokens
+            m["latency_s"] += call.latency_s
+            m["max_latency_s"] = max(m["max_latency_s"], call.latency_s)
+            if cost is None:
+                m["priced"] = False
+            else:
+                m["cost_usd"] += cost
+
+    def add_cache_hit(self) -> None:
+        with self._lock:
+            self._cache_hits += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        JSON-friendly totals: calls, failed calls, retries, cache hits,
+        tokens, latency, estimated cost, and the same per provider/model.
+        ``cost_usd`` leaves out models without a price; those are listed in
+        ``unpriced_models``.
+        """
+        with self._lock:
+            by_model = {
+                key: {
+                    **{k: v for k, v in m.items() if k not in ("latency_s", "max_latency_s", "cost_usd", "priced")},
+                    "latency_s": round(m["latency_s"], 3),
+                    "max_latency_s": round(m["max_latency_s"], 3),
+                    "cost_usd": round(m["cost_usd"], 6) if m["priced"] else None,
+                }
+                for key, m in sorted(self._models.items())
+            }
+            cache_hits = self._cache_hits
+        totals: Dict[str, Any] = {
+            k: sum(m[k] for m in by_model.values())
+            for k in ("calls", "failed_calls", "retries", "prompt_tokens", "completion_tokens")
+        }
+        calls = totals["calls"]
+        return {
+            **totals,
+            "cache_hits": cache_hits,
+            "latency_s": round(sum(m["latency_s"] for m in by_model.values()), 3),
+            "avg_latency_s": round(sum(m["latency_s"] for m in by_model.values()) / calls, 3) if calls else None,
+            "cost_usd": round(sum(m["cost_usd"] or 0.0 for m in by_model.values()), 6),
+            "unpriced_models": [key for key, m in by_model.items() if m["cost_usd"] is None],
+            "by_model": by_model,
+        }
+
+
+def record_usage(call: CallUsage) -> None:
+    """Add one provider call to the current job's totals (no-op outside usage_scope)."""
+    totals = _current.get()
+    if totals is not None:
+        totals.add(call)
+
+
+def record_cache_hit() -> None:
+    totals = _current.get()
+    if totals is not None:
+        totals.add_cache_hit()
+
+
+def current_usage() -> Optional[UsageTotals]:
+    return _current.get()
+
+
+@contextmanager
+def usage_scope() -> Iterator[UsageTotals]:
+    """Total the LLM usage of everything run in this context (e.g. one job)."""
+    totals = UsageTotals()
+    token = _current.set(totals)
+    try:
+        yield totals
+    finally:
+        _current.reset(token)
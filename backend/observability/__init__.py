@@ -0,0 +1,60 @@
+"""
+Observability Package - Prometheus metrics and per-job tracing for the research, LLM and sending pipeline
+"""
+from .metrics import (
+    CONTENT_TYPE,
+    REGISTRY,
+    STAGE_SECONDS,
+    CACHE_REQUESTS,
+    RESEARCH_ROWS,
+    RESEARCH_CANDIDATES,
+    DRAFTS,
+    PROVIDER_ERRORS,
+    LLM_RETRIES,
+    LLM_CONCURRENCY_LIMIT,
+    LLM_CIRCUIT_OPEN,
+    LLM_FAILOVERS,
+    LLM_FIRST_TOKEN,
+    PROMPT_TOKENS,
+    SMTP_SESSIONS,
+    QUEUE_DEPTH,
+    stage,
+    record_provider_error,
+    error_code,
+    render_metrics,
+)
+from .tracing import (
+    OTEL_AVAILABLE,
+    JobTimings,
+    span,
+    job_timings,
+    current_timings,
+)
+
+__all__ = [
+    'CONTENT_TYPE',
+    'REGISTRY',
+    'STAGE_SECONDS',
+    'CACHE_REQUESTS',
+    'RESEARCH_ROWS',
+    'RESEARCH_CANDIDATES',
+    'DRAFTS',
+    'PROVIDER_ERRORS',
+    'LLM_RETRIES',
+    'LLM_CONCURRENCY_LIMIT',
+    'LLM_CIRCUIT_OPEN',
+    'LLM_FAILOVERS',
+    'LLM_FIRST_TOKEN',
+    'PROMPT_TOKENS',
+    'SMTP_SESSIONS',
+    'QUEUE_DEPTH',
+    'stage',
+    'record_provider_error',
+    'error_code',
+    'render_metrics',
+    'OTEL_AVAILABLE',
+    'JobTimings',
+    'span',
+    'job_timings',
+    'current_timings',
+]
@@ -0,0 +1,269 @@
+"""
+Metrics - a small in-process Prometheus registry (text exposition format 0.0.4)
+
+Counters, gauges and histograms with labels, rendered by the API's /metrics
+endpoint (and a worker's --metrics-port). Kept dependency-free so the
+scraping, llm and email_providers packages can import it unconditionally.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from .tracing import span
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Network stages range from ~10ms (cached/local) to minutes (stuck scrapes).
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    f = float(v)
+    if f == float("inf"):
+        return "+Inf"
+    return str(int(f)) if f.is_integer() and abs(f) < 1e15 else repr(f)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:  # pragma: no cover - overridden
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., count in +Inf only], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        lines: List[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "backlinker_stage_duration_seconds",
+    "Latency of pipeline stages (search, scrape, fetch, parse, LLM, send)",
+    ["stage"],
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "backlinker_cache_requests_total",
+    "Cache lookups by cache name and result (hit | miss)",
+    ["cache", "result"],
+))
+RESEARCH_ROWS = REGISTRY.register(Counter(
+    "backlinker_research_rows_total",
+    "Research rows built, by where their excerpt came from (firecrawl, httpx, serper_snippet, empty)",
+    ["context_source"],
+))
+RESEARCH_CANDIDATES = REGISTRY.register(Counter(
+    "backlinker_research_candidates_total",
+    "Search results seen by research, by outcome (scraped, failed, dropped, blocked, unused)",
+    ["outcome"],
+))
+DRAFTS = REGISTRY.register(Counter(
+    "backlinker_drafts_total",
+    "Email drafts generated, by status (ok | fallback) and provider",
+    ["status", "provider"],
+))
+PROVIDER_ERRORS = REGISTRY.register(Counter(
+    "backlinker_provider_errors_total",
+    "Errors from external providers, by provider and HTTP status or exception type",
+    ["provider", "code"],
+))
+LLM_RETRIES = REGISTRY.register(Counter(
+    "backlinker_llm_retries_total",
+    "LLM requests retried after a transient error, by provider and HTTP status or exception type",
+    ["provider", "code"],
+))
+LLM_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "backlinker_llm_concurrency_limit",
+    "Current adaptive (AIMD) limit on in-flight LLM requests per provider",
+    ["provider"],
+))
+LLM_CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    "backlinker_llm_circuit_open",
+    "1 while the provider's circuit breaker is open (calls fail fast or fail over)",
+    ["provider"],
+))
+LLM_FAILOVERS = REGISTRY.register(Counter(
+    "backlinker_llm_failovers_total",
+    "Requests sent to the secondary LLM provider, by target and reason (circuit_open, error, hedge)",
+    ["provider", "reason"],
+))
+LLM_FIRST_TOKEN = REGISTRY.register(Histogram(
+    "backlinker_llm_first_token_seconds",
+    "Time to the first streamed token of an LLM request",
+    ["provider"],
+))
+PROMPT_TOKENS = REGISTRY.register(Histogram(
+    "backlinker_llm_prompt_tokens",
+    "Prompt tokens sent per LLM request (local count)",
+    ["provider"],
+    buckets=(100, 250, 500, 750, 1000, 2000, 4000, 8000, 16000),
+))
+SMTP_SESSIONS = REGISTRY.register(Counter(
+    "backlinker_smtp_sessions_total",
+    "Pooled SMTP session events (opened, reused, reconnected, retired, stale, expired)",
+    ["event"],
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "backlinker_jobs",
+    "Jobs per type and state (queued | running), sampled at scrape time",
+    ["job_type", "state"],
+))
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[None]:
+    """Time a pipeline stage into backlinker_stage_duration_seconds and as a tracing span."""
+    start = time.perf_counter()
+    try:
+        with span(name, **attributes):
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+def error_code(exc: BaseException) -> str:
+    """Best-effort HTTP status (or exception class name) for an SDK/HTTP error."""
+    for attr in ("status_code", "code", "http_status"):
+        v = getattr(exc, attr, None)
+        if isinstance(v, int):
+            return str(v)
+    response = getattr(exc, "response", None)
+    v = getattr(response, "status_code", None)
+    if isinstance(v, int):
+        return str(v)
+    return type(exc).__name__
+
+
+def record_provider_error(provider: str, code: object) -> None:
+    PROVIDER_ERRORS.inc(provider=provider, code=str(code))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,116 @@
+"""
+Tracing - per-job spans and stage timing breakdown
+
+`span()` wraps a unit of work (search, one URL, extraction, an LLM call, a
+send). Spans are exported through OpenTelemetry when `opentelemetry-api` is
+installed and a tracer provider is configured; otherwise they cost a couple of
+`perf_counter()` calls. Inside `job_timings()` every span is also added to the
+job's timing summary, which the runners store in `Job.meta["timings"]`.
+
+The current job is held in a context variable, so work handed to other
+threads must be started with `contextvars.copy_context().run(...)` to be
+counted.
+"""
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import heapq
+import itertools
+import threading
+import time
+
+try:
+    from opentelemetry import trace as _otel_trace
+    OTEL_AVAILABLE = True
+except Exception:  # pragma: no cover - optional dependency
+    _otel_trace = None
+    OTEL_AVAILABLE = False
+
+# Keep the N slowest individual spans per job, with their attributes (url, row...).
+SLOWEST_SPANS = 10
+
+_current: ContextVar[Optional["JobTimings"]] = ContextVar("job_timings", default=None)
+
+
+class JobTimings:
+    """Thread-safe per-stage totals for one job run."""
+
+    def __init__(self, job_id: str, job_type: str) -> None:
+        self.job_id = job_id
+        self.job_type = job_type
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._slowest: List[tuple] = []  # min-heap of (seconds, seq, name, attributes)
+        self._seq = itertools.count()
+
+    def add(self, name: str, seconds: float, attributes: Dict[str, Any]) -> None:
+        with self._lock:
+            s = self._stages.setdefault(name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            s["count"] += 1
+            s["total_s"] += seconds
+            s["max_s"] = max(s["max_s"], seconds)
+            item = (seconds, next(self._seq), name, attributes)
+            if len(self._slowest) < SLOWEST_SPANS:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        JSON-friendly breakdown: wall time, per-stage count/total/max, slowest spans.
+
+        Spans nest (a research URL contains its scrape and fetch), so stage
+        totals overlap and do not add up to the wall time.
+        """
+        with self._lock:
+            stages = {
+                name: {"count": int(s["count"]), "total_s": round(s["total_s"], 3), "max_s": round(s["max_s"], 3)}
+                for name, s in sorted(self._stages.items(), key=lambda kv: -kv[1]["total_s"])
+            }
+            slowest = [
+                {"stage": name, "seconds": round(sec, 3), **attrs}
+                for sec, _, name, attrs in sorted(self._slowest, reverse=True)
+            ]
+        return {"wall_s": round(time.perf_counter() - self._started, 3), "stages": stages, "slowest": slowest}
+
+
+def current_timings() -> Optional[JobTimings]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Time a unit of work as a tracing span.
+
+    Args:
+        name: Stage name (e.g. "serper_search", "research_url")
+        **attributes: Span attributes such as url or row; keep them small
+    """
+    timings = _current.get()
+    with ExitStack() as stack:
+        if OTEL_AVAILABLE:
+            stack.enter_context(_otel_trace.get_tracer("backlinker").start_as_current_span(
+                name, attributes={k: str(v) for k, v in attributes.items() if v is not None}
+            ))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if timings is not None:
+                timings.add(name, time.perf_counter() - start, attributes)
+
+
+@contextmanager
+def job_timings(job_id: str, job_type: str) -> Iterator[JobTimings]:
+    """Collect the timing breakdown of one job run (and open its root span)."""
+    with span(f"job_{job_type}", job_id=job_id):
+        timings = JobTimings(job_id, job_type)
+        token = _current.set(timings)
+        try:
+            yield timings
+        finally:
+            _current.reset(token)
@@ -4,8 +4,10 @@ Scraping Module Package - web scraping functions
 from .core import (
     find_backlink_opportunities,
 )
-from .serper import generate_search_queries
+from .serper import generate_search_queries, search_serper
 from .firecrawl import scrape_website
+from .cassette import Cassette, CassetteMiss, use_cassette
+from .relevance import relevance_scores
 
 
 from .content_extraction import (
@@ -28,7 +30,12 @@ from .link_extraction import (
 __all__ = [
     'find_backlink_opportunities',
     'generate_search_queries',
+    'search_serper',
     'scrape_website',
+    'Cassette',
+    'CassetteMiss',
+    'use_cassette',
+    'relevance_scores',
 
     '_collect_page_text',
     '_strip_html_tags',
@@ -0,0 +1,120 @@
+"""
+Candidate Scoring Module - Ranks search results before anything is fetched
+
+Each Serper organic result is scored from its title, snippet and URL alone:
+how strongly it looks like a guest post page (footprints), how well it
+matches the keyword, and whether it looks like a directory of other sites.
+Results on blocked domains (social networks, marketplaces, directories),
+or scoring below RESEARCH_MIN_CANDIDATE_SCORE, are dropped without being
+fetched. The rest are scraped best first.
+
+- RESEARCH_MIN_CANDIDATE_SCORE: lowest score worth a fetch (default 0.5)
+- RESEARCH_BLOCKED_DOMAINS: extra comma-separated domains to skip
+"""
+from typing import Optional
+from urllib.parse import urlparse
+import os
+import re
+
+from .relevance import _terms
+
+# Footprint phrase -> strength (1.0 = a guest post page, 0.3 = a weak hint).
+_FOOTPRINTS = {
+    "write for us": 1.0,
+    "write-for-us": 1.0,
+    "guest post guidelines": 1.0,
+    "submit a guest post": 1.0,
+    "submit guest post": 1.0,
+    "guest post": 0.8,
+    "guest-post": 0.8,
+    "become a guest blogger": 0.8,
+    "guest contributor": 0.7,
+    "contributor guidelines": 0.7,
+    "submission guidelines": 0.6,
+    "editorial guidelines": 0.5,
+    "submit article": 0.5,
+    "contribute": 0.3,
+}
+_SNIPPET_DISCOUNT = 0.6  # a footprint only in the snippet is weaker evidence
+# Pages listing other sites that accept guest posts.
+_DIRECTORY_PATTERN = re.compile(
+    r"\b(?:top\s+)?\d+\+?\s+(?:\w+\s+){0,3}(?:sites|blogs|websites)\b"
+    r"|\b(?:list of|sites that accept|blogs that accept|guest posting sites|guest post sites)\b",
+    re.IGNORECASE,
+)
+_DIRECTORY_PENALTY = 1.5
+_BLOCKED_DOMAINS = frozenset(
+    (
+        "facebook.com", "twitter.com", "x.com", "linkedin.com", "instagram.com", "pinterest.com",
+        "youtube.com", "tiktok.com", "reddit.com", "quora.com", "wikipedia.org", "amazon.com",
+        "ebay.com", "fiverr.com", "upwork.com", "yelp.com", "github.com", "google.com",
+    )
+)
+_DEFAULT_MIN_SCORE = 0.5
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def blocked_domains() -> frozenset:
+    """The built-in blocklist plus RESEARCH_BLOCKED_DOMAINS."""
+    extra = (d.strip().lower() for d in os.getenv("RESEARCH_BLOCKED_DOMAINS", "").split(","))
+    return _BLOCKED_DOMAINS | {d[4:] if d.startswith("www.") else d for d in extra if d}
+
+
+def is_blocked(url: str, blocked: Optional[frozenset] = None) -> bool:
+    """Whether ``url`` is on a blocked domain or one of its subdomains."""
+    host = _host(url)
+    for domain in blocked if blocked is not None else blocked_domains():
+        if host == domain or host.endswith("." + domain):
+            return True
+    return False
+
+
+def min_candidate_score() -> float:
+    try:
+        return float(os.getenv("RESEARCH_MIN_CANDIDATE_SCORE", str(_DEFAULT_MIN_SCORE)))
+    except ValueError:
+        return _DEFAULT_MIN_SCORE
+
+
+def _footprint_strength(title: str, snippet: str, url: str) -> float:
+    strong = f"{title} {url}".lower()
+    weak = snippet.lower()
+    best = 0.0
+    for phrase, strength in _FOOTPRINTS.items():
+        if phrase in strong:
+            best = max(best, strength)
+        elif phrase in weak:
+            best = max(best, strength * _SNIPPET_DISCOUNT)
+    return best
+
+
+def score_candidate(item: dict, keyword: str) -> float:
+    """
+    Score one organic search result from its title, snippet and URL.
+
+    The score is footprint strength (0-1) plus the share of keyword terms
+    found in the result (0-1), less a penalty for directory-style pages.
+    Nothing is fetched.
+
+    Args:
+        item: Serper organic result (title, link, snippet)
+        keyword: The research keyword, footprints removed
+
+    Returns:
+        float: Higher is a better candidate (at most 2.0)
+    """
+    title = item.get("title") or ""
+    snippet = item.get("snippet") or item.get("description") or ""
+    url = item.get("link") or ""
+    score = _footprint_strength(title, snippet, url)
+    keyword_terms = set(_terms(keyword))
+    if keyword_terms:
+        found = set(_terms(f"{title} {snippet} {urlparse(url).path.replace('-', ' ').replace('/', ' ')}"))
+        score += len(keyword_terms & found) / len(keyword_terms)
+    if _DIRECTORY_PATTERN.search(title):
+        score -= _DIRECTORY_PENALTY
+    return score
@@ -0,0 +1,254 @@
+"""
+Scrape cassettes - record and replay every Serper, Firecrawl and page fetch
+
+With SCRAPE_CASSETTE set, the provider calls made by research
+(`search_serper`, `_serper_reachable`, `scrape_website`, `_http_fetch_text`)
+go through the cassette:
+
+- record: the call runs live, and its response (or error) and latency are appended to the archive
+- replay: the recorded response is returned after the recorded latency × SCRAPE_CASSETTE_LATENCY;
+  nothing touches the network and an unrecorded call fails with CassetteMiss
+
+Only the provider responses are recorded; extraction, scoring and row
+building still run, so a replayed job measures the current code on exactly
+the same inputs. API keys and headers are never written.
+
+The archive is gzip-compressed JSON lines. Response strings of 256 chars or
+more (page HTML, markdown) are stored once by content hash, so a page fetched
+by both Firecrawl and httpx costs one copy.
+"""
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Set, Tuple
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from loguru import logger
+
+MODES = ("record", "replay")
+_BODY_MIN_CHARS = 256
+
+
+class CassetteMiss(Exception):
+    """A replayed run made a call that was not recorded."""
+
+
+class ReplayedError(Exception):
+    """An error recorded from the live provider, raised again on replay."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _request_key(kind: str, request: Dict[str, Any]) -> str:
+    return kind + " " + json.dumps(request, sort_keys=True, separators=(",", ":"))
+
+
+def _error_status(exc: BaseException) -> Optional[int]:
+    for obj in (exc, getattr(exc, "response", None)):
+        v = getattr(obj, "status_code", None)
+        if isinstance(v, int):
+            return v
+    return None
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 1.0) -> None:
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = max(0.0, latency_scale)
+        self._lock = threading.Lock()
+        self._bodies: Dict[str, str] = {}
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._file = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if os.path.exists(path):
+            self._load()
+        elif mode == "replay":
+            raise FileNotFoundError(f"cassette not found: {path}")
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if "body" in rec:
+                    self._bodies[rec["sha"]] = rec["body"]
+                else:
+                    self._entries.setdefault(rec["key"], deque()).append(rec)
+
+    # -- recording --------------------------------------------------------
+
+    def _write(self, rec: Dict[str, Any]) -> None:
+        # Called with the lock held.
+        if self._file is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._file = gzip.open(self.path, "at", encoding="utf-8")
+        self._file.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+    def _pack(self, value: Any) -> Any:
+        # Called with the lock held; moves large strings into shared body records.
+        if isinstance(value, str) and len(value) >= _BODY_MIN_CHARS:
+            sha = hashlib.sha1(value.encode("utf-8")).hexdigest()
+            if sha not in self._bodies:
+                self._bodies[sha] = value
+                self._write({"sha": sha, "body": value})
+            return {"$body": sha}
+        if isinstance(value, dict):
+            return {k: self._pack(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._pack(v) for v in value]
+        return value
+
+    def _unpack(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {"$body"}:
+                return self._bodies[value["$body"]]
+            return {k: self._unpack(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._unpack(v) for v in value]
+        return value
+
+    def _record(self, kind: str, key: str, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as exc:
+            elapsed = time.perf_counter() - start
+            rec = {"key": key, "kind": kind, "elapsed_s": round(elapsed, 4),
+                   "error": {"type": type(exc).__name__, "message": str(exc), "status": _error_status(exc)}}
+            with self._lock:
+                self._write(rec)
+                self._file.flush()
+                self.recorded += 1
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._write({"key": key, "kind": kind, "elapsed_s": round(elapsed, 4), "response": self._pack(result)})
+            self._file.flush()
+            self.recorded += 1
+        return result
+
+    # -- replay -----------------------------------------------------------
+
+    def _replay(self, kind: str, key: str) -> Any:
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                rec = queue.popleft()
+                self._last[key] = rec
+            else:
+                # Same request more often than recorded: repeat its last answer.
+                rec = self._last.get(key)
+            if rec is None:
+                self.misses += 1
+            else:
+                self.replayed += 1
+        if rec is None:
+            raise CassetteMiss(f"no recorded {kind} response for {key}")
+        if self.latency_scale:
+            time.sleep(rec.get("elapsed_s", 0.0) * self.latency_scale)
+        err = rec.get("error")
+        if err:
+            raise ReplayedError(f"{err['type']}: {err['message']}", err.get("status"))
+        return self._unpack(rec.get("response"))
+
+    def call(self, kind: str, request: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """
+        Run (record) or answer (replay) one provider call.
+
+        Args:
+            kind: Call type, e.g. "serper_search"
+            request: What identifies the request (query, URL); must be JSON-serialisable
+            fn: Performs the live call; its result must be JSON-serialisable
+
+        Returns:
+            The live or recorded response
+
+        Raises:
+            CassetteMiss: Replay of a request that was never recorded
+            ReplayedError: The recorded call failed
+        """
+        key = _request_key(kind, request)
+        if self.mode == "record":
+            return self._record(kind, key, fn)
+        return self._replay(kind, key)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def kinds(self) -> Set[str]:
+        """Call types present in the archive (e.g. to know which providers were configured)."""
+        with self._lock:
+            return {q[0]["kind"] for q in self._entries.values() if q} | {r["kind"] for r in self._last.values()}
+
+    def stats(self) -> Dict[str, int]:
+        return {"recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+
+_active: Optional[Cassette] = None
+_active_env: Optional[Tuple[str, str, str]] = None
+_active_lock = threading.Lock()
+_override: Optional[Cassette] = None
+
+
+def active_cassette() -> Optional[Cassette]:
+    """
+    The cassette in use: one opened with use_cassette(), else one configured by
+    SCRAPE_CASSETTE / SCRAPE_CASSETTE_MODE (record | replay, default replay) /
+    SCRAPE_CASSETTE_LATENCY (latency scale, default 1.0), else None.
+    """
+    global _active, _active_env
+    if _override is not None:
+        return _override
+    path = os.getenv("SCRAPE_CASSETTE")
+    if not path:
+        return None
+    env = (path, os.getenv("SCRAPE_CASSETTE_MODE", "replay"), os.getenv("SCRAPE_CASSETTE_LATENCY", "1.0"))
+    with _active_lock:
+        if _active is None or _active_env != env:
+            if _active is not None:
+                _active.close()
+            _active = Cassette(env[0], env[1].strip().lower(), float(env[2]))
+            _active_env = env
+            logger.info(f"scrape cassette {path}: {_active.mode} (latency x{_active.latency_scale})")
+        return _active
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", latency_scale: float = 1.0) -> Iterator[Cassette]:
+    """Route provider calls through a cassette for the duration of the block (all threads)."""
+    global _override
+    cassette = Cassette(path, mode, latency_scale)
+    previous, _override = _override, cassette
+    try:
+        yield cassette
+    finally:
+        _override = previous
+        cassette.close()
+
+
+def cassette_call(kind: str, request: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+    """fn() directly, or through the active cassette when one is configured."""
+    cassette = active_cassette()
+    if cassette is None:
+        return fn()
+    return cassette.call(kind, request, fn)
@@ -5,6 +5,8 @@ import re
 import httpx
 from loguru import logger
 from typing import Optional, Tuple
+from observability import stage, record_provider_error, error_code
+from .cassette import cassette_call
 
 # Lazy import to avoid dependency issues
 try:
@@ -233,7 +235,12 @@ def _strip_html_tags(html: str) -> str:
     """
     if not html:
         return ""
-    
+    with stage("html_parse"):
+        return _extract_readable_text(html)
+
+
+def _extract_readable_text(html: str) -> str:
+    """Pick the better of main-content and fallback extraction (see _strip_html_tags)."""
     # Try enhanced extraction first
     try:
         enhanced_content = _extract_main_content(html)
@@ -271,7 +278,7 @@ def _collapse_whitespace(text: str) -> str:
 
 def _http_fetch_text(url: str, timeout_s: int = 15) -> tuple[str, str]:
     """Fetch raw HTML via httpx and return (text, html). Safe, best-effort."""
-    try:
+    def _get() -> dict:
         resp = httpx.get(
             url,
             headers={
@@ -281,11 +288,18 @@ def _http_fetch_text(url: str, timeout_s: int = 15) -> tuple[str, str]:
             follow_redirects=True,
             timeout=timeout_s,
         )
-        if resp.status_code >= 400:
+        return {"status": resp.status_code, "html": resp.text or ""}
+
+    try:
+        with stage("httpx_fetch", url=url):
+            fetched = cassette_call("http_fetch", {"url": url}, _get)
+        if fetched["status"] >= 400:
+            record_provider_error("httpx", fetched["status"])
             return "", ""
-        html = resp.text or ""
+        html = fetched["html"]
         text = _strip_html_tags(html)
         return _collapse_whitespace(text), html
     except Exception as exc:
+        record_provider_error("httpx", error_code(exc))
         logger.warning(f"HTTP fallback fetch failed for {url}: {exc}")
         return "", ""
@@ -7,6 +7,9 @@ to enable future extensibility with alternative scraping providers.
 """
 import os
 from loguru import logger
+from observability import stage, record_provider_error, error_code
+from .cassette import cassette_call
+from .content_extraction import _collect_page_text
 
 
 def _get_firecrawl_api_key():
@@ -19,13 +22,21 @@ def scrape_website(url: str, firecrawl_api_key: str | None = None):
     key = firecrawl_api_key or _get_firecrawl_api_key()
     if not key:
         return {}
-    try:
+    def _scrape() -> dict:
         # Firecrawl Python SDK import at runtime to avoid hard dep if absent
         from firecrawl import FirecrawlApp
         app = FirecrawlApp(api_key=key)
         data = app.scrape_url(url, formats=["markdown", "html"])  # type: ignore
+        # Plain dict (not the SDK's response object) so it can be recorded
+        md_text, html_text = _collect_page_text(data)
+        return {"markdown": md_text.lstrip("\n"), "html": html_text} if (md_text or html_text) else {}
+
+    try:
+        with stage("firecrawl_scrape", url=url):
+            data = cassette_call("firecrawl_scrape", {"url": url}, _scrape)
         return data or {}
     except Exception as exc:
+        record_provider_error("firecrawl", error_code(exc))
         logger.warning(f"Firecrawl scrape failed for {url}: {exc}")
         return {}
 
@@ -0,0 +1,72 @@
+"""
+Relevance Module - Offline BM25 ranking of research rows against a campaign
+
+Scores each row's title and page excerpt against the campaign keyword and
+proposed topic, so drafting spends the LLM budget on the best-matching
+sites first. Everything runs locally: the term statistics come from the
+rows being ranked, and the scoring is vectorized with NumPy.
+"""
+from typing import List
+import re
+
+import numpy as np
+
+_TERM = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or our that the their this to was "
+    "were what when where which who why will with you your guest post posts write writing blog".split()
+)
+_K1 = 1.2
+_B = 0.75
+_TITLE_WEIGHT = 2.0  # a title match counts as two excerpt matches
+
+
+def _stem(term: str) -> str:
+    """Crude suffix folding, enough to match "tools" with "tool" and "gardening" with "garden"."""
+    if len(term) > 6 and term.endswith("ing"):
+        return term[:-3]
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith(("ss", "us", "is")):
+        return term[:-1]
+    return term
+
+
+def _terms(text: str) -> List[str]:
+    return [_stem(t) for t in _TERM.findall((text or "").lower()) if t not in _STOP_WORDS]
+
+
+def relevance_scores(rows: List[dict], query: str) -> List[float]:
+    """
+    BM25 score of each row's ``title`` and ``page_excerpt`` against ``query``.
+
+    Title terms count ``_TITLE_WEIGHT`` times. Document frequencies are
+    taken over ``rows`` themselves, so a query term found on every page
+    adds little and a rarer one decides the ranking.
+
+    Args:
+        rows: Research rows (dicts)
+        query: Campaign keyword and topic
+
+    Returns:
+        One score per row, in order (0.0 for every row when the query has no terms)
+    """
+    query_terms = sorted(set(_terms(query)))
+    if not rows or not query_terms:
+        return [0.0] * len(rows)
+    column = {t: i for i, t in enumerate(query_terms)}
+    tf = np.zeros((len(rows), len(query_terms)))
+    lengths = np.zeros(len(rows))
+    for d, row in enumerate(rows):
+        for weight, terms in ((1.0, _terms(row.get("page_excerpt", ""))), (_TITLE_WEIGHT, _terms(row.get("title", "")))):
+            lengths[d] += weight * len(terms)
+            for t in terms:
+                if t in column:
+                    tf[d, column[t]] += weight
+    n = len(rows)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avg_length = lengths.mean() or 1.0
+    norm = _K1 * (1 - _B + _B * lengths / avg_length)
+    scores = (idf * tf * (_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+    return [float(s) for s in scores]
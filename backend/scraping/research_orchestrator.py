@@ -6,12 +6,14 @@ the entire backlink research process, managing search queries, scraping,
 and data compilation. Separated from core scraping to enable future
 extensibility and cleaner architecture.
 """
-import httpx
+from typing import Callable
 from urllib.parse import urlparse
 from loguru import logger
+from observability import span, stage, record_provider_error, error_code, RESEARCH_CANDIDATES, RESEARCH_ROWS
 
 # Import required functions from other modules
-from .serper import generate_search_queries, _get_serper_api_key, _serper_reachable
+from .serper import generate_search_queries, search_serper, _get_serper_api_key, _serper_reachable, _sanitize_keyword
+from .candidates import blocked_domains, is_blocked, min_candidate_score, score_candidate
 from .firecrawl import _get_firecrawl_api_key, scrape_website
 from .content_extraction import _collect_page_text, _strip_html_tags, _collapse_whitespace, _http_fetch_text
 from .email_extraction import _extract_emails, _choose_best_email
@@ -19,21 +21,94 @@ from .link_extraction import _extract_links, _classify_support_links
 from .data_processing import _compose_notes
 
 
+def _scrape_candidate(item: dict, keyword: str, firecrawl_key: str | None) -> tuple[dict, str]:
+    """
+    Build the research row for one search result.
+
+    Returns:
+        tuple: (row, context_source)
+
+    Raises:
+        Exception: Whatever scraping or parsing raised
+    """
+    url = item.get("link")
+    title = item.get("title")
+    page = scrape_website(url, firecrawl_key)
+    md_text, html_text = _collect_page_text(page)
+    context_source = "firecrawl"
+    # best-effort excerpt for LLM insights
+    raw_text = (md_text or "").strip()
+    if not raw_text and html_text:
+        raw_text = _strip_html_tags(html_text)
+    excerpt = _collapse_whitespace(raw_text)[:1500]
+    # If Firecrawl yielded nothing, try HTTP fallback
+    if not excerpt:
+        context_source = "httpx"
+        http_text, http_html = _http_fetch_text(url)
+        if http_text:
+            excerpt = http_text[:1500]
+            html_text = http_html or html_text
+        else:
+            # Last resort: use Serper organic snippet
+            snippet = item.get("snippet") or item.get("description") or ""
+            if snippet:
+                context_source = "serper_snippet"
+                excerpt = _collapse_whitespace(snippet)[:600]
+            else:
+                context_source = "empty"
+    with stage("extract_contacts"):
+        # emails
+        emails = _extract_emails((md_text + "\n" + html_text))
+        domain = urlparse(url).netloc
+        best_email = _choose_best_email(emails, domain)
+        # support links
+        links = _extract_links(html_text, url)
+        g_url, c_url = _classify_support_links(links)
+    if not g_url and title and "write" in title.lower():
+        g_url = url
+    row = {
+        "url": url,
+        "title": title or "",
+        "contact_email": best_email,
+        "contact_emails_all": ", ".join(emails[:5]) if emails else "",
+        "contact_form_url": c_url,
+        "guidelines_url": g_url,
+        "domain": domain or url,
+        "notes": "",
+        "page_excerpt": excerpt,
+        "context_source": context_source,
+    }
+    row["notes"] = _compose_notes(row, keyword)
+    return row, context_source
+
+
 def find_backlink_opportunities(
     keyword,
     serper_api_key: str | None = None,
     firecrawl_api_key: str | None = None,
     max_results: int = 10,
+    known_rows: dict[str, dict] | None = None,
+    on_row: Callable[[dict], None] | None = None,
 ):
     """
     Find backlink opportunities by scraping websites based on search queries.
 
+    Search results are scored before anything is fetched (see
+    scraping.candidates): blocked domains and low scorers are dropped, and
+    the rest are scraped best first. Another query is only run while fewer
+    than twice the missing rows are waiting to be scraped.
+
     Args:
         keyword (str): The keyword to search for backlink opportunities.
+        known_rows (dict): Rows already built for some URLs (e.g. from a job
+            checkpoint); these URLs are not scraped again.
+        on_row (callable): Called with each newly built row. Exceptions it
+            raises propagate to the caller (used for checkpointing/cancel).
 
     Returns:
         list: A list of results from the scraped websites.
     """
+    known_rows = known_rows or {}
     search_queries = generate_search_queries(keyword)
     results: list[dict] = []
     unique: dict[str, dict] = {}
@@ -42,75 +117,58 @@ def find_backlink_opportunities(
     firecrawl_key = firecrawl_api_key or _get_firecrawl_api_key()
 
     if serper_key and _serper_reachable(serper_key):
-        headers = {"X-API-KEY": serper_key, "Content-Type": "application/json"}
         unique = {}
-        for q in search_queries:
-            if len(unique) >= max_results:
-                break
-            try:
-                resp = httpx.post(
-                    "https://google.serper.dev/search",
-                    headers=headers,
-                    json={"q": q, "num": 10},
-                    timeout=30,
-                )
-                resp.raise_for_status()
-                data = resp.json()
+        blocked = blocked_domains()
+        min_score = min_candidate_score()
+        search_keyword = _sanitize_keyword(keyword)
+        queries = iter(search_queries)
+        seen: set[str] = set()
+        pending: list[tuple[float, dict]] = []  # scored candidates, best first
+        while len(unique) < max_results:
+            q = next(queries, None) if len(pending) < 2 * (max_results - len(unique)) else None
+            if q is not None:
+                try:
+                    data = search_serper(q, serper_key)
+                except Exception as exc:
+                    record_provider_error("serper", error_code(exc))
+                    logger.warning(f"Serper fetch failed for '{q}': {exc}")
+                    continue
                 for item in (data.get("organic") or []):
-                    if len(unique) >= max_results:
-                        break
                     url = item.get("link")
-                    title = item.get("title")
-                    if not url:
+                    if not url or url in seen:
                         continue
-                    page = scrape_website(url, firecrawl_key)
-                    md_text, html_text = _collect_page_text(page)
-                    context_source = "firecrawl"
-                    # best-effort excerpt for LLM insights
-                    raw_text = (md_text or "").strip()
-                    if not raw_text and html_text:
-                        raw_text = _strip_html_tags(html_text)
-                    excerpt = _collapse_whitespace(raw_text)[:1500]
-                    # If Firecrawl yielded nothing, try HTTP fallback
-                    if not excerpt:
-                        context_source = "httpx"
-                        http_text, http_html = _http_fetch_text(url)
-                        if http_text:
-                            excerpt = http_text[:1500]
-                            html_text = http_html or html_text
-                        else:
-                            # Last resort: use Serper organic snippet
-                            snippet = item.get("snippet") or item.get("description") or ""
-                            if snippet:
-                                context_source = "serper_snippet"
-                                excerpt = _collapse_whitespace(snippet)[:600]
-                            else:
-                                context_source = "empty"
-                    # emails
-                    emails = _extract_emails((md_text + "\n" + html_text))
-                    domain = urlparse(url).netloc
-                    best_email = _choose_best_email(emails, domain)
-                    # support links
-                    links = _extract_links(html_text, url)
-                    g_url, c_url = _classify_support_links(links)
-                    if not g_url and title and "write" in title.lower():
-                        g_url = url
-                    row = {
-                        "url": url,
-                        "title": title or "",
-                        "contact_email": best_email,
-                        "contact_emails_all": ", ".join(emails[:5]) if emails else "",
-                        "contact_form_url": c_url,
-                        "guidelines_url": g_url,
-                        "domain": domain or url,
-                        "notes": "",
-                        "page_excerpt": excerpt,
-                        "context_source": context_source,
-                    }
-                    row["notes"] = _compose_notes(row, keyword)
-                    unique[url] = row
-            except Exception as exc:
-                logger.warning(f"Serper fetch failed for '{q}': {exc}")
+                    seen.add(url)
+                    if is_blocked(url, blocked):
+                        RESEARCH_CANDIDATES.inc(outcome="blocked")
+                        continue
+                    score = score_candidate(item, search_keyword)
+                    if score < min_score:
+                        RESEARCH_CANDIDATES.inc(outcome="dropped")
+                        continue
+                    pending.append((score, item))
+                pending.sort(key=lambda p: -p[0])
+                continue
+            if not pending:
+                break
+            score, item = pending.pop(0)
+            url = item["link"]
+            if url in known_rows:
+                unique[url] = known_rows[url]
+                continue
+            with span("research_url", url=url, score=round(score, 2)):
+                try:
+                    row, context_source = _scrape_candidate(item, keyword, firecrawl_key)
+                except Exception as exc:
+                    logger.warning(f"Failed to process {url}: {exc}")
+                    RESEARCH_CANDIDATES.inc(outcome="failed")
+                    continue
+            unique[url] = row
+            RESEARCH_CANDIDATES.inc(outcome="scraped")
+            RESEARCH_ROWS.inc(context_source=context_source)
+            if on_row:
+                on_row(row)
+        if pending:
+            RESEARCH_CANDIDATES.inc(len(pending), outcome="unused")
 
     # Finalize (deduped + capped)
     if serper_key:
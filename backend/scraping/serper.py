@@ -8,6 +8,8 @@ to enable future extensibility with alternative search providers.
 import os
 import httpx
 from loguru import logger
+from observability import stage, record_provider_error, error_code
+from .cassette import cassette_call
 
 
 def _get_serper_api_key():
@@ -15,23 +17,63 @@ def _get_serper_api_key():
     return os.getenv("SERPER_API_KEY")
 
 
+def _get_serper_api_url() -> str:
+    """Serper base URL; SERPER_API_URL points it at a stand-in (e.g. for load tests)"""
+    return (os.getenv("SERPER_API_URL") or "https://google.serper.dev").rstrip("/")
+
+
 def _serper_reachable(api_key: str) -> bool:
     """Best-effort check to avoid spamming errors when offline or DNS fails.
     Returns False quickly if https://google.serper.dev is not reachable.
     """
-    try:
+    def _probe() -> bool:
         # Lightweight GET to the root with short timeout. Some environments block HEAD.
         httpx.get(
-            "https://google.serper.dev",
+            _get_serper_api_url(),
             timeout=3,
             headers={"X-API-KEY": api_key} if api_key else None,
         )
         return True
+
+    try:
+        with stage("serper_probe"):
+            cassette_call("serper_probe", {}, _probe)
+        return True
     except Exception as exc:
+        record_provider_error("serper", error_code(exc))
         logger.warning(f"Serper appears unreachable (network/DNS): {exc}. Skipping search.")
         return False
 
 
+def search_serper(query: str, api_key: str, num: int = 10) -> dict:
+    """
+    Run one Google search through Serper.
+
+    Args:
+        query: Search query
+        api_key: Serper API key
+        num: Number of organic results to ask for
+
+    Returns:
+        dict: Serper's JSON response ("organic" holds the results)
+
+    Raises:
+        httpx.HTTPError: On network errors or an error status
+    """
+    def _post() -> dict:
+        resp = httpx.post(
+            f"{_get_serper_api_url()}/search",
+            headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
+            json={"q": query, "num": num},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    with stage("serper_search", query=query):
+        return cassette_call("serper_search", {"q": query, "num": num}, _post)
+
+
 def _sanitize_keyword(keyword):
     """Sanitize keyword by removing common guest post footprints."""
     base = keyword or ""
@@ -0,0 +1,10 @@
+"""
+Test setup - the app runs in worker mode against a throwaway database
+"""
+import os
+import tempfile
+
+# Worker mode and the checkpoint store are chosen when the app is imported,
+# so this has to happen before any test module imports it.
+os.environ["JOB_QUEUE_DB"] = os.path.join(tempfile.mkdtemp(prefix="backlinker-test-"), "jobs.sqlite3")
+os.environ.pop("CHECKPOINT_DB", None)
@@ -0,0 +1,70 @@
+"""
+Checkpoint store - requests are stored without credentials and cleaned up
+"""
+import json
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app.checkpoints import CheckpointStore, JobCheckpoint, checkpoint_store, open_checkpoint
+from app.executor import job_executor
+from app.jobs import job_store
+from app.main import app
+from app.models import ResearchStartRequest
+
+
+def _store() -> CheckpointStore:
+    return CheckpointStore(os.path.join(tempfile.mkdtemp(prefix="backlinker-test-"), "checkpoints.sqlite3"))
+
+
+def test_checkpointed_request_has_no_credentials():
+    job = job_store.create()
+    req = ResearchStartRequest(keyword="seo", serper_key="serper-secret", firecrawl_key="fc-secret")
+
+    open_checkpoint(job.job_id, "research", req)
+
+    job_type, payload = checkpoint_store.job_request(job.job_id)
+    stored = json.loads(payload)
+    assert job_type == "research" and stored["keyword"] == "seo"
+    assert "serper_key" not in stored and "firecrawl_key" not in stored
+
+
+def test_finish_done_deletes_checkpoints_and_keeps_stopped_jobs():
+    store = _store()
+    for job_id in ("done-1", "error-1"):
+        store.register(job_id, "research", "{}")
+        JobCheckpoint(job_id, store).record("https://a.example", {"ok": True})
+
+    JobCheckpoint("done-1", store).finish("done")
+    JobCheckpoint("error-1", store).finish("error")
+
+    assert store.job_request("done-1") is None and store.load("done-1") == {}
+    assert store.state("error-1") == "error" and store.load("error-1") == {"https://a.example": {"ok": True}}
+
+
+def test_sweep_deletes_stale_jobs():
+    store = _store()
+    store.register("old-1", "research", "{}")
+    store.record("old-1", "https://a.example", {"ok": True})
+    time.sleep(0.05)
+    store.register("new-1", "research", "{}")
+
+    assert store.sweep(0.03) == 1
+    assert store.job_request("old-1") is None and store.load("old-1") == {}
+    assert store.job_request("new-1") is not None
+
+
+def test_resume_takes_credentials_again(monkeypatch):
+    job = job_store.create()
+    open_checkpoint(job.job_id, "research", ResearchStartRequest(keyword="seo", serper_key="old-secret"))
+    job_store.update(job.job_id, status="error", error="boom")
+    submitted = {}
+    monkeypatch.setattr(job_executor, "resubmit", lambda job_type, job_id, req, **kw: submitted.update(req=req))
+
+    resp = TestClient(app).post(f"/jobs/{job.job_id}/resume", json={"serper_key": "new-secret"})
+
+    assert resp.status_code == 200, resp.text
+    assert submitted["req"].keyword == "seo"
+    assert submitted["req"].serper_key == "new-secret"
@@ -0,0 +1,54 @@
+"""
+Durable job queue - requests are stored without credentials and cleared when done
+"""
+import json
+import os
+import sqlite3
+import tempfile
+
+from app.executor import QueueSubmitter
+from app.job_queue import SqliteJobQueue
+from app.models import SendStartRequest
+
+_DB = os.path.join(tempfile.mkdtemp(prefix="backlinker-test-"), "queue.sqlite3")
+
+
+def _payload(job_id: str) -> str:
+    conn = sqlite3.connect(_DB)
+    try:
+        return conn.execute("SELECT payload FROM job_queue WHERE job_id = ?", (job_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _request() -> SendStartRequest:
+    return SendStartRequest(
+        from_email="me@example.com",
+        rows=[{"to_email": "a@example.com", "subject": "Hi", "body": "Hello"}],
+        smtp_user="me",
+        smtp_pass="hunter2",
+        sendgrid_key="SG.secret",
+    )
+
+
+def test_enqueued_request_has_no_credentials():
+    submitter = QueueSubmitter(SqliteJobQueue(_DB))
+    submitter.submit("send", "queue-secrets-1", _request())
+
+    stored = json.loads(_payload("queue-secrets-1"))
+    assert stored["smtp_user"] == "me"
+    assert "smtp_pass" not in stored and "sendgrid_key" not in stored
+    assert "hunter2" not in _payload("queue-secrets-1")
+
+
+def test_complete_and_cancel_clear_the_payload():
+    queue = SqliteJobQueue(_DB)
+    submitter = QueueSubmitter(queue)
+    submitter.submit("send", "queue-done-1", _request())
+    submitter.submit("send", "queue-cancel-1", _request())
+
+    queue.complete("queue-done-1")
+    assert queue.cancel("queue-cancel-1")
+
+    assert _payload("queue-done-1") == "{}"
+    assert _payload("queue-cancel-1") == "{}"
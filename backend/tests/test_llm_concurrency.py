@@ -0,0 +1,111 @@
+"""
+LLM provider limits - circuit breaker cycle, AIMD limit and breaker outcomes in call_provider
+"""
+import time
+
+import pytest
+
+from llm import concurrency
+from llm.concurrency import AdaptiveLimit, CircuitBreaker, CircuitOpenError, call_provider, circuit_open
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def fresh_limits(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    monkeypatch.setenv("LLM_CIRCUIT_FAILURES", "3")
+    monkeypatch.setenv("LLM_CIRCUIT_OPEN_S", "30")
+    monkeypatch.setattr(concurrency, "_limits", {})
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("test", failures=2, open_s=0.05)
+    breaker.record(success=False)
+    assert breaker.allow() and not breaker.is_open()
+
+    breaker.record(success=False)
+    assert breaker.is_open() and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the one half-open trial
+    assert not breaker.allow()  # no second request while it runs
+    breaker.record(success=True)
+
+    assert not breaker.is_open()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_opens_the_breaker_again():
+    breaker = CircuitBreaker("test", failures=2, open_s=0.05)
+    breaker.record(success=False)
+    breaker.record(success=False)
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record(success=False)
+
+    assert breaker.is_open() and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_abandoned_trial_frees_the_slot_without_a_verdict():
+    breaker = CircuitBreaker("test", failures=1, open_s=0.0)
+    breaker.record(success=False)
+    assert breaker.allow() and not breaker.allow()
+
+    breaker.abandon()
+
+    assert breaker.allow()
+
+
+def test_aimd_halves_once_per_overload_and_grows_back():
+    limit = AdaptiveLimit("test", 8)
+    started = [limit.acquire() for _ in range(4)]
+
+    for s in started:  # four requests from the same burst hit a 429
+        limit.release(s, overloaded=True, succeeded=False)
+    assert int(limit.limit) == 4
+
+    for _ in range(30):  # +1/limit per success: 4 -> 8 takes about 4 + 5 + 6 + 7
+        limit.release(limit.acquire(), overloaded=False, succeeded=True)
+    assert limit.limit == 8.0
+
+
+def _fail(status_code: int):
+    def fn(timeout_s: float):
+        raise _HTTPError(status_code)
+    return fn
+
+
+def _call(fn):
+    try:
+        return call_provider("openai", fn)
+    except _HTTPError:
+        return None
+
+
+def test_429s_between_failures_do_not_reset_the_breaker(fresh_limits):
+    for code in (500, 429, 500, 429, 429, 500):
+        _call(_fail(code))
+
+    assert circuit_open("openai")
+    with pytest.raises(CircuitOpenError):
+        call_provider("openai", lambda timeout_s: "ok")
+
+
+def test_429_on_the_half_open_trial_keeps_the_circuit_open(fresh_limits):
+    for _ in range(3):
+        _call(_fail(500))
+    concurrency._limits["openai"].breaker._open_until = 0.0  # cool-off over
+
+    _call(_fail(429))  # the trial is throttled: no verdict
+    assert not circuit_open("openai")  # a new trial may go out
+    _call(_fail(500))  # and a failed trial opens the circuit again
+
+    assert circuit_open("openai")
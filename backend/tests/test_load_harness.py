@@ -0,0 +1,15 @@
+"""
+Load harness - nearest-rank percentiles
+"""
+from benchmarks.load.harness import percentile
+
+
+def test_percentile_is_nearest_rank():
+    hundred = [float(v) for v in range(1, 101)]
+    assert percentile([], 50) is None
+    assert percentile([1.0, 2.0], 50) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile(hundred, 95) == 95.0
+    assert percentile(hundred, 99) == 99.0
+    assert percentile(hundred, 100) == 100.0
+    assert percentile([3.0, 1.0, 2.0], 0) == 1.0
@@ -0,0 +1,48 @@
+"""
+Resume in worker mode - a job that is already in the durable queue is queued again
+"""
+import os
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from app.checkpoints import checkpoint_store
+from app.executor import QueueSubmitter, job_executor
+from app.jobs import job_store
+from app.main import app
+from app.models import SendStartRequest
+
+_DB = os.environ["JOB_QUEUE_DB"]  # set by conftest.py
+
+
+def _queue_row(job_id: str) -> sqlite3.Row:
+    conn = sqlite3.connect(_DB)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute("SELECT * FROM job_queue WHERE job_id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_resume_requeues_a_failed_job_in_worker_mode():
+    assert isinstance(job_executor, QueueSubmitter)
+    req = SendStartRequest(from_email="me@example.com", rows=[{"to_email": "a@example.com", "subject": "Hi", "body": "Hello"}])
+    job = job_store.create()
+    checkpoint_store.register(job.job_id, "send", req.json())
+    job_executor.submit("send", job.job_id, req)
+
+    # A worker claimed the job, ran it and it failed.
+    claimed = job_executor._queue.claim("worker-1", {"send": 1})
+    assert claimed is not None and claimed.job_id == job.job_id
+    job_executor._queue.complete(job.job_id)
+    job_store.update(job.job_id, status="error", error="boom")
+
+    resp = TestClient(app).post(f"/jobs/{job.job_id}/resume")
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["status"] == "queued"
+    row = _queue_row(job.job_id)
+    assert row["state"] == "queued"
+    assert row["attempts"] == 0
+    assert row["worker_id"] is None
+    assert job_executor._queue.claim("worker-2", {"send": 1}).job_id == job.job_id
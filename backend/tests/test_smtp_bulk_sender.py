@@ -0,0 +1,110 @@
+"""
+Parallel bulk SMTP sending - shared pacing, row order and cancellation
+"""
+import csv
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from email_providers.smtp import bulk_sender
+from email_providers.smtp.bulk_sender import _Pacer, send_bulk_smtp
+
+
+class _Cancelled(Exception):
+    pass
+
+
+@pytest.fixture
+def fake_send(monkeypatch):
+    """Replace the SMTP send with a sleep; records which rows were sent."""
+    sent = []
+    lock = threading.Lock()
+
+    def send_one_smtp(*, to_email, **kwargs):
+        # later rows finish sooner, so completion order differs from row order
+        time.sleep(0.02 * (10 - int(to_email.split("@")[0])))
+        with lock:
+            sent.append(to_email)
+        return True
+
+    monkeypatch.setattr(bulk_sender, "send_one_smtp", send_one_smtp)
+    monkeypatch.setattr(bulk_sender, "smtp_pool", lambda *args: SimpleNamespace(size=4))
+    return sent
+
+
+def _csv(tmp_path, n: int) -> str:
+    path = tmp_path / "emails.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["to_email", "subject", "body"])
+        writer.writeheader()
+        for i in range(1, n + 1):
+            writer.writerow({"to_email": f"{i}@example.com", "subject": "Hi", "body": "Hello"})
+    return str(path)
+
+
+def _send(in_csv: str, **kwargs):
+    return send_bulk_smtp(
+        in_csv,
+        from_email="me@example.com",
+        smtp_server="127.0.0.1",
+        smtp_port=25,
+        smtp_user="user",
+        smtp_password="pass",
+        **kwargs,
+    )
+
+
+def test_pacer_spaces_sends_across_threads():
+    pacer = _Pacer(50.0)
+    starts = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(3):
+            pacer.wait()
+            with lock:
+                starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    starts.sort()
+    assert len(starts) == 12
+    for k, started in enumerate(starts):
+        assert started >= starts[0] + k * pacer.interval - 0.005
+
+
+def test_outcomes_are_returned_in_row_order(tmp_path, fake_send):
+    outcomes = _send(_csv(tmp_path, 9), rate_limit_per_sec=100.0, concurrency=4)
+
+    assert [o["row"] for o in outcomes] == list(range(1, 10))
+    assert all(o["status"] == "sent" for o in outcomes)
+    assert sorted(fake_send) != fake_send  # sends really did overlap
+
+
+def test_cancel_in_before_send_stops_new_sends(tmp_path, fake_send):
+    reported = []
+
+    def before_send(row: int) -> None:
+        if row > 4:
+            raise _Cancelled()
+
+    with pytest.raises(_Cancelled):
+        _send(
+            _csv(tmp_path, 9),
+            rate_limit_per_sec=100.0,
+            concurrency=3,
+            before_send=before_send,
+            on_outcome=reported.append,
+        )
+
+    # Rows 1-3 were still sending when row 5 cancelled; they finished and were
+    # reported. Row 4 may lose the race with the cancel, nothing after it is sent.
+    sent = sorted(int(to.split("@")[0]) for to in fake_send)
+    assert sent in ([1, 2, 3], [1, 2, 3, 4])
+    assert sorted(o["row"] for o in reported) == sent
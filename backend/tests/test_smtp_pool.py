@@ -0,0 +1,154 @@
+"""
+Pooled SMTP sessions - reuse, retirement, and when a message is sent again
+"""
+from email.message import EmailMessage
+import smtplib
+import socketserver
+import threading
+import time
+
+import pytest
+
+from email_providers.smtp.pool import SMTPDeliveryUnknown, SMTPSessionPool
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server whose next command can be told to drop or stall."""
+
+    server: "_Server"
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self) -> None:
+        with self.server.lock:
+            self.server.connections += 1
+        self._reply("220 test ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            verb = raw.decode().split(" ", 1)[0].strip().upper()
+            fault = self.server.faults.pop(verb, None)
+            if fault == "drop":
+                return
+            if fault == "stall":
+                time.sleep(1.0)
+                return
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-test")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self._reply("235 ok")
+            elif verb == "RCPT" and "refused@" in raw.decode():
+                self._reply("550 no such user")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 go ahead")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                with self.server.lock:
+                    self.server.messages += 1
+                if self.server.faults.pop("DATA_END", None) == "drop":
+                    return
+                self._reply("250 queued")
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("502 not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self.faults = {}  # SMTP verb (or "DATA_END") -> "drop" | "stall", applied once
+
+
+@pytest.fixture
+def server():
+    srv = _Server()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _pool(server: _Server, **kwargs) -> SMTPSessionPool:
+    kwargs.setdefault("size", 1)
+    return SMTPSessionPool("127.0.0.1", server.server_address[1], "user", "pass", starttls=False, **kwargs)
+
+
+def _message(to: str = "a@example.com") -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "me@example.com"
+    msg["To"] = to
+    msg["Subject"] = "Hi"
+    msg.set_content("Hello")
+    return msg
+
+
+def test_sessions_are_reused_and_retired_after_max_messages(server):
+    pool = _pool(server, max_messages=2)
+    for _ in range(5):
+        pool.send_message(_message())
+    pool.close()
+
+    assert server.messages == 5
+    assert server.connections == 3
+
+
+def test_dropped_session_is_resent_when_it_failed_before_data(server):
+    pool = _pool(server)
+    pool.send_message(_message())
+    server.faults["MAIL"] = "drop"
+
+    pool.send_message(_message())
+    pool.close()
+
+    assert server.messages == 2
+    assert server.connections == 2
+
+
+def test_drop_after_data_is_not_resent(server):
+    pool = _pool(server)
+    pool.send_message(_message())
+    server.faults["DATA_END"] = "drop"
+
+    with pytest.raises(SMTPDeliveryUnknown):
+        pool.send_message(_message())
+    pool.close()
+
+    assert server.messages == 2  # the server did get it
+    assert server.connections == 1
+
+
+def test_read_timeout_is_not_resent(server):
+    pool = _pool(server, timeout_s=0.2)
+    pool.send_message(_message())
+    server.faults["MAIL"] = "stall"
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        pool.send_message(_message())
+    pool.close()
+
+    assert server.messages == 1
+    assert server.connections == 1
+
+
+def test_refused_recipient_keeps_the_session(server):
+    pool = _pool(server)
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.send_message(_message("refused@example.com"))
+    pool.send_message(_message())
+    pool.close()
+
+    assert server.messages == 1
+    assert server.connections == 1
@@ -4,6 +4,7 @@ Core Utility Functions - extracted from ai_backlinking_utils.py
 import sys
 from loguru import logger
 from urllib.parse import urlparse
+from observability import RESEARCH_ROWS
 
 # Import from the modularized scraping package
 from scraping import (
@@ -58,6 +59,7 @@ def build_row_from_url(url: str, firecrawl_key: str | None = None) -> dict:
     best_email = _choose_best_email(emails, domain)
     links = _extract_links(html_text, url)
     g_url, c_url = _classify_support_links(links)
+    RESEARCH_ROWS.inc(context_source=context_source)
     row = {
         "url": url,
         "title": "",